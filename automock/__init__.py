@@ -1,4 +1,82 @@
-from six import add_move, MovedModule  # type: ignore
-add_move(MovedModule('mock', 'mock', 'unittest.mock'))
+"""
+`import automock` only loads `register` (and the `record` policies it takes),
+so that registration modules can live next to production code for free:
+everything else, including the mock library and the settings, is loaded the
+first time it's used (see `__getattr__`).
 
-from automock.base import *  # noqa
+`six.moves.mock` is still added for `import automock`, but without importing
+`six` ourselves: if it isn't imported yet, it's added when it is.
+"""
+import sys
+
+from automock.recording import RecordCount, RecordLast, RecordSample
+from automock.registry import register
+
+MYPY = False
+if MYPY:  # (type checking only, `typing` is slow to import)
+    from typing import Any  # noqa
+
+
+__all__ = (  # noqa (from `automock.base`, see `__getattr__`)
+    'activate',
+    'AutomockTestCaseMixin',
+    'AutomockTestCase',
+    'start_patching',
+    'stop_patching',
+    'register',
+    'swap_mock',
+    'unmock',
+    'get_mock',
+    'get_called_mocks',
+    'call_checkpoint',
+    'reset_mocks',
+    'only_automocks',
+    'exclude_automocks',
+    'no_automock',
+    'RecordCount',
+    'RecordLast',
+    'RecordSample',
+)
+
+
+def _add_six_moves_mock(module_name='six'):
+    # type: (str) -> None
+    """
+    Make `from six.moves import mock` import `unittest.mock`, or the `mock`
+    backport under Python 2.
+    """
+    from six import add_move, MovedModule  # type: ignore
+    add_move(MovedModule('mock', 'mock', 'unittest.mock'))
+    if _six_watcher is not None:
+        _six_watcher.uninstall()
+
+
+_six_watcher = None  # type: Any
+
+
+if sys.version_info < (3, 7):
+    # (no module `__getattr__`, load everything up front, which adds
+    # `six.moves.mock` too)
+    from automock.base import *  # noqa
+else:
+    if 'six' in sys.modules:
+        _add_six_moves_mock()
+    else:
+        from automock.importhook import ImportWatcher as _ImportWatcher
+        _six_watcher = _ImportWatcher(_add_six_moves_mock)
+        _six_watcher.watched.add('six')
+        _six_watcher.install()
+
+    def __getattr__(name):
+        # (PEP 562, only called for names we don't have yet)
+        if name not in __all__:
+            raise AttributeError(
+                'module {!r} has no attribute {!r}'.format(__name__, name)
+            )
+        from importlib import import_module
+        value = getattr(import_module('automock.base'), name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(set(globals()) | set(__all__))
@@ -0,0 +1,47 @@
+"""
+`async def` support for automock's context managers and decorators.
+
+(Python 3 only, `automock.base` doesn't import this under Python 2)
+"""
+from functools import wraps
+from inspect import iscoroutinefunction
+from typing import Any, Callable  # noqa
+
+
+__all__ = ('AsyncContextMixin', 'iscoroutinefunction', 'with_context')
+
+
+class AsyncContextMixin(object):
+    """
+    Lets a (synchronous) context manager be used with `async with` too, in
+    whichever event loop is running: entering and exiting never awaits
+    anything.
+    """
+
+    async def __aenter__(self):
+        return self.__enter__()
+
+    async def __aexit__(self, *args):
+        return self.__exit__(*args)
+
+
+def with_context(context, f, pass_result=False):
+    # type: (Any, Callable, bool) -> Callable
+    """
+    Returns:
+        coroutine function which awaits `f` inside `with context`
+
+    Kwargs:
+        context: the context manager
+        f: coroutine function to decorate
+        pass_result: append the result of entering `context` to the args
+            `f` is called with
+    """
+    @wraps(f)
+    async def decorator(*args, **kwargs):
+        with context as result:
+            if pass_result:
+                args += (result,)
+            return await f(*args, **kwargs)
+
+    return decorator
@@ -0,0 +1,10 @@
+# (`aio.py` is Python 3 only, this lets `mypy --py2` check everything else)
+from typing import Any, Callable
+
+class AsyncContextMixin(object):
+    def __aenter__(self) -> Any: ...
+    def __aexit__(self, *args: Any) -> Any: ...
+
+def iscoroutinefunction(obj: Any) -> bool: ...
+
+def with_context(context: Any, f: Callable, pass_result: bool = ...) -> Callable: ...
@@ -0,0 +1,103 @@
+from typing import Any, Callable, Dict, Optional  # noqa
+
+import six
+
+from automock.compat import mock, mock_internals
+
+
+# the instance attributes `mock_add_spec` sets on a mock
+_SPEC_ATTRS = (
+    '_spec_class',
+    '_spec_set',
+    '_spec_signature',
+    '_mock_methods',
+    '_spec_asyncs',
+)
+
+
+def _spec_attrs(template):
+    # type: (mock.NonCallableMock) -> Dict[str, Any]
+    return {
+        key: template.__dict__[key]
+        for key in _SPEC_ATTRS
+        if key in template.__dict__
+    }
+
+
+class CachedSpec(object):
+    """
+    The result of introspecting a real object, as `mock.create_autospec`
+    does, which can then be applied cheaply to any number of mocks built
+    by a mock factory.
+
+    Applying it to a mock:
+    - restricts its attributes (and magic methods) to those of the real object
+    - makes calls check the real signature, raising `TypeError` on a mismatch
+    - lets `assert_called_with` etc. match calls by signature
+    - for a class, also restricts the attributes of `mock.return_value`,
+      i.e. of the instances it returns
+
+    Usage:
+
+        spec = CachedSpec(real_func)
+        mocked = factory()
+        spec.apply(mocked)
+
+    NOTE:
+    unlike `create_autospec` the attributes of the mock are not specced
+    recursively, only the mock itself (and for a class its instances).
+    """
+
+    __slots__ = ('spec_attrs', 'check_sig', 'signature', 'instance_attrs')
+
+    def __init__(self, original, skipfirst=False):
+        # type: (Any, bool) -> None
+        """
+        Kwargs:
+            original: the real object
+            skipfirst: ignore the first arg of the signature, e.g. `self` for
+                a method patched on its class
+        """
+        template = mock.Mock()
+        template.mock_add_spec(original)
+        self.spec_attrs = _spec_attrs(template)  # type: Dict[str, Any]
+
+        mock_internals._check_signature(original, template, skipfirst)
+        type_dict = type(template).__dict__
+        self.check_sig = type_dict.get('_mock_check_sig')  # type: Optional[Callable]
+        self.signature = type_dict.get('__signature__')
+
+        if isinstance(original, six.class_types):
+            instance = mock.NonCallableMock()
+            instance._mock_add_spec(original, False, _spec_as_instance=True)
+            self.instance_attrs = _spec_attrs(instance)  # type: Optional[Dict[str, Any]]
+        else:
+            self.instance_attrs = None
+
+    def apply(self, mocked):
+        # type: (Any) -> None
+        """
+        Spec `mocked` (in place), anything other than a mock is left as-is.
+        """
+        if not isinstance(mocked, mock.NonCallableMock):
+            return
+        _apply_attrs(mocked, self.spec_attrs)
+
+        if not isinstance(mocked, mock.CallableMixin):
+            return
+        if self.check_sig is not None:
+            mock_type = type(mocked)
+            mock_type._mock_check_sig = self.check_sig
+            mock_type.__signature__ = self.signature
+        if self.instance_attrs is not None:
+            instance = mocked.return_value
+            if isinstance(instance, mock.NonCallableMock):
+                _apply_attrs(instance, self.instance_attrs)
+
+
+def _apply_attrs(mocked, spec_attrs):
+    # type: (mock.NonCallableMock, Dict[str, Any]) -> None
+    mocked.__dict__.update(spec_attrs)
+    if isinstance(mocked, mock_internals.MagicMixin):
+        # (removes any magic methods the real object doesn't have)
+        mocked._mock_set_magics()
@@ -1,13 +1,58 @@
+import sys
 import warnings
-from functools import wraps
+from collections import namedtuple
+from functools import partial, wraps
 from importlib import import_module
-from typing import Callable, Dict, Optional  # noqa
+from inspect import getmro
+from types import FunctionType, ModuleType
+from typing import (  # noqa
+    Any,
+    Callable,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    Union,
+)
 from unittest import TestCase
 
-from six.moves import mock  # type: ignore
+import six
+from six.moves import collections_abc  # type: ignore
 
+from automock import leaks, profiling
+from automock.autospec import CachedSpec
+from automock.compat import mock, mock_internals
 from automock.conf import settings
-from automock.utils import MultipleContextDecorator
+from automock.importhook import ImportWatcher
+from automock.manifest import load_manifest
+from automock.recording import RecordCount, RecordLast, RecordSample
+from automock.registry import _registry, register, Registration
+from automock.registry import Registry  # noqa (only used in type comments)
+from automock.snapshot import MockSnapshot
+from automock.utils import ContextDecorator
+
+if six.PY2:
+    aio = None
+
+    class _AsyncContextMixin(object):
+        pass
+else:
+    from automock import aio
+    from automock.aio import AsyncContextMixin as _AsyncContextMixin
+
+# (added in Python 3.8)
+_AsyncMock = getattr(mock, 'AsyncMock', None)
+
+try:
+    from contextvars import ContextVar
+except ImportError:  # (Python < 3.7)
+    ContextVar = None
 
 
 __all__ = (
@@ -21,74 +66,1123 @@ __all__ = (
     'unmock',
     'get_mock',
     'get_called_mocks',
+    'call_checkpoint',
+    'reset_mocks',
+    'only_automocks',
+    'exclude_automocks',
+    'no_automock',
+    'RecordCount',
+    'RecordLast',
+    'RecordSample',
 )
 
 
-_factory_map = {}  # type: Dict[str, Callable]
-_patchers = {}  # type: Dict[str, mock.mock._patch]
-_mocks = {}  # type: Dict[str, mock.Mock]
+class RegistryView(collections_abc.Mapping):
+    """
+    Read-only `{path: value}` view of one field of the registrations, for
+    those registrations where it is set.
+
+    These stand in for the separate dicts which used to hold each field
+    (`_factory_map`, `_patchers`, `_mocks` and `_targets`).
+
+    A field which every registration has (`always_set`) is only read by
+    `__getitem__`, e.g. listing `_factory_map` doesn't import the factories
+    registered by import path.
+    """
+
+    __slots__ = ('_registry', '_field', '_always_set')
+
+    def __init__(self, registry, field, always_set=False):
+        # type: (Registry, str, bool) -> None
+        self._registry = registry
+        self._field = field
+        self._always_set = always_set
+
+    def __contains__(self, path):
+        # type: (Any) -> bool
+        registration = self._registry.get(path)
+        if registration is None:
+            return False
+        return self._always_set or getattr(registration, self._field) is not None
+
+    def __getitem__(self, path):
+        # type: (str) -> Any
+        registration = self._registry.get(path)
+        value = None if registration is None else getattr(registration, self._field)
+        if value is None:
+            raise KeyError(path)
+        return value
+
+    def __iter__(self):
+        # type: () -> Iterator[str]
+        field = self._field
+        always_set = self._always_set
+        for registration in self._registry:
+            if always_set or getattr(registration, field) is not None:
+                yield registration.path
+
+    def __len__(self):
+        # type: () -> int
+        if self._always_set:
+            return len(self._registry)
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        return '<RegistryView {!r}: {!r}>'.format(self._field, list(self))
+
+
+_dirty = set()  # type: Set[str]
+# paths whose mock has been called, and those whose mock we can't tell
+# (see `_track`)
+_called = set()  # type: Set[str]
+_unobserved = set()  # type: Set[str]
+# paths patched with `reuse` whose factory doesn't return a mock, see `_get_pooled`
+_unpooled = set()  # type: Set[str]
+_pre_imported = None  # type: Optional[Tuple[str, ...]]
+_loaded_manifests = None  # type: Optional[Tuple[str, ...]]
+
+# read-only views of the registry, in the shape of the dicts that came before it
+_factory_map = RegistryView(
+    _registry, 'factory', always_set=True
+)  # type: Mapping[str, Callable]
+_patchers = RegistryView(
+    _registry, 'patcher'
+)  # type: Mapping[str, Union[mock.mock._patch, _Patch, _ModulePatch]]
+_mocks = RegistryView(_registry, 'current_mock')  # type: Mapping[str, mock.Mock]
+_targets = RegistryView(_registry, 'target')  # type: Mapping[str, _Target]
+
+
+class _Target(namedtuple('_Target', ('owner', 'attribute', 'original', 'raw', 'module', 'spec'))):
+    """
+    The result of resolving a registered import path:
+
+        owner: the object the patched attribute lives on (usually a module)
+        attribute: name of the patched attribute
+        original: the un-patched value
+        raw: the un-patched value as it is stored, for an attribute of a
+            class e.g. the `staticmethod` rather than the function it wraps
+            (is `original` otherwise)
+        module: the module `owner` was found in (is `owner` unless patching
+            an attribute of a class)
+        spec: `module.__spec__` at the time of resolution, lets us notice
+            when the module has been reloaded
+    """
+    __slots__ = ()
+
+
+def _import_owner(import_path):
+    # type: (str) -> Tuple[Any, str, ModuleType]
+    """
+    Import the object containing the attribute at the end of `import_path`
+    (in the same way as `mock.patch`, importing each component as a module
+    if it's not already an attribute of its parent)
+
+    Returns:
+        owner, attribute name, module the owner was found in
+    """
+    components = import_path.split('.')
+    attribute = components.pop()
+    owner_path = components.pop(0)
+    owner = import_module(owner_path)
+    module = owner
+    for component in components:
+        owner_path += '.' + component
+        try:
+            owner = getattr(owner, component)
+        except AttributeError:
+            # (not `getattr` after importing: when we're called back by the
+            # import hook, the submodule isn't set on its parent yet)
+            owner = import_module(owner_path)
+        if isinstance(owner, ModuleType):
+            module = owner
+    return owner, attribute, module
+
+
+def _resolve(import_path):
+    # type: (str) -> _Target
+    """
+    Look up the patch target for `import_path`, only walking the import
+    machinery on first use, or if the owning module has been reloaded.
+
+    (the cache is invalidated for a path when it's re-registered)
+    """
+    registration = _registry.get(import_path)
+    if registration is None:
+        # (not registered, nowhere to cache it)
+        return _resolve_uncached(import_path)
+    return _resolve_registration(registration)
+
+
+def _resolve_registration(registration):
+    # type: (Registration) -> _Target
+    target = registration.target
+    if target is None or getattr(target.module, '__spec__', None) is not target.spec:
+        target = _resolve_uncached(registration.path)
+        _registry.set_target(registration, target)
+    return target
+
+
+def _resolve_uncached(import_path):
+    # type: (str) -> _Target
+    owner, attribute, module = _import_owner(import_path)
+    original = getattr(owner, attribute)
+    raw = original
+    if isinstance(owner, six.class_types):
+        raw = next(
+            (
+                klass.__dict__[attribute]
+                # (old-style classes too, which the stubs don't allow)
+                for klass in getmro(owner)  # type: ignore
+                if attribute in klass.__dict__
+            ),
+            original,
+        )
+    return _Target(
+        owner=owner,
+        attribute=attribute,
+        original=original,
+        raw=raw,
+        module=module,
+        spec=getattr(module, '__spec__', None),
+    )
+
+
+def _pre_import():
+    # type: () -> None
+    """
+    Ensure that modules containing mock factories get imported so that their
+    calls to `register` are made (after registering the paths declared in
+    `REGISTRATION_MANIFESTS`, which doesn't import anything).
+
+    (modules which are configured in `TEST_MOCK_FACTORY_MAP` do not need to
+    be pre-imported, only those which rely on `register`)
+
+    The imports are only done again if `REGISTRATION_IMPORTS` changes, and
+    likewise for the manifests.
+    """
+    global _pre_imported
+    config = _get_config()
+    if config.registration_manifests is not _loaded_manifests:
+        _load_manifests(config)
+    imports = config.registration_imports
+    if imports is _pre_imported:
+        return
+    if imports != _pre_imported:
+        profile = profiling.active
+        for import_path in imports:
+            if profile is None:
+                import_module(import_path)
+            else:
+                started = profile.start()
+                import_module(import_path)
+                profile.stop_import(import_path, started)
+    _pre_imported = imports
+
+
+def _load_manifests(config):
+    # type: (_Config) -> None
+    global _loaded_manifests
+    manifests = config.registration_manifests
+    if manifests != _loaded_manifests:
+        profile = profiling.active
+        for manifest_path in manifests:
+            if profile is not None:
+                started = profile.start()
+            for entry in load_manifest(manifest_path, config.manifest_cache_dir):
+                _registry.register(
+                    entry.path,
+                    reuse=entry.reuse,
+                    autospec=entry.autospec,
+                    registered_in=manifest_path,
+                    factory_path=entry.factory,
+                )
+            if profile is not None:
+                profile.stop_import(manifest_path, started)
+    _loaded_manifests = manifests
+
+
+class LazyMock(object):
+    """
+    Cheap placeholder patched in place of a mock when `LAZY_MOCKS` is
+    enabled.
+
+    The mock factory is only called the first time the placeholder is
+    called, has an attribute read or set, or is used in any way which the
+    mock supports via a magic method (e.g. `str()`, comparisons, `with`, and
+    `isinstance` checks via `__class__`), after that everything is forwarded
+    to the mock it built.
+    """
+
+    __slots__ = ('_path', '_factory', '_mock')
+
+    def __init__(self, path, factory):
+        # type: (str, Callable) -> None
+        object.__setattr__(self, '_path', path)
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_mock', None)
+
+    def _materialize(self):
+        # type: () -> mock.Mock
+        if self._mock is None:
+            mocked = self._factory()
+            object.__setattr__(self, '_mock', mocked)
+            # (only ever built because something touched it)
+            _dirty.add(self._path)
+            _track_calls(self._path, mocked)
+        return self._mock
+
+    @property
+    def materialized(self):
+        # type: () -> bool
+        return self._mock is not None
+
+    def __call__(self, *args, **kwargs):
+        return self._materialize()(*args, **kwargs)
 
+    def __getattr__(self, name):
+        return getattr(self._materialize(), name)
 
-def _get_from_path(import_path):
+    def __setattr__(self, name, value):
+        setattr(self._materialize(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._materialize(), name)
+
+    def _get_class(self):
+        return self._materialize().__class__
+
+    __class__ = property(_get_class)  # type: ignore
+
+    def __repr__(self):
+        if self._mock is None:
+            return '<LazyMock {!r} (not built)>'.format(self._path)
+        return repr(self._mock)
+
+
+def _forward_magic(name):
     # type: (str) -> Callable
+    def method(self, *args, **kwargs):
+        return getattr(self._materialize(), name)(*args, **kwargs)
+    method.__name__ = name
+    return method
+
+
+class OverlayDispatcher(object):
     """
-    Kwargs:
-        import_path: full import path (to a mock factory function)
+    Patched in place of a registered path's mock the first time it is
+    swapped with `CONTEXT_OVERLAYS` enabled.
+
+    Everything is forwarded to the mock swapped in for the current context
+    (i.e. thread or asyncio task, see `contextvars`) if there is one, else
+    to the path's default mock. So swapping and un-swapping just set and
+    reset a `ContextVar`, and only affect the context that did it.
+    """
+
+    __slots__ = ('_registration',)
+
+    def __init__(self, registration):
+        # type: (Registration) -> None
+        object.__setattr__(self, '_registration', registration)
+
+    def _materialize(self):
+        # type: () -> Any
+        # (named as for `LazyMock`, so they can share `_forward_magic`)
+        registration = self._registration
+        swaps = registration.overlay.get()
+        return swaps[-1] if swaps else registration.mock
+
+    def __call__(self, *args, **kwargs):
+        return self._materialize()(*args, **kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self._materialize(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._materialize(), name, value)
+
+    def __delattr__(self, name):
+        delattr(self._materialize(), name)
+
+    def _get_class(self):
+        return self._materialize().__class__
+
+    __class__ = property(_get_class)  # type: ignore
 
+    def __repr__(self):
+        return '<OverlayDispatcher {!r}: {!r}>'.format(
+            self._registration.path, self._materialize()
+        )
+
+
+# (magic methods are looked up on the type, so `__getattr__` can't forward them:
+# we forward all those which a `MagicMock` supports by default)
+_FORWARDED_MAGICS = frozenset(mock_internals._magics) | frozenset(
+    # (added in Python 3.8)
+    getattr(mock_internals, '_async_method_magics', ())
+)
+for _magic in _FORWARDED_MAGICS:
+    setattr(LazyMock, _magic, _forward_magic(_magic))
+    setattr(OverlayDispatcher, _magic, _forward_magic(_magic))
+
+
+def _push_overlay(registration, new_mock):
+    # type: (Registration, Any) -> None
+    """
+    Swap `new_mock` in for the current context only, dispatching the patched
+    path through an `OverlayDispatcher` if it isn't already.
+
+    (the `ContextVar` holds a tuple of the mocks swapped in, innermost last,
+    so swaps can be exited in any order)
+    """
+    if registration.overlay is None:
+        registration.overlay = ContextVar(
+            'automock:{}'.format(registration.path), default=()
+        )
+    if registration.overlay_patcher is None:
+        target = registration.target
+        patcher = _get_config().patch_engine(
+            target.owner, target.attribute, new=OverlayDispatcher(registration)
+        )
+        patcher.start()
+        _active_patches.append(patcher)
+        registration.overlay_patcher = patcher
+    registration.overlay.set(registration.overlay.get() + (new_mock,))
+
+
+def _pop_overlay(registration, new_mock):
+    # type: (Registration, Any) -> None
+    swaps = registration.overlay.get()
+    for i in range(len(swaps) - 1, -1, -1):
+        if swaps[i] is new_mock:
+            registration.overlay.set(swaps[:i] + swaps[i + 1:])
+            return
+
+
+def _get_spec(registration):
+    # type: (Registration) -> CachedSpec
+    """
     Returns:
-        (the mock factory function)
+        the spec of the real object patched for `registration`, which is
+        only introspected the first time (or again if its module is reloaded)
     """
-    module_name, obj_name = import_path.rsplit('.', 1)
-    module = import_module(module_name)
-    return getattr(module, obj_name)
+    target = _resolve_registration(registration)
+    if registration.spec is None:
+        # a method patched on its class is called without `self`
+        skipfirst = (
+            isinstance(target.owner, six.class_types)
+            and isinstance(target.raw, FunctionType)
+        )
+        registration.spec = CachedSpec(target.original, skipfirst)
+    return registration.spec
 
 
-def register(func_path, factory=mock.MagicMock):
-    # type: (str, Callable) -> Callable
+def _is_async(registration):
+    # type: (Registration) -> bool
+    if registration.is_async is None:
+        target = _resolve_registration(registration)
+        registration.is_async = (
+            aio is not None and aio.iscoroutinefunction(target.original)
+        )
+    return registration.is_async
+
+
+def _build_default(registration, *args, **kwargs):
+    # type: (Registration, *Any, **Any) -> mock.Mock
+    mock_class = _AsyncMock if _is_async(registration) else mock.MagicMock
+    return mock_class(*args, **kwargs)
+
+
+def _build_imported(registration, *args, **kwargs):
+    # type: (Registration, *Any, **Any) -> Any
+    # (importing the factory, see `Registration.factory_path`)
+    registration.factory
+    return _base_factory(registration)(*args, **kwargs)
+
+
+def _base_factory(registration):
+    # type: (Registration) -> Callable
+    """
+    Returns:
+        the registered factory, except that the default `MagicMock` is
+        replaced with `AsyncMock` if the patched object is a coroutine function
+        (and a factory registered by import path isn't imported until it's
+        first called)
+    """
+    if not registration.factory_imported:
+        return partial(_build_imported, registration)
+    factory = registration.factory
+    if factory is not mock.MagicMock or _AsyncMock is None:
+        return factory
+    if registration.target is None:
+        # (not resolved yet, e.g. still waiting for `PATCH_ON_IMPORT`)
+        return partial(_build_default, registration)
+    return _AsyncMock if _is_async(registration) else factory
+
+
+def _build_specced(registration, factory, *args, **kwargs):
+    # type: (Registration, Callable, *Any, **Any) -> mock.Mock
+    mocked = factory(*args, **kwargs)
+    _get_spec(registration).apply(mocked)
+    return mocked
+
+
+def _spec_factory(registration, factory):
+    # type: (Registration, Callable) -> Callable
+    """
+    Returns:
+        `factory`, or for `autospec=True` registrations a wrapper which
+        specs the mocks it builds (and likewise for a `record` policy)
+    """
+    if registration.autospec:
+        factory = partial(_build_specced, registration, factory)
+    if registration.record is not None:
+        factory = partial(_build_recording, registration.record, factory)
+    return factory
+
+
+def _build_recording(record, factory, *args, **kwargs):
+    # type: (Any, Callable, *Any, **Any) -> mock.Mock
+    mocked = factory(*args, **kwargs)
+    record.apply(mocked)
+    return mocked
+
+
+def _get_pooled(registration, factory):
+    # type: (Registration, Callable) -> mock.Mock
+    """
+    Used in place of the registered factory for `reuse=True` registrations.
+
+    Returns:
+        the pooled mock for `registration`, building it on first use
+    """
+    snapshot = registration.snapshot
+    if snapshot is None:
+        mocked = factory()
+        try:
+            snapshot = registration.snapshot = MockSnapshot(mocked)
+        except TypeError:
+            if registration.reuse:
+                raise
+            # (we're patching with `reuse=True`, but this factory doesn't
+            # return a mock so there's no way to restore it, it just gets
+            # rebuilt every time, and `reset_mocks` re-patches it)
+            _unpooled.add(registration.path)
+            return mocked
+    return snapshot.mock
+
+
+# hooks installed on a mock's own class by `_track`
+_TRACKING_HOOKS = ('__call__', '__getattr__', '__setattr__', 'return_value')
+
+
+def _track(name, mocked):
+    # type: (str, Any) -> None
+    """
+    Arrange for `name` to be added to `_dirty` the first time `mocked` is
+    called, has an attribute set, has a child mock (or magic method) or its
+    `return_value` read, or has a magic method its factory configured used
+    or configured, and to `_called` the first time it is called.
+
+    Every mock has its own class, so we can hook it there. The hooks remove
+    themselves as soon as they fire (the `__call__` hook stays until the
+    mock is called), after that the mock runs at full speed.
+
+    Objects which aren't mocks can't be hooked, so we treat them as dirty
+    and check them in `get_called_mocks` regardless.
+    """
+    if not isinstance(mocked, mock.NonCallableMock):
+        _dirty.add(name)
+        _unobserved.add(name)
+        return
+    # (`Any`, we're setting methods on the class)
+    mock_type = type(mocked)  # type: Any
+    if mock_type.__dict__.get('_automock_path') == name:
+        # (a pooled mock which was not touched last time, still hooked)
+        return
+    # magic methods configured by the factory are mocks set on the class,
+    # so using or configuring them doesn't go through the hooks below
+    for child_name, child in mocked._mock_children.items():
+        if child_name[:2] == '__' and isinstance(child, mock.NonCallableMock):
+            _track_magic(name, child)
+    mock_type._automock_path = name
+    if isinstance(mocked, mock.CallableMixin):
+        mock_type.__call__ = _dirtying_call
+    mock_type.__getattr__ = _dirtying_getattr
+    mock_type.__setattr__ = _dirtying_setattr
+    # (a property of the class, so reading it, e.g. to configure an existing
+    # `return_value`, doesn't go through `__getattr__`)
+    mock_type.return_value = _dirtying_return_value
+
+
+def _track_magic(name, child):
+    # type: (str, Any) -> None
+    """
+    Arrange for `name` to be added to `_dirty` the first time the magic
+    method mock `child` is used or configured (but not to `_called`, the
+    mock it's configured on hasn't been called).
+    """
+    child_type = type(child)  # type: Any
+    child_type._automock_path = name
+    if isinstance(child, mock.CallableMixin):
+        child_type.__call__ = _dirtying_magic_call
+    child_type.__getattr__ = _dirtying_getattr
+    child_type.__setattr__ = _dirtying_setattr
+    child_type.return_value = _dirtying_return_value
+
+
+def _track_calls(name, mocked):
+    # type: (str, Any) -> None
+    """
+    Arrange for `name` to be added to `_called` the first time `mocked` is
+    called (for mocks which are already known to be dirty, e.g. swapped in).
+    """
+    if leaks.active is not None:
+        leaks.active.track(name, mocked)
+    if not isinstance(mocked, mock.CallableMixin):
+        if not isinstance(mocked, mock.NonCallableMock):
+            _unobserved.add(name)
+        return
+    mock_type = type(mocked)  # type: Any
+    mock_type._automock_path = name
+    mock_type.__call__ = _dirtying_call
+
+
+def _mark_dirty(mocked):
+    # type: (mock.NonCallableMock) -> None
+    mock_type = type(mocked)
+    type_dict = mock_type.__dict__
+    name = type_dict.get('_automock_path')
+    if name is None:
+        return
+    if type_dict.get('__call__') is _dirtying_call:
+        # (the call hook stays until the mock is called)
+        hooks = ('__getattr__', '__setattr__', 'return_value')  # type: Tuple[str, ...]
+    else:
+        # (nothing left to watch for)
+        hooks = ('_automock_path',) + _TRACKING_HOOKS
+    for attr in hooks:
+        if attr in type_dict:
+            delattr(mock_type, attr)
+    _dirty.add(name)
+
+
+def _mark_called(mocked):
+    # type: (mock.NonCallableMock) -> None
+    mock_type = type(mocked)
+    type_dict = mock_type.__dict__
+    name = type_dict.get('_automock_path')
+    if name is None:
+        return
+    for attr in ('_automock_path',) + _TRACKING_HOOKS:
+        if attr in type_dict:
+            delattr(mock_type, attr)
+    _dirty.add(name)
+    _called.add(name)
+
+
+def _dirtying_call(self, *args, **kwargs):
+    _mark_called(self)
+    return self(*args, **kwargs)
+
+
+def _dirtying_magic_call(self, *args, **kwargs):
+    _mark_dirty(self)
+    return self(*args, **kwargs)
+
+
+def _dirtying_getattr(self, name):
+    _mark_dirty(self)
+    return getattr(self, name)
+
+
+def _dirtying_setattr(self, name, value):
+    _mark_dirty(self)
+    setattr(self, name, value)
+
+
+_return_value = mock.NonCallableMock.return_value
+
+
+def _get_dirtying_return_value(self):
+    _mark_dirty(self)
+    return _return_value.__get__(self, type(self))
+
+
+def _set_dirtying_return_value(self, value):
+    _mark_dirty(self)
+    _return_value.__set__(self, value)
+
+
+_dirtying_return_value = property(_get_dirtying_return_value, _set_dirtying_return_value)
+
+
+def _restore_dirty(retrack=False):
+    # type: (bool) -> None
     """
+    Restore the pooled mocks which were touched since they were patched
+    (or last restored), the others are still in their freshly-built state.
+
     Kwargs:
-        func_path: import path to mock (as you would give to `mock.patch`)
-        factory: function that returns a mock for the patched func
+        retrack: hook the restored mocks again, for when they stay patched
+    """
+    dirty = list(_dirty)
+    _dirty.clear()
+    for name in dirty:
+        registration = _registry.get(name)
+        snapshot = None if registration is None else registration.snapshot
+        if snapshot is None:
+            if not retrack:
+                continue
+            if registration is not None and registration.patched and name in _unpooled:
+                # (not a mock, so a new one is patched in its place)
+                _repatch(registration)
+            else:
+                # can't be reset, so it stays dirty
+                _dirty.add(name)
+            continue
+        snapshot.restore()
+        _called.discard(name)
+        _unobserved.discard(name)
+        if retrack:
+            _track(name, snapshot.mock)
+
+
+def _repatch(registration):
+    # type: (Registration) -> None
+    config = _get_config()
+    _stop_patch(registration)
+    _called.discard(registration.path)
+    _unobserved.discard(registration.path)
+    _start_patch(
+        registration,
+        _get_factory(registration, reuse=True),
+        config.lazy_mocks,
+        config.patch_engine,
+        profiling.active,
+    )
+
+
+def _get_factory(registration, reuse=False):
+    # type: (Registration, bool) -> Callable
+    factory = _spec_factory(registration, _base_factory(registration))
+    if reuse or registration.reuse:
+        return partial(_get_pooled, registration, factory)
+    return factory
+
+
+def _timed_factory(profile, registration, factory):
+    # type: (profiling.Profile, Registration, Callable) -> Callable
+    return profile.wrap_factory(
+        registration.path, factory, registration.registered_in
+    )
+
+
+def _unwrap(mocked):
+    # type: (mock.Mock) -> mock.Mock
+    """
+    Returns:
+        the real mock behind a `LazyMock` placeholder (building it if
+        necessary), or `mocked` itself if it's not a placeholder
+    """
+    if isinstance(mocked, LazyMock):
+        return mocked._materialize()
+    return mocked
+
+
+_MISSING = object()
+
+
+class _Patch(object):
+    """
+    Minimal stand-in for a `mock.patch.object` patcher, used when
+    `PATCH_ENGINE` is 'builtin'.
+
+    Patching is just: remember the original attribute, set the new one, then
+    set the original back when stopped (or delete ours, if the original was
+    inherited rather than set directly on `owner`).
+    """
+
+    __slots__ = ('owner', 'attribute', 'original', 'current')
+
+    def __init__(self, owner, attribute, new):
+        # type: (Any, str, Any) -> None
+        self.owner = owner
+        self.attribute = attribute
+        self.original = _MISSING  # type: Any
+        self.current = new
+
+    def start(self):
+        # type: () -> Any
+        owner_dict = getattr(self.owner, '__dict__', None)
+        if owner_dict is not None:
+            self.original = owner_dict.get(self.attribute, _MISSING)
+        else:
+            self.original = getattr(self.owner, self.attribute)
+        setattr(self.owner, self.attribute, self.current)
+        return self.current
+
+    def stop(self):
+        # type: () -> None
+        if self.original is _MISSING:
+            delattr(self.owner, self.attribute)
+        else:
+            setattr(self.owner, self.attribute, self.original)
+
+
+_PATCH_ENGINES = {
+    'mock': mock.patch.object,
+    'builtin': _Patch,
+}  # type: Dict[str, Callable]
+
+
+def _get_patch_engine(name):
+    # type: (str) -> Callable
+    try:
+        return _PATCH_ENGINES[name]
+    except KeyError:
+        raise ValueError(
+            'Unknown AUTOMOCK_PATCH_ENGINE {!r}, expected one of: {}'.format(
+                name, ', '.join(sorted(_PATCH_ENGINES))
+            )
+        )
+
+
+class _Config(namedtuple('_Config', (
+    'registration_imports',
+    'registration_manifests',
+    'manifest_cache_dir',
+    'lazy_mocks',
+    'patch_engine',
+    'patch_on_import',
+    'context_overlays',
+    'swap_mock_templates',
+))):
+    """
+    The settings used when patching, read once from `settings`.
+    """
+    __slots__ = ()
+
+
+_config = None  # type: Optional[_Config]
+_config_source = None  # type: object
 
+
+def _get_config():
+    # type: () -> _Config
+    """
     Returns:
-        (decorator)
+        the current settings, only reading them from `settings` again if
+        its underlying config object has been replaced (which is what
+        happens under `override_settings`, or when settings are reloaded)
+    """
+    global _config, _config_source
+    source = settings.__wrapped__
+    if source is not _config_source or _config is None:
+        _config = _Config(
+            registration_imports=tuple(settings.REGISTRATION_IMPORTS),
+            registration_manifests=tuple(settings.REGISTRATION_MANIFESTS),
+            manifest_cache_dir=settings.MANIFEST_CACHE_DIR,
+            lazy_mocks=settings.LAZY_MOCKS,
+            patch_engine=_get_patch_engine(settings.PATCH_ENGINE),
+            # (the import hook only works with the Python 3 import machinery)
+            patch_on_import=settings.PATCH_ON_IMPORT and not six.PY2,
+            context_overlays=settings.CONTEXT_OVERLAYS and ContextVar is not None,
+            swap_mock_templates=settings.SWAP_MOCK_TEMPLATES,
+        )
+        _config_source = source
+    return _config
 
-    Usage:
 
-        automock.register('path.to.func.to.mock')  # default MagicMock
-        automock.register('path.to.func.to.mock', CustomMockFactory)
+class _ModulePatch(object):
+    """
+    Patches several attributes of a single module at once, used by the
+    'builtin' `PATCH_ENGINE` when patching all registered paths.
 
-        @automock.register('path.to.func.to.mock')
-        def custom_mock(result):
-            return mock.MagicMock(return_value=result)
+    The module's originals are snapshotted and the mocks applied with a
+    single `__dict__.update()`, and restored the same way when stopped.
     """
-    global _factory_map
-    _factory_map[func_path] = factory
 
-    def decorator(decorated_factory):
-        _factory_map[func_path] = decorated_factory
-        return decorated_factory
+    __slots__ = ('module', 'originals', 'current', 'has_missing')
+
+    def __init__(self, module):
+        # type: (ModuleType) -> None
+        self.module = module
+        self.originals = {}  # type: Dict[str, Any]
+        self.current = {}  # type: Dict[str, Any]
+        self.has_missing = False
+
+    def start(self):
+        # type: () -> Dict[str, Any]
+        module_dict = self.module.__dict__
+        self.originals = {
+            attribute: module_dict.get(attribute, _MISSING)
+            for attribute in self.current
+        }
+        # (attributes provided by a module-level `__getattr__`)
+        self.has_missing = _MISSING in self.originals.values()
+        module_dict.update(self.current)
+        return self.current
+
+    def stop(self):
+        # type: () -> None
+        module_dict = self.module.__dict__
+        module_dict.update(self.originals)
+        if self.has_missing:
+            for attribute, original in self.originals.items():
+                if original is _MISSING:
+                    del module_dict[attribute]
+
+    def stop_attribute(self, attribute):
+        # type: (str) -> None
+        """
+        Restore a single attribute, it won't be touched by `stop()` later.
+        """
+        original = self.originals.pop(attribute)
+        del self.current[attribute]
+        if original is _MISSING:
+            del self.module.__dict__[attribute]
+        else:
+            self.module.__dict__[attribute] = original
 
-    return decorator
 
+_PatchPlanEntry = Tuple[Registration, str, Callable, Callable]
+_PatchPlan = Tuple[
+    List[Tuple[ModuleType, Any, List[_PatchPlanEntry]]],
+    List[Tuple[Registration, Callable, Callable]],
+]
 
-def _pre_import():
+_patch_plan = None  # type: Optional[_PatchPlan]
+_patch_plan_version = None  # type: Optional[int]
+_active_patches = []  # type: List[Union[mock.mock._patch, _Patch, _ModulePatch]]
+
+
+def _get_patch_plan():
+    # type: () -> _PatchPlan
+    """
+    Registered paths grouped by the module they are patched on, so that the
+    'builtin' engine can patch each module in one go.
+
+    Returns:
+        [(module, module spec, [(registration, attribute, factory, pooled factory), ...]), ...],
+        [(registration, factory, pooled factory), ...] for paths not patched
+            directly on a module (e.g. methods of classes)
+
+    (cached until `register` is called again or one of the modules is
+    reloaded)
+    """
+    global _patch_plan, _patch_plan_version
+    if _patch_plan is not None and _patch_plan_version == _registry.version and all(
+        getattr(module, '__spec__', None) is spec
+        for module, spec, _ in _patch_plan[0]
+    ):
+        return _patch_plan
+
+    by_module = {}  # type: Dict[int, Tuple[ModuleType, Any, List[_PatchPlanEntry]]]
+    others = []
+    for registration in _registry:
+        target = _resolve_registration(registration)
+        pooled = _get_factory(registration, reuse=True)
+        factory = _get_factory(registration)
+        if isinstance(target.owner, ModuleType):
+            group = by_module.setdefault(
+                id(target.owner), (target.owner, target.spec, [])
+            )
+            group[2].append((registration, target.attribute, factory, pooled))
+        else:
+            others.append((registration, factory, pooled))
+    _patch_plan = (list(by_module.values()), others)
+    _patch_plan_version = _registry.version
+    return _patch_plan
+
+
+def _start_by_module(lazy, reuse, exclude=None):
+    # type: (bool, bool, Optional[FrozenSet[str]]) -> List[Tuple[Registration, Callable]]
+    """
+    Apply the module-level patches from the patch plan (except for paths
+    in `exclude`).
+
+    Returns:
+        (registration, factory) for the remaining paths, which need patching
+        individually
+    """
+    profile = profiling.active
+    detector = leaks.active
+    modules, others = _get_patch_plan()
+    for module, _, entries in modules:
+        patcher = _ModulePatch(module)
+        current = patcher.current
+        for registration, attribute, factory, pooled in entries:
+            name = registration.path
+            if exclude is not None and name in exclude:
+                continue
+            if reuse:
+                factory = pooled
+            if profile is not None:
+                factory = _timed_factory(profile, registration, factory)
+            if lazy:
+                mocked = LazyMock(name, factory)
+            else:
+                mocked = factory()
+                _track(name, mocked)
+                if detector is not None:
+                    detector.track(name, mocked)
+            current[attribute] = mocked
+            _registry.set_patched(registration, patcher, mocked)
+        patcher.start()
+        _active_patches.append(patcher)
+    return [
+        (registration, pooled if reuse else factory)
+        for registration, factory, pooled in others
+        if exclude is None or registration.path not in exclude
+    ]
+
+
+@profiling.timed('warm_up')
+def _warm_up():
     # type: () -> None
     """
-    Ensure that modules containing mock factories get imported so that their
-    calls to `register` are made.
+    Do the one-off work of `start_patching` up front: import the
+    registration modules and resolve every registered path (and group them
+    into the patch plan, for the 'builtin' engine).
 
-    (modules which are configured in `TEST_MOCK_FACTORY_MAP` do not need to
-    be pre-imported, only those which rely on `register`)
+    e.g. the pytest plugin calls this once per pytest-xdist worker, before
+    any tests run.
     """
-    for import_path in settings.REGISTRATION_IMPORTS:
-        import_module(import_path)
+    _pre_import()
+    config = _get_config()
+    if config.patch_on_import:
+        # (resolving would import the modules we're waiting for)
+        return
+    if config.patch_engine is _Patch:
+        _get_patch_plan()
+    else:
+        for registration in _registry:
+            _resolve_registration(registration)
 
 
-def start_patching(name=None):
-    # type: (Optional[str]) -> None
+# {module name: {path: (registration, factory, lazy, patch engine)}} for the
+# paths waiting for their module to be imported, see `PATCH_ON_IMPORT`
+_deferred = {}  # type: Dict[str, Dict[str, Tuple[Registration, Callable, bool, Callable]]]
+
+
+def _pending_module(import_path):
+    # type: (str) -> Optional[str]
+    """
+    Returns:
+        name of the first module along `import_path` which has not been
+        imported yet, or None if the path can be resolved without importing
+        anything
+    """
+    components = import_path.split('.')
+    owner_path = components[0]
+    owner = sys.modules.get(owner_path)
+    if owner is None:
+        return owner_path
+    for component in components[1:-1]:
+        owner_path += '.' + component
+        try:
+            owner = getattr(owner, component)
+        except AttributeError:
+            owner = sys.modules.get(owner_path)
+            if owner is None:
+                return owner_path
+    return None
+
+
+def _defer(module_name, registration, factory, lazy, patch):
+    # type: (str, Registration, Callable, bool, Callable) -> None
+    _deferred.setdefault(module_name, {})[registration.path] = (
+        registration, factory, lazy, patch,
+    )
+    _import_watcher.watched.add(module_name)
+    _import_watcher.install()
+
+
+@profiling.timed('patch_on_import')
+def _on_import(module_name):
+    # type: (str) -> None
+    """
+    Patch the deferred paths which were waiting for `module_name` to be
+    imported (or wait for the next module along their path).
+    """
+    _import_watcher.watched.discard(module_name)
+    entries = _deferred.pop(module_name, None)
+    if not _deferred:
+        _import_watcher.uninstall()
+    if not entries:
+        return
+    profile = profiling.active
+    for registration, factory, lazy, patch in entries.values():
+        pending = _pending_module(registration.path)
+        if pending is not None:
+            _defer(pending, registration, factory, lazy, patch)
+        else:
+            _start_patch(registration, factory, lazy, patch, profile)
+
+
+def _undefer(name):
+    # type: (str) -> bool
+    """
+    Returns:
+        whether `name` was waiting to be patched (it no longer is)
+    """
+    for module_name, entries in list(_deferred.items()):
+        if entries.pop(name, None) is not None:
+            if not entries:
+                del _deferred[module_name]
+                _import_watcher.watched.discard(module_name)
+            if not _deferred:
+                _import_watcher.uninstall()
+            return True
+    return False
+
+
+def _patch_deferred(name):
+    # type: (str) -> None
+    """
+    Import whatever `name` is waiting for, so that it gets patched now.
     """
-    Initiate mocking of the functions listed in `_factory_map`.
+    while True:
+        module_name = next(
+            (
+                module_name
+                for module_name, entries in _deferred.items()
+                if name in entries
+            ),
+            None,
+        )
+        if module_name is None:
+            return
+        import_module(module_name)
+
+
+_import_watcher = ImportWatcher(_on_import)
+
+
+def _is_patching():
+    # type: () -> bool
+    """
+    Returns:
+        whether anything is patched (or waiting to be, see `PATCH_ON_IMPORT`)
+        since the last `start_patching`, i.e. it hasn't been stopped
+    """
+    return bool(_registry.patched() or _deferred)
+
+
+def _check_registered(paths):
+    # type: (Iterable[str]) -> None
+    unknown = [path for path in paths if path not in _registry]
+    if unknown:
+        raise ValueError(
+            'Not registered with automock: {}'.format(', '.join(unknown))
+        )
+
+
+@profiling.timed('start_patching')
+def start_patching(name=None, reuse=False, only=None, exclude=None):
+    # type: (Optional[str], bool, Optional[Iterable[str]], Optional[Iterable[str]]) -> None
+    """
+    Initiate mocking of the registered functions.
 
     For this to work reliably all mocked helper functions should be imported
     and used like this:
@@ -98,59 +1192,282 @@ def start_patching(name=None):
 
     (i.e. don't use `from dp_paypal.client import x` import style)
 
+    Each path is only resolved via the import machinery the first time it
+    is patched (see `_resolve`), later calls patch the cached owner object
+    directly.
+
+    Patches are applied with `mock.patch.object`, or if `PATCH_ENGINE` is
+    'builtin' with our own lightweight patchers: paths are grouped by
+    module and each module is patched with a single `__dict__` update.
+
+    If `PATCH_ON_IMPORT` is enabled, paths in modules which haven't been
+    imported yet are not imported now: an import hook patches each of them
+    as soon as its module is imported (see `ImportWatcher`).
+
+    If `LAZY_MOCKS` is enabled the paths are patched with `LazyMock`
+    placeholders, so the factories are only called for mocks which a test
+    actually touches.
+
+    Paths registered with `reuse=True` are patched with the same pooled mock
+    every time, which `stop_patching` restores to its freshly-built state.
+
+    Each mock is tracked (see `_track`) so that we know which ones a test
+    actually used: only those need restoring or checking afterwards.
+
     Kwargs:
         name (Optional[str]): if given, only patch the specified path, else all
             defined default mocks
+        reuse (bool): patch every path as if it was registered with
+            `reuse=True`, so that `reset_mocks` can reset them between tests
+            without having to stop patching
+        only (Optional[Iterable[str]]): if given, only patch these paths
+        exclude (Optional[Iterable[str]]): if given, patch all paths except
+            these
     """
-    global _factory_map, _patchers, _mocks
-    if _patchers and name is None:
+    if _is_patching() and name is None:
         warnings.warn('start_patching() called again, already patched')
 
     _pre_import()
 
+    config = _get_config()
+    lazy = config.lazy_mocks
+    patch = config.patch_engine
+    defer = config.patch_on_import and name is None
+
+    if only is not None:
+        _check_registered(only)
+    if exclude:
+        _check_registered(exclude)
+        exclude = frozenset(exclude)
+    else:
+        exclude = None
+
     if name is not None:
-        factory = _factory_map[name]
-        items = [(name, factory)]
+        registration = _registry[name]
+        items = [
+            (registration, _get_factory(registration, reuse))
+        ]  # type: Iterable[Tuple[Registration, Callable]]
+    elif only is not None:
+        items = [
+            (_registry[path], _get_factory(_registry[path], reuse))
+            for path in only
+            if exclude is None or path not in exclude
+        ]
+    elif patch is _Patch and not defer:
+        items = _start_by_module(lazy, reuse, exclude)
+    elif exclude is not None:
+        items = (
+            (registration, _get_factory(registration, reuse))
+            for registration in _registry
+            if registration.path not in exclude
+        )
     else:
-        items = _factory_map.items()
+        items = (
+            (registration, _get_factory(registration, reuse))
+            for registration in _registry
+        )
 
-    for name, factory in items:
-        patcher = mock.patch(name, new=factory())
-        mocked = patcher.start()
-        _patchers[name] = patcher
-        _mocks[name] = mocked
+    profile = profiling.active
+    for registration, factory in items:
+        if defer and registration.target is None:
+            # (once resolved, its module has been imported)
+            pending = _pending_module(registration.path)
+            if pending is not None:
+                _defer(pending, registration, factory, lazy, patch)
+                continue
+        _start_patch(registration, factory, lazy, patch, profile)
+
+
+def _start_patch(registration,  # type: Registration
+                 factory,  # type: Callable
+                 lazy,  # type: bool
+                 patch,  # type: Callable
+                 profile,  # type: Optional[profiling.Profile]
+                 ):
+    # type: (...) -> None
+    name = registration.path
+    target = _resolve_registration(registration)
+    if profile is not None:
+        factory = _timed_factory(profile, registration, factory)
+    if lazy:
+        new = LazyMock(name, factory)
+    else:
+        new = factory()
+        _track(name, new)
+        if leaks.active is not None:
+            leaks.active.track(name, new)
+    patcher = patch(target.owner, target.attribute, new=new)
+    mocked = patcher.start()
+    _registry.set_patched(registration, patcher, mocked)
+    _active_patches.append(patcher)
 
 
+@profiling.timed('stop_patching')
 def stop_patching(name=None):
     # type: (Optional[str]) -> None
     """
     Finish the mocking initiated by `start_patching`
 
+    (only the pooled mocks which were touched during the test are restored)
+
     Kwargs:
         name (Optional[str]): if given, only unpatch the specified path, else all
             defined default mocks
     """
-    global _patchers, _mocks
-    if not _patchers:
+    if not _is_patching():
         warnings.warn('stop_patching() called again, already stopped')
 
     if name is not None:
-        items = [(name, _patchers[name])]
+        if _undefer(name):
+            return
+        registration = _registry[name]
+        if registration.patcher is None:
+            raise KeyError(name)
+        _stop_patch(registration)
+        return
+
+    for patcher in reversed(_active_patches):
+        patcher.stop()
+    del _active_patches[:]
+    _registry.clear_patched()
+    _called.clear()
+    _unobserved.clear()
+    _unpooled.clear()
+    _deferred.clear()
+    _import_watcher.watched.clear()
+    _import_watcher.uninstall()
+
+    _restore_dirty()
+
+
+def _stop_patch(registration):
+    # type: (Registration) -> None
+    patcher = registration.patcher
+    if registration.overlay_patcher is not None:
+        registration.overlay_patcher.stop()
+        _active_patches.remove(registration.overlay_patcher)
+    if isinstance(patcher, _ModulePatch):
+        patcher.stop_attribute(registration.target.attribute)
     else:
-        items = list(_patchers.items())
-
-    for name, patcher in items:
         patcher.stop()
-        del _patchers[name]
-        del _mocks[name]
+        _active_patches.remove(patcher)
+    _registry.set_unpatched(registration)
 
 
-class SwapMockContextDecorator(MultipleContextDecorator):
+def _check_leaks(test=None):
+    # type: (Optional[str]) -> List[leaks.Leak]
+    """
+    Report (to the active `LeakDetector`) the patches which haven't been
+    stopped and the mocks which are still alive, once nothing should be
+    patched any more.
+
+    Returns:
+        the leaks found
+    """
+    detector = leaks.active
+    if detector is None:
+        return []
+    patched = set(registration.path for registration in _registry.patched())
+    for entries in _deferred.values():
+        patched.update(entries)
+    kept = set()
+    for registration in _registry:
+        if registration.swaps or (
+            registration.overlay is not None and registration.overlay.get()
+        ):
+            # (a `swap_mock` which was never exited)
+            patched.add(registration.path)
+        if registration.snapshot is not None:
+            kept.add(id(registration.snapshot.mock))
+        for template in (registration.swap_templates or {}).values():
+            kept.add(id(template.snapshot.mock))
+    return detector.check(test, patched, kept)
+
+
+@profiling.timed('reset_mocks')
+def reset_mocks():
+    # type: () -> None
+    """
+    Restore the pooled mocks to their freshly-built state without stopping
+    patching, i.e. reset any per-test state between tests when patches are
+    kept in place for longer than a single test.
+
+    (only mocks patched with `reuse` are reset, see `start_patching`, those
+    whose factory doesn't return a mock can't be, so are patched again with
+    a new one)
+    """
+    _restore_dirty(retrack=True)
+
+
+class _SwapTemplate(object):
+    """
+    A mock built by `swap_mock` which is kept, with `SWAP_MOCK_TEMPLATES`,
+    for the next swap of the same path with the same args.
+    """
+
+    __slots__ = ('snapshot', 'in_use')
+
+    def __init__(self, snapshot):
+        # type: (MockSnapshot) -> None
+        self.snapshot = snapshot
+        self.in_use = False
+
+
+def _build_swap(registration, args, kwargs):
+    # type: (Registration, Tuple, Dict[str, Any]) -> Any
+    factory = _spec_factory(registration, _base_factory(registration))
+    profile = profiling.active
+    if profile is not None:
+        factory = _timed_factory(profile, registration, factory)
+    return factory(*args, **kwargs)
+
+
+def _build_swap_from_template(registration, args, kwargs):
+    # type: (Registration, Tuple, Dict[str, Any]) -> Tuple[Any, Optional[_SwapTemplate]]
+    """
+    Returns:
+        the mock to swap in, and the template it came from (if any), which
+        must be released with `_release_swap_template`
+    """
+    key = (args, tuple(sorted(kwargs.items())))
+    try:
+        hash(key)
+    except TypeError:
+        # (can't be cached)
+        return _build_swap(registration, args, kwargs), None
+
+    templates = registration.swap_templates
+    if templates is None:
+        templates = registration.swap_templates = {}
+    template = templates.get(key)
+    if template is None:
+        mocked = _build_swap(registration, args, kwargs)
+        try:
+            template = templates[key] = _SwapTemplate(MockSnapshot(mocked))
+        except TypeError:
+            # (the factory doesn't return a mock, so there's no way to
+            # restore it)
+            return mocked, None
+    elif template.in_use:
+        # (e.g. nested swaps with the same args)
+        return _build_swap(registration, args, kwargs), None
+    template.in_use = True
+    return template.snapshot.mock, template
+
+
+def _release_swap_template(template):
+    # type: (_SwapTemplate) -> None
+    template.snapshot.restore()
+    template.in_use = False
+
+
+class SwapMockContextDecorator(ContextDecorator, _AsyncContextMixin):
     """
     Temporarily replace one of our mocked functions with a new mock, using the
     configured mock factory (but generated with different args).
 
-    Use as a decorator or context manager.
+    Use as a decorator or context manager (including on `async def`
+    functions, and with `async with`).
 
     e.g. for a specific test, or part of a test, return a different result
 
@@ -164,78 +1481,143 @@ class SwapMockContextDecorator(MultipleContextDecorator):
 
     There's nothing to stop you using regular mock.patch instead, this is just a
     helper for making use of configured mock factory functions.
+
+    Nothing is imported or built until the swap is entered (i.e. for a
+    decorator, when the decorated function is called), and every entry
+    swaps in a new mock. With `SWAP_MOCK_TEMPLATES` enabled the mock built
+    for a path and args is kept, and restored to its freshly-built state
+    for the next swap with the same args (see `MockSnapshot`).
+
+    With `CONTEXT_OVERLAYS` enabled (and the path patched by automock) the
+    swap only applies to the current thread or asyncio task, see
+    `OverlayDispatcher`. Concurrent tasks should each enter their own
+    `swap_mock(...)`.
     """
 
     def __init__(self, _path, *args, **kwargs):
         # type (str, *object, **object) -> None
         """
         Kwargs:
-            _path: key in `_factory_map` dict of the method to swap mock for
+            _path: registered import path of the method to swap mock for
                 (should be an import path)
             *args, **kwargs: passed through to the mock factory used to generate
                 a replacement mock to swap in
         """
-        global _factory_map, _mocks
-
-        _pre_import()
-
-        factory = _factory_map[_path]
-        new_mock = factory(*args, **kwargs)
-        super(SwapMockContextDecorator, self).__init__(
-            mock.patch(_path, new=new_mock),
-            mock.patch.dict(_mocks, {_path: new_mock}),
-        )
-
+        self.path = _path
+        self.args = args
+        self.kwargs = kwargs
+        # (new mock, global patcher or None for a context overlay, template)
+        # for each (nested) entry
+        self._entries = []  # type: List[Tuple[Any, Any, Optional[_SwapTemplate]]]
+
+    @profiling.timed('swap_mock.enter')
     def __enter__(self):
         # type: () -> Callable
         """
-        Returns the context we care about, i.e. the result of the first patch,
-        which is the mocked object itself.
+        Returns the mock which was swapped in.
         """
-        super(SwapMockContextDecorator, self).__enter__()
-        return self[0]
+        _pre_import()
+        registration = _registry[self.path]
+        config = _get_config()
+        if config.swap_mock_templates:
+            new_mock, template = _build_swap_from_template(
+                registration, self.args, self.kwargs
+            )
+        else:
+            new_mock, template = _build_swap(registration, self.args, self.kwargs), None
+
+        _dirty.add(self.path)
+        _track_calls(self.path, new_mock)
+        if config.context_overlays and registration.patched:
+            _push_overlay(registration, new_mock)
+            self._entries.append((new_mock, None, template))
+            return new_mock
+        patcher = mock.patch(self.path, new=new_mock)
+        patcher.__enter__()
+        # (`get_mock` etc. see the swapped mock via `registration.swaps`)
+        registration.push_swap(new_mock)
+        self._entries.append((new_mock, patcher, template))
+        return new_mock
+
+    @profiling.timed('swap_mock.exit')
+    def __exit__(self, *args):
+        new_mock, patcher, template = self._entries.pop()
+        registration = _registry[self.path]
+        if patcher is None:
+            _pop_overlay(registration, new_mock)
+        else:
+            registration.pop_swap(new_mock)
+            patcher.__exit__(*args)
+        if template is not None:
+            _release_swap_template(template)
+
+    def __call__(self, f):
+        # type: (Callable) -> Callable
+        if aio is not None and aio.iscoroutinefunction(f):
+            return aio.with_context(self, f)
+
+        @wraps(f)
+        def decorator(*args, **kwargs):
+            with self:
+                return f(*args, **kwargs)
+
+        return decorator
 
 
 swap_mock = SwapMockContextDecorator
 
 
-class UnMockContextDecorator(object):
+class UnMockContextDecorator(_AsyncContextMixin):
     """
     Temporarily un-mock one of our mocked functions, to use the real
-    implementation, then replace with the default mock when done.
+    implementation, then put the mock back when done.
 
-    Use as a decorator or context manager.
+    Use as a decorator or context manager (including on `async def`
+    functions, and with `async with`).
 
     e.g. for a specific test, or part of a test:
 
         with unmock('services.paypalfees.helpers.user_has_billing_agreement') as restored:
             assert not isinstance(restored, mock.Mock)
             assert restored.__name__ == 'user_has_billing_agreement'
+
+    The path stays patched as far as automock is concerned: the original
+    recorded when the path was resolved is just set back in place of the
+    mock, and then the same mock is set back afterwards. So a mock from
+    `get_mock` is still the patched mock after un-mocking.
     """
 
     def __init__(self, name):
         # type: (str) -> None
         """
         Kwargs:
-            _path (str): key in `_factory_map` dict of the method to swap mock for
-                (should be an import path)
-            *args, **kwargs: passed through to the mock factory used to generate
-                a replacement mock to swap in
+            name (str): registered import path of the method to un-mock
         """
-        _pre_import()
         self.name = name
+        self._patches = []  # type: List[_Patch]
 
+    @profiling.timed('unmock.enter')
     def __enter__(self):
         # type: () -> Callable
         """
         Returns the restored function (calling code may still have a reference
-        to the mock even though we stopped patching the source path)
+        to the mock even though we un-patched the source path)
         """
-        stop_patching(self.name)
-        return _get_from_path(self.name)
-
+        _pre_import()
+        registration = _registry[self.name]
+        if not registration.patched and _deferred:
+            _patch_deferred(self.name)
+        if not registration.patched:
+            raise KeyError(self.name)
+        target = _resolve_registration(registration)
+        patch = _Patch(target.owner, target.attribute, target.raw)
+        patch.start()
+        self._patches.append(patch)
+        return target.original
+
+    @profiling.timed('unmock.exit')
     def __exit__(self, *args):
-        start_patching(self.name)
+        self._patches.pop().stop()
 
     def __call__(self, f):
         # type: (Callable) -> Callable
@@ -244,16 +1626,15 @@ class UnMockContextDecorator(object):
         function as an arg (in the same way that @mock.patch decorator does
         with mocked items)
         """
+        if aio is not None and aio.iscoroutinefunction(f):
+            return aio.with_context(self, f, pass_result=True)
+
         @wraps(f)
         def decorator(*args):
-            stop_patching(self.name)
-
-            restored = _get_from_path(self.name)
-            args += (restored,)
-            ret = f(*args)
-
-            start_patching(self.name)
-            return ret
+            # (the mock must be put back even if `f` fails, with a wider
+            # `--automock-scope` it stays patched for the following tests)
+            with self as restored:
+                return f(*(args + (restored,)))
 
         return decorator
 
@@ -261,52 +1642,172 @@ class UnMockContextDecorator(object):
 unmock = UnMockContextDecorator
 
 
+def _current_mock(registration):
+    # type: (Registration) -> Any
+    """
+    Returns:
+        the mock swapped in for the current context (see `CONTEXT_OVERLAYS`)
+        if there is one, else the swapped or patched mock, if any
+    """
+    if registration.overlay is not None:
+        swaps = registration.overlay.get()
+        if swaps:
+            return swaps[-1]
+    return registration.current_mock
+
+
 def get_mock(name):
     # type: (str) -> mock.Mock
     """
     Intended for use in test cases e.g. to check if/how a mock was called
 
-    Emphasises that `_mocks` is a private value. If you need to customise
+    Emphasises that `_registry` is a private value. If you need to customise
     mocks use the `swap_mock` helper where possible.
+
+    (if `LAZY_MOCKS` is enabled this will build the mock if the patched
+    function has not been touched yet, and with `PATCH_ON_IMPORT` this
+    imports its module if that hasn't happened yet)
+    """
+    registration = _registry[name]
+    if registration.mock is None and _deferred:
+        _patch_deferred(name)
+    mocked = _current_mock(registration)
+    if mocked is None:
+        raise KeyError(name)
+    mocked = _unwrap(mocked)
+    # (the caller is probably about to configure it)
+    _dirty.add(name)
+    return mocked
+
+
+def _call_counts(names):
+    # type: (Iterable[str]) -> Iterator[Tuple[str, Any, int]]
+    """
+    Yields:
+        (name, mock, call count) for those of `names` with a (built) mock
+    """
+    for name in names:
+        registration = _registry.get(name)
+        mocked = None if registration is None else _current_mock(registration)
+        if mocked is None:
+            continue
+        if isinstance(mocked, LazyMock):
+            if not mocked.materialized:
+                # never built, so can't have been called
+                continue
+            mocked = mocked._materialize()
+        yield name, mocked, getattr(mocked, 'call_count', 0)
+
+
+def call_checkpoint():
+    # type: () -> Dict[str, Tuple[Any, int]]
+    """
+    Returns:
+        a record of the calls made to the mocks so far, to pass as
+        `get_called_mocks(since=...)`
     """
-    return _mocks[name]
+    return {
+        name: (mocked, count)
+        for name, mocked, count in _call_counts(_called | _unobserved)
+    }
 
 
-def get_called_mocks():
-    # type: () -> Dict[str, mock.Mock]
+def get_called_mocks(since=None, more_than=0):
+    # type: (Optional[Dict[str, Tuple[Any, int]]], int) -> Dict[str, mock.Mock]
     """
     Intended for use in test cases e.g. to check if/how a mock was called
 
-    Emphasises that `_mocks` is a private value. If you need to customise
+    Emphasises that `_registry` is a private value. If you need to customise
     mocks use the `swap_mock` helper where possible.
+
+    (we keep track of which mocks have been called, so only those are
+    checked)
+
+    Kwargs:
+        since: a `call_checkpoint()`, only count the calls made after it
+        more_than: only return the mocks called more than this many times
     """
-    return {
-        name: mock
-        for name, mock in _mocks.items()
-        if mock.called
-    }
+    called = {}
+    for name, mocked, count in _call_counts(_called | _unobserved):
+        if since is not None:
+            previous = since.get(name)
+            if previous is not None and previous[0] is mocked:
+                count -= previous[1]
+        if count > more_than:
+            called[name] = mocked
+    return called
 
 
 class AutomockTestCaseMixin(object):
 
+    # which paths to patch (all of them by default), see `only_automocks`,
+    # `exclude_automocks` and `no_automock`
+    automock_only = None  # type: Optional[Tuple[str, ...]]
+    automock_exclude = None  # type: Optional[FrozenSet[str]]
+
     def setUp(self):
-        start_patching()
+        if self.automock_only != ():
+            start_patching(only=self.automock_only, exclude=self.automock_exclude)
         super(AutomockTestCaseMixin, self).setUp()
 
     def tearDown(self):
         super(AutomockTestCaseMixin, self).tearDown()
-        stop_patching()
+        if self.automock_only != ():
+            stop_patching()
+
+
+def only_automocks(*paths):
+    # type: (*str) -> Callable[[Type[AutomockTestCaseMixin]], Type[AutomockTestCaseMixin]]
+    """
+    Class decorator for `AutomockTestCaseMixin` test cases: only patch
+    `paths` for these tests.
+
+    (the pytest equivalent is `@pytest.mark.automock(only=[...])`)
+    """
+    def decorator(cls):
+        # type: (Type[AutomockTestCaseMixin]) -> Type[AutomockTestCaseMixin]
+        cls.automock_only = tuple(paths)
+        return cls
+    return decorator
+
+
+def exclude_automocks(*paths):
+    # type: (*str) -> Callable[[Type[AutomockTestCaseMixin]], Type[AutomockTestCaseMixin]]
+    """
+    Class decorator for `AutomockTestCaseMixin` test cases: patch
+    everything except `paths` for these tests.
+
+    (the pytest equivalent is `@pytest.mark.automock(exclude=[...])`)
+    """
+    def decorator(cls):
+        # type: (Type[AutomockTestCaseMixin]) -> Type[AutomockTestCaseMixin]
+        cls.automock_exclude = frozenset(paths)
+        return cls
+    return decorator
+
+
+def no_automock(cls):
+    # type: (Type[AutomockTestCaseMixin]) -> Type[AutomockTestCaseMixin]
+    """
+    Class decorator for `AutomockTestCaseMixin` test cases: don't patch
+    anything for these tests.
+
+    (the pytest equivalent is `@pytest.mark.no_automock`)
+    """
+    cls.automock_only = ()
+    return cls
 
 
 class AutomockTestCase(AutomockTestCaseMixin, TestCase):
     pass
 
 
-class ActivateContextDecorator(object):
+class ActivateContextDecorator(_AsyncContextMixin):
     """
     If you're not using the `AutomockTestCaseMixin` or the pytest plugin to
     automatically run all your tests with automocks patched, you can manually
-    enable automocking with this context-manager/decorator.
+    enable automocking with this context-manager/decorator (which also works
+    on `async def` functions, and with `async with`).
     """
 
     def __enter__(self):
@@ -323,6 +1824,9 @@ class ActivateContextDecorator(object):
 
     def __call__(self, f):
         # type: (Callable) -> Callable
+        if aio is not None and aio.iscoroutinefunction(f):
+            return aio.with_context(self, f)
+
         @wraps(f)
         def decorator(*args):
             start_patching()
@@ -0,0 +1,18 @@
+"""
+The mock library, as `six.moves.mock`: `unittest.mock`, or the `mock`
+backport under Python 2.
+
+(only imported once automock is used for more than `register`, so that
+importing `automock` stays cheap)
+"""
+from automock import _add_six_moves_mock
+_add_six_moves_mock()
+
+from six.moves import mock  # type: ignore  # noqa
+
+# the module defining mock's private helpers (e.g. `_check_signature`),
+# which the backport doesn't re-export from the package
+mock_internals = getattr(mock, 'mock', mock)
+
+
+__all__ = ('mock', 'mock_internals')
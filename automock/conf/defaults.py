@@ -11,3 +11,30 @@ APP_CONFIG = os.getenv('AUTOMOCK_APP_CONFIG', None)  # type: Optional[str]
 
 # import paths to modules containing `automock.register` calls
 REGISTRATION_IMPORTS = ()  # type: Iterable[str]
+
+# paths of .json or .toml manifest files declaring registrations, which are
+# loaded without importing anything (see `automock.manifest`)
+REGISTRATION_MANIFESTS = ()  # type: Iterable[str]
+
+# where compiled manifests are cached (None to not cache them)
+MANIFEST_CACHE_DIR = '.automock_cache'  # type: Optional[str]
+
+# patch with cheap placeholders that only call the mock factory when the
+# patched name is first called or has an attribute read
+LAZY_MOCKS = False  # type: bool
+
+# how patches are applied: 'mock' uses `mock.patch.object` patchers,
+# 'builtin' uses automock's own lightweight setattr-based patch records
+PATCH_ENGINE = 'mock'  # type: str
+
+# only patch registered paths in modules which have already been imported,
+# the others are patched as soon as their module is imported (Python 3 only)
+PATCH_ON_IMPORT = False  # type: bool
+
+# `swap_mock` only swaps the mock for the current thread / asyncio task
+# (its `contextvars` context) rather than for everything (Python 3.7+)
+CONTEXT_OVERLAYS = False  # type: bool
+
+# keep the mock `swap_mock` builds for each path and args, and restore it to
+# its freshly-built state for the next swap with the same args
+SWAP_MOCK_TEMPLATES = False  # type: bool
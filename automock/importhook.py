@@ -0,0 +1,93 @@
+import sys
+
+MYPY = False
+if MYPY:  # (type checking only, `typing` is slow to import)
+    from typing import Any, Callable, Optional, Set  # noqa
+
+
+class ImportWatcher(object):
+    """
+    A `sys.meta_path` finder which doesn't find anything itself: when one of
+    the `watched` modules is imported, it lets the other finders find it and
+    then calls `callback(module_name)` as soon as the module has finished
+    executing (i.e. before the import statement returns).
+
+    Usage:
+
+        watcher = ImportWatcher(on_import)
+        watcher.watched.add('services.paypal.client')
+        watcher.install()
+
+    (Python 3 only, the watcher is never consulted by the Python 2 import
+    machinery)
+    """
+
+    def __init__(self, callback):
+        # type: (Callable[[str], None]) -> None
+        self.callback = callback
+        self.watched = set()  # type: Set[str]
+
+    @property
+    def installed(self):
+        # type: () -> bool
+        return self in sys.meta_path
+
+    def install(self):
+        # type: () -> None
+        if not self.installed:
+            sys.meta_path.insert(0, self)
+
+    def uninstall(self):
+        # type: () -> None
+        if self.installed:
+            sys.meta_path.remove(self)
+
+    def find_spec(self, fullname, path, target=None):
+        # type: (str, Any, Any) -> Any
+        if fullname not in self.watched:
+            return None
+        for finder in sys.meta_path:
+            if finder is self:
+                continue
+            find_spec = getattr(finder, 'find_spec', None)
+            if find_spec is None:
+                continue
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+        if getattr(spec.loader, 'exec_module', None) is None:
+            # (e.g. a namespace package, nothing is executed so nothing for
+            # us to hook)
+            return spec
+        spec.loader = _NotifyingLoader(spec.loader, self.callback)
+        return spec
+
+
+class _NotifyingLoader(object):
+    """
+    Wraps a module's real loader, to call `callback` after executing it.
+    """
+
+    def __init__(self, loader, callback):
+        # type: (Any, Callable[[str], None]) -> None
+        self.loader = loader
+        self.callback = callback
+
+    def create_module(self, spec):
+        # type: (Any) -> Optional[Any]
+        create_module = getattr(self.loader, 'create_module', None)
+        return None if create_module is None else create_module(spec)
+
+    def exec_module(self, module):
+        # type: (Any) -> None
+        # (put the real loader back, it's the one reloads etc. should see)
+        module.__loader__ = self.loader
+        if getattr(module, '__spec__', None) is not None:
+            module.__spec__.loader = self.loader
+        self.loader.exec_module(module)
+        self.callback(module.__name__)
+
+    def __getattr__(self, name):
+        return getattr(self.loader, name)
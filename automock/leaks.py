@@ -0,0 +1,170 @@
+"""
+Optional detection of automock state which outlives the test that created
+it, e.g. for the pytest plugin's `--automock-leaks` report:
+
+- patches which are still applied when everything should have been stopped
+- mocks which are still referenced from somewhere once their test is over
+  (and with them everything recorded in their `call_args_list` etc.)
+
+Nothing is tracked unless `enable()` has been called, until then the
+instrumented code paths only check `active` and carry on.
+"""
+import gc
+import sys
+import weakref
+from collections import namedtuple
+from typing import Any, Dict, Iterable, List, Optional, Tuple  # noqa
+
+from automock.compat import mock
+
+
+Leak = namedtuple('Leak', ('test', 'path', 'kind', 'detail'))
+
+# (referrers which tell us nothing about who is holding on to a mock: its own
+# magic method proxies)
+_IGNORED_REFERRERS = ('MagicProxy',)
+
+
+def _describe(mocked):
+    # type: (Any) -> str
+    """
+    Returns:
+        what is keeping `mocked` alive, and how many calls it is holding on
+        to
+    """
+    # (nor do we, checking it)
+    ours = (sys._getframe(), sys._getframe(1))
+    referrers = sorted(set(
+        type(referrer).__name__
+        for referrer in gc.get_referrers(mocked)
+        if type(referrer).__name__ not in _IGNORED_REFERRERS
+        and not any(referrer is frame for frame in ours)
+    ))
+    detail = 'referenced by {}'.format(', '.join(referrers) or 'unknown')
+    if isinstance(mocked, mock.NonCallableMock):
+        detail += ', {} calls recorded'.format(len(mocked.mock_calls))
+    return detail
+
+
+class LeakDetector(object):
+    """
+    Keeps weak references to the mocks built while a test runs, so that
+    `check` can tell which of them are still alive after it.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.leaks = []  # type: List[Leak]
+        self.tests = 0
+        # {id(mock): (path, weakref)}
+        self._tracked = {}  # type: Dict[int, Tuple[str, Any]]
+
+    def track(self, path, mocked):
+        # type: (str, Any) -> None
+        """
+        Watch `mocked`, which was built for `path`, until the next `check`.
+        """
+        try:
+            ref = weakref.ref(mocked)
+        except TypeError:
+            # (e.g. a factory which returns a plain function or `None`)
+            return
+        self._tracked[id(mocked)] = (path, ref)
+
+    def check(self, test=None, patched=(), kept=()):
+        # type: (Optional[str], Iterable[str], Iterable[int]) -> List[Leak]
+        """
+        Record the leaks from the test which just finished, and start
+        afresh for the next one.
+
+        Kwargs:
+            test: id of the test, for the report
+            patched: paths which are still patched, though nothing should be
+            kept: ids of mocks which are meant to outlive the test (pooled
+                mocks and `swap_mock` templates)
+
+        Returns:
+            the leaks found
+        """
+        self.tests += 1
+        patched = set(patched)
+        found = [
+            Leak(test, path, 'patch', 'still patched') for path in sorted(patched)
+        ]
+        tracked, self._tracked = self._tracked, {}
+        kept = set(kept)
+        gc.collect()
+        for key, (path, ref) in sorted(tracked.items(), key=lambda item: item[1][0]):
+            if path in patched:
+                # (kept alive by the patch, which we've reported already)
+                continue
+            mocked = ref()
+            if mocked is None or key in kept:
+                continue
+            found.append(Leak(test, path, 'mock', _describe(mocked)))
+            del mocked
+        self.leaks.extend(found)
+        return found
+
+    def to_dict(self):
+        # type: () -> Dict[str, Any]
+        return {
+            'tests': self.tests,
+            'leaks': [leak._asdict() for leak in self.leaks],
+        }
+
+    def merge(self, data):
+        # type: (Dict[str, Any]) -> None
+        """
+        Add the leaks from another detector's `to_dict()` to this one, e.g.
+        one sent back by a pytest-xdist worker.
+        """
+        self.tests += data['tests']
+        self.leaks.extend(Leak(**leak) for leak in data['leaks'])
+
+    def summary(self, top=20):
+        # type: (int) -> List[str]
+        """
+        Returns:
+            lines of a human-readable report, listing the first `top` leaks
+        """
+        patches = sum(1 for leak in self.leaks if leak.kind == 'patch')
+        lines = [
+            'automock leaks: {} patches never stopped, {} mocks outlived '
+            'their test, in {} tests'.format(
+                patches, len(self.leaks) - patches, self.tests
+            ),
+        ]
+        for leak in self.leaks[:top]:
+            lines.append('  {:<5} {}  ({}) in {}'.format(
+                leak.kind, leak.path, leak.detail, leak.test
+            ))
+        if len(self.leaks) > top:
+            lines.append('  ... and {} more'.format(len(self.leaks) - top))
+        return lines
+
+
+active = None  # type: Optional[LeakDetector]
+
+
+def enable():
+    # type: () -> LeakDetector
+    """
+    Start tracking into a new `LeakDetector`.
+    """
+    global active
+    active = LeakDetector()
+    return active
+
+
+def disable():
+    # type: () -> Optional[LeakDetector]
+    """
+    Stop tracking.
+
+    Returns:
+        the detector used since `enable()`
+    """
+    global active
+    detector, active = active, None
+    return detector
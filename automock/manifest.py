@@ -0,0 +1,162 @@
+"""
+Declarative registrations: a manifest file listing the paths to patch and,
+as import paths, the factories to patch them with. e.g. in JSON:
+
+    {
+        "mocks": [
+            {"path": "services.users.client.get_user"},
+            {
+                "path": "services.paypal.client.charge",
+                "factory": "services.paypal.test_mocks.charge_mock",
+                "reuse": true
+            }
+        ]
+    }
+
+or the same in TOML (Python 3.11+, or with `tomli` installed):
+
+    [[mocks]]
+    path = "services.users.client.get_user"
+
+    [[mocks]]
+    path = "services.paypal.client.charge"
+    factory = "services.paypal.test_mocks.charge_mock"
+    reuse = true
+
+Unlike `REGISTRATION_IMPORTS`, loading a manifest doesn't import anything:
+each factory's module is only imported when its first mock is built.
+
+The manifest is compiled (parsed and validated) once, into an index cached
+on disk and keyed by a hash of the file's contents, so loading it again is
+just a file read.
+"""
+import hashlib
+import json
+import marshal
+import os
+import sys
+from collections import namedtuple
+from typing import Any, Dict, Optional, Tuple  # noqa
+
+import six
+
+
+__all__ = ('Entry', 'compile_manifest', 'load_manifest')
+
+
+Entry = namedtuple('Entry', ('path', 'factory', 'reuse', 'autospec'))
+
+# {field: (types, default)}
+_FIELDS = {
+    'path': (six.string_types, None),
+    'factory': (six.string_types, None),
+    'reuse': (bool, False),
+    'autospec': (bool, False),
+}  # type: Dict[str, Tuple[Any, Any]]
+
+# bump when `Entry` changes, (and `marshal`'s format depends on the Python
+# version) so that old cached indexes are never read
+_INDEX_VERSION = 1
+_CACHE_SALT = '{}:{}.{}'.format(_INDEX_VERSION, *sys.version_info[:2]).encode('ascii')
+
+
+def _parse(manifest_path, content):
+    # type: (str, bytes) -> Any
+    text = content.decode('utf-8')
+    if manifest_path.endswith('.toml'):
+        try:
+            import tomllib  # (Python 3.11+)
+        except ImportError:
+            try:
+                import tomli as tomllib  # type: ignore
+            except ImportError:
+                raise ValueError(
+                    'Reading {} needs Python 3.11+ or tomli '
+                    '(pip install automock[toml])'.format(manifest_path)
+                )
+        return tomllib.loads(text)
+    return json.loads(text)
+
+
+def compile_manifest(data, manifest_path='<manifest>'):
+    # type: (Any, str) -> Tuple[Entry, ...]
+    """
+    Validate a parsed manifest.
+
+    Returns:
+        its entries, with defaults filled in
+
+    Raises:
+        ValueError: if the manifest isn't valid
+    """
+    def invalid(message):
+        return ValueError('Invalid automock manifest {}: {}'.format(manifest_path, message))
+
+    if not isinstance(data, dict) or not isinstance(data.get('mocks'), list):
+        raise invalid('expected a "mocks" list')
+    entries = []
+    for i, item in enumerate(data['mocks']):
+        if not isinstance(item, dict):
+            raise invalid('mocks[{}] is not a mapping'.format(i))
+        unknown = sorted(set(item) - set(_FIELDS))
+        if unknown:
+            raise invalid('mocks[{}] has unknown keys: {}'.format(i, ', '.join(unknown)))
+        if 'path' not in item:
+            raise invalid('mocks[{}] has no "path"'.format(i))
+        values = {}
+        for field, (types, default) in _FIELDS.items():
+            value = item.get(field, default)
+            if value is not None and not isinstance(value, types):
+                raise invalid('mocks[{}].{} is {!r}'.format(i, field, value))
+            values[field] = value
+        entries.append(Entry(**values))
+    return tuple(entries)
+
+
+def _read_index(index_path):
+    # type: (str) -> Optional[Tuple[Entry, ...]]
+    try:
+        with open(index_path, 'rb') as f:
+            return tuple(Entry(*entry) for entry in marshal.load(f))
+    except (IOError, OSError, EOFError, ValueError, TypeError):
+        # (not cached yet, or unreadable: compile it again)
+        return None
+
+
+def _write_index(index_path, entries):
+    # type: (str, Tuple[Entry, ...]) -> None
+    tmp_path = '{}.{}.tmp'.format(index_path, os.getpid())
+    try:
+        if not os.path.isdir(os.path.dirname(index_path)):
+            os.makedirs(os.path.dirname(index_path))
+        with open(tmp_path, 'wb') as f:
+            marshal.dump(tuple(tuple(entry) for entry in entries), f)
+        # (atomic, so concurrent test processes never read half an index)
+        os.rename(tmp_path, index_path)
+    except (IOError, OSError):
+        # (e.g. a read-only checkout, we just don't get the cache)
+        pass
+
+
+def load_manifest(manifest_path, cache_dir=None):
+    # type: (str, Optional[str]) -> Tuple[Entry, ...]
+    """
+    Kwargs:
+        manifest_path: path of a .json or .toml manifest
+        cache_dir: where to cache the compiled index (not cached if None)
+
+    Returns:
+        the manifest's entries
+    """
+    with open(manifest_path, 'rb') as f:
+        content = f.read()
+    if cache_dir is None:
+        return compile_manifest(_parse(manifest_path, content), manifest_path)
+
+    key = hashlib.sha1(_CACHE_SALT + content).hexdigest()
+    index_path = os.path.join(cache_dir, 'manifest-{}.marshal'.format(key))
+    entries = _read_index(index_path)
+    if entries is None:
+        entries = compile_manifest(_parse(manifest_path, content), manifest_path)
+        _write_index(index_path, entries)
+    return entries
@@ -0,0 +1,253 @@
+"""
+Optional instrumentation of the time spent in automock itself, e.g. for the
+pytest plugin's `--automock-profile` report.
+
+Nothing is recorded unless `enable()` has been called, until then the
+instrumented code paths only check `active` and carry on.
+"""
+from collections import defaultdict
+from functools import wraps
+from timeit import default_timer as clock
+from typing import Any, Callable, Dict, List, Optional  # noqa
+
+
+class Profile(object):
+    """
+    Accumulated timings, in seconds.
+
+    Timed sections can be nested (e.g. `start_patching` calls the mock
+    factories), each one records its inclusive time but only the outermost
+    ones count towards `total`, so nothing is counted twice.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self.total = 0.0
+        self.tests = 0
+        self.sections = defaultdict(lambda: [0, 0.0])  # type: Dict[str, List]
+        self.factories = defaultdict(lambda: [0, 0.0])  # type: Dict[str, List]
+        self.factory_modules = {}  # type: Dict[str, Optional[str]]
+        self.imports = defaultdict(float)  # type: Dict[str, float]
+        # per-worker totals, when merged from pytest-xdist workers
+        self.workers = {}  # type: Dict[str, Dict[str, Any]]
+        self._depth = 0
+
+    def start(self):
+        # type: () -> float
+        self._depth += 1
+        return clock()
+
+    def _stop(self, started):
+        # type: (float) -> float
+        elapsed = clock() - started
+        self._depth -= 1
+        if self._depth == 0:
+            self.total += elapsed
+        return elapsed
+
+    def stop(self, section, started):
+        # type: (str, float) -> None
+        stats = self.sections[section]
+        stats[0] += 1
+        stats[1] += self._stop(started)
+
+    def stop_factory(self, path, module, started):
+        # type: (str, Optional[str], float) -> None
+        stats = self.factories[path]
+        stats[0] += 1
+        stats[1] += self._stop(started)
+        self.factory_modules[path] = module
+
+    def stop_import(self, module, started):
+        # type: (str, float) -> None
+        self.imports[module] += self._stop(started)
+
+    def wrap_factory(self, path, factory, module):
+        # type: (str, Callable, Optional[str]) -> Callable
+        """
+        Returns:
+            `factory`, timed under `path` (and attributed to `module`, the
+            registration module the factory was defined in)
+        """
+        def timed_factory(*args, **kwargs):
+            started = self.start()
+            try:
+                return factory(*args, **kwargs)
+            finally:
+                self.stop_factory(path, module, started)
+        return timed_factory
+
+    def module_totals(self):
+        # type: () -> Dict[str, Dict[str, float]]
+        """
+        Returns:
+            time spent importing each registration module and calling the
+            factories defined in it
+        """
+        totals = defaultdict(
+            lambda: {'import': 0.0, 'factories': 0.0}
+        )  # type: Dict[str, Dict[str, float]]
+        for module, seconds in self.imports.items():
+            totals[module]['import'] += seconds
+        for path, (_, seconds) in self.factories.items():
+            module = self.factory_modules.get(path) or '<unknown>'
+            totals[module]['factories'] += seconds
+        return dict(totals)
+
+    def to_dict(self):
+        # type: () -> Dict[str, Any]
+        return {
+            'total_seconds': self.total,
+            'tests': self.tests,
+            'sections': {
+                section: {'calls': calls, 'seconds': seconds}
+                for section, (calls, seconds) in self.sections.items()
+            },
+            'factories': {
+                path: {
+                    'calls': calls,
+                    'seconds': seconds,
+                    'module': self.factory_modules.get(path),
+                }
+                for path, (calls, seconds) in self.factories.items()
+            },
+            'imports': dict(self.imports),
+            'modules': self.module_totals(),
+            'workers': self.workers,
+        }
+
+    def merge(self, data, worker=None):
+        # type: (Dict[str, Any], Optional[str]) -> None
+        """
+        Add the timings from another profile's `to_dict()` to this one,
+        e.g. one sent back by a pytest-xdist worker.
+
+        Kwargs:
+            data: the other profile's `to_dict()`
+            worker: id of the worker `data` came from, its own totals are
+                kept in `workers`
+        """
+        self.total += data['total_seconds']
+        self.tests += data['tests']
+        for section, stats in data['sections'].items():
+            totals = self.sections[section]
+            totals[0] += stats['calls']
+            totals[1] += stats['seconds']
+        for path, stats in data['factories'].items():
+            totals = self.factories[path]
+            totals[0] += stats['calls']
+            totals[1] += stats['seconds']
+            self.factory_modules[path] = stats['module']
+        for module, seconds in data['imports'].items():
+            self.imports[module] += seconds
+        self.workers.update(data.get('workers', {}))
+        if worker is not None:
+            self.workers[worker] = {
+                'total_seconds': data['total_seconds'],
+                'tests': data['tests'],
+            }
+
+    def summary(self, top=10):
+        # type: (int) -> List[str]
+        """
+        Returns:
+            lines of a human-readable report, listing the `top` slowest
+            factories and registration modules
+        """
+        per_test = self.total / self.tests if self.tests else 0.0
+        lines = [
+            'automock overhead: {:.3f}s total, {} tests, {:.3f}ms per test'.format(
+                self.total, self.tests, per_test * 1000
+            ),
+        ]
+        if self.workers:
+            worker_totals = [
+                worker['total_seconds'] for worker in self.workers.values()
+            ]
+            lines.append(
+                '  across {} workers: {:.3f}s mean, {:.3f}s max per worker'.format(
+                    len(worker_totals),
+                    sum(worker_totals) / len(worker_totals),
+                    max(worker_totals),
+                )
+            )
+        for section, (calls, seconds) in sorted(self.sections.items()):
+            lines.append('  {:<16} {:10.3f}ms {:>8} calls'.format(
+                section, seconds * 1000, calls
+            ))
+
+        factories = sorted(
+            self.factories.items(), key=lambda item: item[1][1], reverse=True
+        )[:top]
+        if factories:
+            lines.append('slowest factories:')
+        for path, (calls, seconds) in factories:
+            lines.append('  {:10.3f}ms {:8.3f}ms avg {:>8} calls  {}'.format(
+                seconds * 1000, seconds * 1000 / calls, calls, path
+            ))
+
+        modules = sorted(
+            self.module_totals().items(),
+            key=lambda item: item[1]['import'] + item[1]['factories'],
+            reverse=True,
+        )[:top]
+        if modules:
+            lines.append('most expensive registration modules:')
+        for module, times in modules:
+            lines.append(
+                '  {:10.3f}ms (import {:.3f}ms, factories {:.3f}ms)  {}'.format(
+                    (times['import'] + times['factories']) * 1000,
+                    times['import'] * 1000,
+                    times['factories'] * 1000,
+                    module,
+                )
+            )
+        return lines
+
+
+active = None  # type: Optional[Profile]
+
+
+def enable():
+    # type: () -> Profile
+    """
+    Start recording into a new `Profile`.
+    """
+    global active
+    active = Profile()
+    return active
+
+
+def disable():
+    # type: () -> Optional[Profile]
+    """
+    Stop recording.
+
+    Returns:
+        the profile recorded since `enable()`
+    """
+    global active
+    profile, active = active, None
+    return profile
+
+
+def timed(section):
+    # type: (str) -> Callable[[Callable], Callable]
+    """
+    Decorator: record the time spent in the decorated function under
+    `section`, when profiling is enabled.
+    """
+    def decorator(f):
+        # type: (Callable) -> Callable
+        @wraps(f)
+        def wrapper(*args, **kwargs):
+            profile = active
+            if profile is None:
+                return f(*args, **kwargs)
+            started = profile.start()
+            try:
+                return f(*args, **kwargs)
+            finally:
+                profile.stop(section, started)
+        return wrapper
+    return decorator
@@ -1,9 +1,273 @@
+import json
+from typing import FrozenSet, Optional, Tuple  # noqa
+
+import pytest
+
 import automock
+from automock import leaks, profiling
+from automock.base import _check_leaks, _is_patching, _warm_up
+
+
+SCOPES = ('session', 'module', 'class', 'function')
+
+_NOT_PATCHED = object()
+
+# (only, exclude) arguments for `start_patching`
+ALL = (None, None)
+NONE = ((), None)
+
+
+def pytest_addoption(parser):
+    group = parser.getgroup('automock')
+    group.addoption(
+        '--automock-scope',
+        choices=SCOPES,
+        default=None,
+        help=(
+            'how long automock patches stay applied for (default: function). '
+            'With a wider scope the mocks are reset between tests instead of '
+            'being re-patched (except those whose factory doesn\'t return a '
+            'mock, e.g. an autospecced function, which can\'t be reset).'
+        ),
+    )
+    group.addoption(
+        '--automock-profile',
+        nargs='?',
+        const='automock-profile.json',
+        default=None,
+        metavar='PATH',
+        help=(
+            'time the overhead of automock patching, print a summary at the '
+            'end of the run and write a JSON report to PATH '
+            '(default: automock-profile.json)'
+        ),
+    )
+    group.addoption(
+        '--automock-leaks',
+        action='store_true',
+        default=False,
+        help=(
+            'report automock patches which were never stopped, and mocks '
+            'which are still referenced after their test, at the end of the run'
+        ),
+    )
+    parser.addini(
+        'automock_scope',
+        help='default for --automock-scope',
+        default='function',
+    )
+
+
+def get_selection(item):
+    # type: (pytest.Item) -> Tuple[Optional[Tuple[str, ...]], Optional[FrozenSet[str]]]
+    """
+    Returns:
+        (only, exclude) paths to patch for `item`, from its `automock` or
+        `no_automock` markers (`no_automock` anywhere above the test wins,
+        otherwise the closest `automock` marker)
+    """
+    if item.get_closest_marker('no_automock') is not None:
+        return NONE
+    marker = item.get_closest_marker('automock')
+    if marker is None:
+        return ALL
+    only = marker.kwargs.get('only')
+    exclude = marker.kwargs.get('exclude')
+    return (
+        None if only is None else tuple(only),
+        frozenset(exclude) if exclude else None,
+    )
+
+
+def _selection(item):
+    # type: (pytest.Item) -> Tuple[Optional[Tuple[str, ...]], Optional[FrozenSet[str]]]
+    selection = getattr(item, '_automock_selection', None)
+    if selection is None:
+        # (not collected in the usual way)
+        selection = item._automock_selection = get_selection(item)
+    return selection
+
+
+class PatchScope(object):
+    """
+    Keeps the automocks patched for the configured scope, e.g. for a whole
+    module of tests, and only resets per-test mock state in between tests.
+    """
+
+    def __init__(self, scope):
+        # type: (str) -> None
+        if scope not in SCOPES:
+            raise pytest.UsageError(
+                'Invalid automock_scope {!r}, expected one of: {}'.format(
+                    scope, ', '.join(SCOPES)
+                )
+            )
+        self.scope = scope
+        self.patched_key = _NOT_PATCHED  # type: object
+
+    def key(self, item):
+        # type: (pytest.Item) -> object
+        """
+        Returns:
+            an object identifying the scope `item` belongs to, consecutive
+            tests with the same key (and the same selection of paths to
+            patch) share patches
+        """
+        if self.scope == 'session':
+            key = None  # type: object
+        elif self.scope == 'module':
+            key = item.getparent(pytest.Module)
+        elif self.scope == 'class':
+            key = item.getparent(pytest.Class) or item.getparent(pytest.Module)
+        else:
+            key = item
+        return key, _selection(item)
+
+    def setup(self, item):
+        # type: (pytest.Item) -> None
+        only, exclude = _selection(item)
+        if self.scope == 'function':
+            if only != ():
+                automock.start_patching(only=only, exclude=exclude)
+            return
+
+        key = self.key(item)
+        if key == self.patched_key and _is_patching():
+            # already patched, mocks were reset after the previous test
+            # (unless e.g. an `AutomockTestCase` or `@automock.activate()`
+            # test stopped all patching when it finished)
+            return
+        self.finish()
+        if only != ():
+            automock.start_patching(reuse=True, only=only, exclude=exclude)
+            self.patched_key = key
+
+    def teardown(self, item, nextitem):
+        # type: (pytest.Item, pytest.Item) -> None
+        if self.scope == 'function':
+            if _selection(item)[0] != ():
+                automock.stop_patching()
+        elif nextitem is None or self.key(nextitem) != self.patched_key:
+            self.finish()
+        else:
+            automock.reset_mocks()
+
+    def finish(self):
+        # type: () -> None
+        if self.patched_key is not _NOT_PATCHED:
+            if _is_patching():
+                automock.stop_patching()
+            self.patched_key = _NOT_PATCHED
+
+
+class LeakCheck(object):
+    """
+    Checks for leaks once a test is completely finished with, i.e. after the
+    fixtures (and `TestCase` instances) which may legitimately hold on to
+    its mocks have been released.
+    """
+
+    def __init__(self, config):
+        self.config = config
+
+    def pytest_runtest_logfinish(self, nodeid, location):
+        if self.config._automock_scope.patched_key is _NOT_PATCHED:
+            # (with a wider scope, only once the patches have been stopped)
+            _check_leaks(nodeid)
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        'markers',
+        'automock(only=None, exclude=None): only patch the automocks listed '
+        'in `only`, or patch all of them except those in `exclude`',
+    )
+    config.addinivalue_line('markers', 'no_automock: don\'t patch any automocks')
+
+    scope = config.getoption('automock_scope') or config.getini('automock_scope')
+    config._automock_scope = PatchScope(scope)
+    if config.getoption('automock_profile'):
+        profiling.enable()
+    if config.getoption('automock_leaks'):
+        leaks.enable()
+        config.pluginmanager.register(LeakCheck(config), 'automock-leak-check')
+
+
+def pytest_unconfigure(config):
+    if config.getoption('automock_profile'):
+        profiling.disable()
+    if config.getoption('automock_leaks'):
+        leaks.disable()
+
+
+def pytest_collection_modifyitems(items):
+    # resolve the markers once up front, rather than for every test run
+    for item in items:
+        item._automock_selection = get_selection(item)
 
 
 def pytest_runtest_setup(item):
-    automock.start_patching()
+    if profiling.active is not None:
+        profiling.active.tests += 1
+    item.config._automock_scope.setup(item)
+
+
+def pytest_runtest_teardown(item, nextitem):
+    item.config._automock_scope.teardown(item, nextitem)
+
+
+def _is_xdist_worker(config):
+    return hasattr(config, 'workerinput')
+
+
+def pytest_sessionstart(session):
+    if _is_xdist_worker(session.config):
+        # every worker process has its own registry to set up, get that
+        # out of the way before the first test
+        _warm_up()
+
+
+def pytest_sessionfinish(session):
+    # (in case the session was interrupted before the last teardown)
+    scope = getattr(session.config, '_automock_scope', None)
+    if scope is not None:
+        scope.finish()
+
+    if _is_xdist_worker(session.config) and profiling.active is not None:
+        # sent back to the controller, see `pytest_testnodedown`
+        session.config.workeroutput['automock_profile'] = profiling.active.to_dict()
+    if _is_xdist_worker(session.config) and leaks.active is not None:
+        session.config.workeroutput['automock_leaks'] = leaks.active.to_dict()
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """
+    (pytest-xdist controller) merge the worker's stats into our report
+    """
+    data = getattr(node, 'workeroutput', {}).get('automock_profile')
+    if data is not None and profiling.active is not None:
+        profiling.active.merge(data, worker=node.workerinput['workerid'])
+    data = getattr(node, 'workeroutput', {}).get('automock_leaks')
+    if data is not None and leaks.active is not None:
+        leaks.active.merge(data)
+
+
+def pytest_terminal_summary(terminalreporter, config):
+    detector = leaks.active
+    if detector is not None and not _is_xdist_worker(config):
+        terminalreporter.write_sep('-', 'automock leaks')
+        for line in detector.summary():
+            terminalreporter.write_line(line)
 
+    path = config.getoption('automock_profile')
+    profile = profiling.active
+    if not path or profile is None or _is_xdist_worker(config):
+        return
+    terminalreporter.write_sep('-', 'automock profile')
+    for line in profile.summary():
+        terminalreporter.write_line(line)
 
-def pytest_runtest_teardown(item):
-    automock.stop_patching()
+    with open(path, 'w') as f:
+        json.dump(profile.to_dict(), f, indent=2, sort_keys=True)
+    terminalreporter.write_line('automock profile written to {}'.format(path))
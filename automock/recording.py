@@ -0,0 +1,171 @@
+"""
+Policies limiting the calls recorded by mocks, see `register(record=...)`.
+
+(the policies are created at registration time, by `import automock`, so the
+mock library isn't imported until one is applied)
+"""
+from abc import ABCMeta, abstractmethod
+
+MYPY = False
+if MYPY:  # (type checking only, `typing` is slow to import)
+    from typing import Any, List, Optional, Set  # noqa
+
+    from automock.compat import mock as mock_types  # noqa
+
+
+__all__ = ('RecordCount', 'RecordLast', 'RecordSample')
+
+
+def _call_lists(mocked):
+    # type: (mock_types.NonCallableMock) -> List[List]
+    """
+    Returns:
+        the lists a call to `mocked` is recorded in: its own `call_args_list`
+        and `mock_calls`, the `mock_calls` of each of its parents and the
+        `method_calls` of each of the mocks it is an attribute of
+    """
+    lists = [
+        mocked.__dict__['_mock_call_args_list'],
+        mocked.__dict__['_mock_mock_calls'],
+    ]
+    parent = mocked._mock_new_parent
+    while parent is not None:
+        lists.append(parent.__dict__['_mock_mock_calls'])
+        parent = parent._mock_new_parent
+    parent = mocked._mock_parent
+    while parent is not None:
+        lists.append(parent.__dict__['method_calls'])
+        parent = parent._mock_parent
+    return lists
+
+
+class _RecordingPolicy(object):
+    """
+    Limits how many calls a mock (and its child mocks) keep in
+    `call_args_list`, `mock_calls` and `method_calls`.
+
+    `called`, `call_count` and `call_args` are always kept up to date, so
+    `assert_called_once_with` etc. keep working, the others (e.g.
+    `assert_any_call`, `assert_has_calls`) only see the calls retained.
+    """
+
+    __metaclass__ = ABCMeta
+
+    __slots__ = ()
+
+    @abstractmethod
+    def trim(self, mocked, lists, lengths):
+        # type: (mock_types.NonCallableMock, List[List], List[int]) -> None
+        """
+        Called straight after each call to `mocked` is recorded.
+
+        Kwargs:
+            mocked: the mock that was called
+            lists: where the call was recorded (see `_call_lists`)
+            lengths: the length of each of `lists` before the call
+        """
+        pass
+
+    def apply(self, mocked, _visited=None):
+        # type: (Any, Optional[Set[int]]) -> None
+        """
+        Limit the calls recorded by `mocked` and its child mocks, including
+        any created later. Anything other than a mock is left as-is.
+        """
+        from automock.compat import mock
+        if not isinstance(mocked, mock.NonCallableMock):
+            return
+        if _visited is None:
+            _visited = set()
+        if id(mocked) in _visited:
+            return
+        _visited.add(id(mocked))
+
+        mock_type = type(mocked)
+        policy = self
+        # (Python < 3.8 records the call at the start of `_mock_call`)
+        record_call_name = (
+            '_increment_mock_call'
+            if hasattr(mock.CallableMixin, '_increment_mock_call')
+            else '_mock_call'
+        )
+
+        def record_call(self, *args, **kwargs):
+            lists = _call_lists(self)
+            lengths = [len(calls) for calls in lists]
+            try:
+                record = getattr(super(mock_type, self), record_call_name)
+                return record(*args, **kwargs)
+            finally:
+                policy.trim(self, lists, lengths)
+
+        def get_child_mock(self, **kwargs):
+            child = super(mock_type, self)._get_child_mock(**kwargs)
+            policy.apply(child)
+            return child
+
+        if isinstance(mocked, mock.CallableMixin):
+            setattr(mock_type, record_call_name, record_call)
+        mock_type._get_child_mock = get_child_mock
+
+        # (children the factory already created)
+        for child in list(mocked._mock_children.values()):
+            self.apply(child, _visited)
+        return_value = mocked.__dict__.get('_mock_return_value')
+        if return_value is not mock.DEFAULT:
+            self.apply(return_value, _visited)
+
+    def __repr__(self):
+        return '{}({})'.format(
+            type(self).__name__,
+            ', '.join(repr(getattr(self, name)) for name in self.__slots__),
+        )
+
+
+class RecordLast(_RecordingPolicy):
+    """
+    Only keep the last `n` calls.
+    """
+
+    __slots__ = ('n',)
+
+    def __init__(self, n):
+        # type: (int) -> None
+        self.n = n
+
+    def trim(self, mocked, lists, lengths):
+        n = self.n
+        for calls in lists:
+            if len(calls) > n:
+                del calls[:len(calls) - n]
+
+
+class RecordCount(_RecordingPolicy):
+    """
+    Don't keep any calls, only count them (and keep the last `call_args`).
+    """
+
+    __slots__ = ()
+
+    def trim(self, mocked, lists, lengths):
+        for calls in lists:
+            del calls[:]
+
+
+class RecordSample(_RecordingPolicy):
+    """
+    Only keep one in every `n` calls (the 1st, the `n + 1`th, ...) to each
+    mock.
+    """
+
+    __slots__ = ('n',)
+
+    def __init__(self, n):
+        # type: (int) -> None
+        self.n = n
+
+    def trim(self, mocked, lists, lengths):
+        if (mocked.call_count - 1) % self.n == 0:
+            return
+        for calls, length in zip(lists, lengths):
+            del calls[length:]
@@ -0,0 +1,361 @@
+"""
+The registry of import paths to patch, and `register` which adds to it.
+
+This is all that `import automock` loads (see `automock/__init__.py`), so
+registration modules can live next to production code: nothing here imports
+the mock library, the settings or anything else which isn't already loaded
+at interpreter startup.
+"""
+import sys
+
+MYPY = False
+if MYPY:  # (type checking only, `typing` is slow to import)
+    from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional  # noqa
+
+
+def _get_from_path(import_path):
+    # type: (str) -> Callable
+    """
+    Kwargs:
+        import_path: full import path (to a mock factory function)
+
+    Returns:
+        (the mock factory function)
+    """
+    from importlib import import_module
+    module_name, obj_name = import_path.rsplit('.', 1)
+    module = import_module(module_name)
+    return getattr(module, obj_name)
+
+
+class Registration(object):
+    """
+    Everything we know about a registered import path:
+
+        path: the import path to patch
+        factory: the registered mock factory (`MagicMock` by default, which
+            isn't imported until first needed)
+        factory_path: import path of the factory, when registered by path
+            (e.g. from a manifest), it's only imported when first needed
+        reuse: see `register`
+        autospec: see `register`
+        record: see `register`
+        registered_in: name of the module `register` was called from
+        target: the resolved `_Target` (None until first resolved)
+        spec: `CachedSpec` of the target (None until first needed)
+        is_async: whether the target is a coroutine function (None until
+            first needed)
+        snapshot: `MockSnapshot` of the pooled mock, for reuse
+        mock: the active mock, while patched
+        swaps: stack of the mocks swapped in by `swap_mock` (None until
+            first swapped), the innermost swap is the last one
+        swap_templates: `swap_mock` templates by args, with
+            `SWAP_MOCK_TEMPLATES` (None until first needed)
+        patcher: the active patcher, while patched
+        overlay: `ContextVar` holding the mock swapped in for the current
+            context, with `CONTEXT_OVERLAYS` (None until first swapped)
+        overlay_patcher: the patcher for the `OverlayDispatcher` which reads
+            `overlay`, while patched
+    """
+
+    __slots__ = (
+        'path',
+        '_factory',
+        'factory_path',
+        'reuse',
+        'autospec',
+        'record',
+        'registered_in',
+        'target',
+        'spec',
+        'is_async',
+        'snapshot',
+        'mock',
+        'swaps',
+        'swap_templates',
+        'patcher',
+        'overlay',
+        'overlay_patcher',
+    )
+
+    def __init__(self,
+                 path,  # type: str
+                 factory=None,  # type: Optional[Callable]
+                 reuse=False,  # type: bool
+                 autospec=False,  # type: bool
+                 record=None,  # type: Any
+                 registered_in=None,  # type: Optional[str]
+                 factory_path=None,  # type: Optional[str]
+                 ):
+        # type: (...) -> None
+        self.path = path
+        self._factory = factory
+        self.factory_path = factory_path
+        self.reuse = reuse
+        self.autospec = autospec
+        self.record = record
+        self.registered_in = registered_in
+        self.target = None  # type: Any
+        self.spec = None  # type: Any
+        self.is_async = None  # type: Optional[bool]
+        self.snapshot = None  # type: Any
+        self.mock = None  # type: Any
+        self.swaps = None  # type: Optional[List[Any]]
+        self.swap_templates = None  # type: Optional[Dict[Any, Any]]
+        self.patcher = None  # type: Any
+        self.overlay = None  # type: Any
+        self.overlay_patcher = None  # type: Any
+
+    @property
+    def factory(self):
+        # type: () -> Callable
+        factory = self._factory
+        if factory is None:
+            if self.factory_path is not None:
+                factory = self._factory = _get_from_path(self.factory_path)
+            else:
+                from automock.compat import mock
+                factory = mock.MagicMock
+        return factory
+
+    @property
+    def factory_imported(self):
+        # type: () -> bool
+        """
+        Whether `factory` can be read without importing its module.
+        """
+        return self._factory is not None or self.factory_path is None
+
+    @property
+    def current_mock(self):
+        # type: () -> Any
+        """
+        The innermost mock swapped in, else the active mock.
+        """
+        swaps = self.swaps
+        return swaps[-1] if swaps else self.mock
+
+    def push_swap(self, mocked):
+        # type: (Any) -> None
+        if self.swaps is None:
+            self.swaps = []
+        self.swaps.append(mocked)
+
+    def pop_swap(self, mocked):
+        # type: (Any) -> None
+        swaps = self.swaps
+        if not swaps:
+            return
+        if swaps[-1] is mocked:
+            swaps.pop()
+        else:
+            # (swaps exited out of order)
+            for i, swapped in enumerate(swaps):
+                if swapped is mocked:
+                    del swaps[i]
+                    break
+
+    @property
+    def patched(self):
+        # type: () -> bool
+        return self.patcher is not None
+
+    def __repr__(self):
+        return '<Registration {!r}{}>'.format(
+            self.path, ' (patched)' if self.patched else ''
+        )
+
+
+class Registry(object):
+    """
+    The registrations, by path, with a secondary index of the currently
+    patched registrations, in patching order.
+
+    Iterating over the registry (or the index) doesn't copy anything.
+
+    `version` changes whenever a path is (re-)registered, unregistered or
+    given a new factory, for caches of anything derived from the
+    registrations.
+    """
+
+    __slots__ = ('_by_path', '_patched', 'version')
+
+    def __init__(self):
+        # type: () -> None
+        self._by_path = {}  # type: Dict[str, Registration]
+        self._patched = {}  # type: Dict[str, Registration]
+        self.version = 0
+
+    def __getitem__(self, path):
+        # type: (str) -> Registration
+        return self._by_path[path]
+
+    def get(self, path):
+        # type: (str) -> Optional[Registration]
+        return self._by_path.get(path)
+
+    def __contains__(self, path):
+        # type: (str) -> bool
+        return path in self._by_path
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._by_path)
+
+    def __iter__(self):
+        # type: () -> Iterator[Registration]
+        return iter(self._by_path.values())
+
+    def register(self,
+                 path,  # type: str
+                 factory=None,  # type: Optional[Callable]
+                 reuse=False,  # type: bool
+                 autospec=False,  # type: bool
+                 record=None,  # type: Any
+                 registered_in=None,  # type: Optional[str]
+                 factory_path=None,  # type: Optional[str]
+                 ):
+        # type: (...) -> Registration
+        """
+        Add a registration for `path`, or update the existing one in place
+        (discarding anything derived from its old factory or target, but not
+        its patch state: it may be registered again while patched)
+        """
+        self.version += 1
+        registration = self._by_path.get(path)
+        if registration is None:
+            registration = self._by_path[path] = Registration(
+                path, factory, reuse, autospec, record, registered_in, factory_path
+            )
+            return registration
+        registration._factory = factory
+        registration.factory_path = factory_path
+        registration.reuse = reuse
+        registration.autospec = autospec
+        registration.record = record
+        registration.registered_in = registered_in
+        registration.snapshot = None
+        registration.swap_templates = None
+        if not registration.patched:
+            # (a patched registration keeps its target, which its patch is
+            # undone on)
+            self.set_target(registration, None)
+        return registration
+
+    def set_factory(self, registration, factory):
+        # type: (Registration, Callable) -> None
+        """
+        Replace the factory of `registration` (discarding any mocks built by
+        the old one)
+        """
+        self.version += 1
+        registration._factory = factory
+        registration.factory_path = None
+        registration.snapshot = None
+        registration.swap_templates = None
+
+    def unregister(self, path):
+        # type: (str) -> None
+        self.version += 1
+        registration = self._by_path.pop(path)
+        self.set_target(registration, None)
+        self._patched.pop(path, None)
+
+    def clear(self):
+        # type: () -> None
+        self.version += 1
+        self._by_path.clear()
+        self._patched.clear()
+
+    def set_target(self, registration, target):
+        # type: (Registration, Any) -> None
+        """
+        Record the resolved `target` of `registration` (or None to forget it)
+        """
+        registration.target = target
+        registration.spec = None
+        registration.is_async = None
+        # (built with the old spec)
+        registration.swap_templates = None
+
+    def set_patched(self, registration, patcher, mocked):
+        # type: (Registration, Any, Any) -> None
+        registration.patcher = patcher
+        registration.mock = mocked
+        self._patched[registration.path] = registration
+
+    def set_unpatched(self, registration):
+        # type: (Registration) -> None
+        registration.patcher = None
+        registration.mock = None
+        registration.overlay_patcher = None
+        self._patched.pop(registration.path, None)
+
+    def patched(self):
+        # type: () -> Iterable[Registration]
+        return self._patched.values()
+
+    def clear_patched(self):
+        # type: () -> None
+        for registration in self._patched.values():
+            registration.patcher = None
+            registration.mock = None
+            registration.overlay_patcher = None
+        self._patched.clear()
+
+
+_registry = Registry()
+
+
+def register(func_path, factory=None, reuse=False, autospec=False, record=None):
+    # type: (str, Optional[Callable], bool, bool, Optional[Any]) -> Callable
+    """
+    Kwargs:
+        func_path: import path to mock (as you would give to `mock.patch`)
+        factory: function that returns a mock for the patched func (by
+            default a `MagicMock`, or an `AsyncMock` if the patched func is
+            a coroutine function)
+        reuse: if true, the mock is only built once and is kept across tests,
+            being restored to its freshly-built state after each test
+            instead of calling `factory` again (see `MockSnapshot`)
+        autospec: if true, the mocks `factory` returns are specced from the
+            real patched object, so they only have its attributes and must
+            be called with its signature (the real object is only
+            introspected once, see `CachedSpec`)
+        record: limit the calls the mocks keep in `call_args_list`,
+            `mock_calls` and `method_calls`, one of `RecordLast(n)`,
+            `RecordCount()` or `RecordSample(n)` (by default every call is
+            kept)
+
+    Returns:
+        (decorator)
+
+    Usage:
+
+        automock.register('path.to.func.to.mock')  # default MagicMock
+        automock.register('path.to.func.to.mock', CustomMockFactory)
+        automock.register('path.to.func.to.mock', reuse=True)
+        automock.register('path.to.func.to.mock', autospec=True)
+        automock.register('path.to.func.to.mock', record=automock.RecordLast(100))
+
+        @automock.register('path.to.func.to.mock')
+        def custom_mock(result):
+            return mock.MagicMock(return_value=result)
+
+    (nothing is imported or built here, that all waits until patching starts)
+    """
+    registration = _registry.register(
+        func_path,
+        factory,
+        reuse=reuse,
+        autospec=autospec,
+        record=record,
+        # (the registration module, for profiling reports)
+        registered_in=sys._getframe(1).f_globals.get('__name__'),
+    )
+
+    def decorator(decorated_factory):
+        _registry.set_factory(registration, decorated_factory)
+        return decorated_factory
+
+    return decorator
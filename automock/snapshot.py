@@ -0,0 +1,107 @@
+from typing import Any, Dict, List, Optional, Set  # noqa
+
+from automock.compat import mock
+
+
+class MockSnapshot(object):
+    """
+    Captures the state of a mock so that it can later be put back exactly as
+    it was, e.g. straight after it was built by its factory.
+
+    This is much cheaper than building a new mock, and from the point of view
+    of a test a restored mock behaves the same as a fresh one: recorded calls
+    are cleared, and configured return values, side effects, attributes,
+    child mocks and magic methods are all reset to their snapshotted values.
+
+    Usage:
+
+        snapshot = MockSnapshot(factory())
+        ...  # use and configure snapshot.mock
+        snapshot.restore()
+
+    NOTE:
+    an iterable `side_effect` is copied to a list when the snapshot is taken
+    (so that each restore can replay it from the start), it must be finite.
+    """
+
+    __slots__ = ('mock', 'attrs', 'type_attrs', 'side_effect', 'child_snapshots')
+
+    def __init__(self, mocked, _visited=None):
+        # type: (mock.NonCallableMock, Optional[Set[int]]) -> None
+        if not isinstance(mocked, mock.NonCallableMock):
+            raise TypeError(
+                'Can only snapshot mock objects, got: {!r}'.format(mocked)
+            )
+        if _visited is None:
+            _visited = set()
+        _visited.add(id(mocked))
+
+        self.mock = mocked
+
+        side_effect = mocked.__dict__.get('_mock_side_effect')
+        if side_effect is not None and _is_iterator(side_effect):
+            # replay-able copy of the remaining values
+            self.side_effect = list(side_effect)  # type: Optional[List[Any]]
+            mocked.side_effect = self.side_effect
+        else:
+            self.side_effect = None
+
+        self.attrs = {
+            key: _copy_container(value)
+            for key, value in mocked.__dict__.items()
+        }  # type: Dict[str, Any]
+        self.type_attrs = dict(type(mocked).__dict__)  # type: Dict[str, Any]
+
+        related = list(self.attrs['_mock_children'].values())
+        return_value = self.attrs.get('_mock_return_value')
+        if return_value is not mock.DEFAULT:
+            related.append(return_value)
+
+        self.child_snapshots = [
+            MockSnapshot(child, _visited)
+            for child in related
+            if isinstance(child, mock.NonCallableMock) and id(child) not in _visited
+        ]  # type: List[MockSnapshot]
+
+    def restore(self):
+        # type: () -> None
+        mocked = self.mock
+
+        # magic methods are configured on the mock's own class
+        # (NOTE: compared by identity, comparing by equality would record
+        # `__eq__` calls on any magic methods which are now mocks)
+        mock_type = type(mocked)
+        type_dict = mock_type.__dict__
+        for key in [key for key in type_dict if key not in self.type_attrs]:
+            delattr(mock_type, key)
+        for key, value in self.type_attrs.items():
+            if type_dict.get(key) is not value:
+                setattr(mock_type, key, value)
+
+        instance_dict = mocked.__dict__
+        for key in [key for key in instance_dict if key not in self.attrs]:
+            del instance_dict[key]
+        for key, value in self.attrs.items():
+            # mutable containers (recorded calls, children) are replaced
+            # with a copy of their snapshotted contents
+            instance_dict[key] = _copy_container(value)
+
+        if self.side_effect is not None:
+            mocked.side_effect = self.side_effect
+
+        for snapshot in self.child_snapshots:
+            snapshot.restore()
+
+
+def _copy_container(value):
+    # type: (Any) -> Any
+    if type(value) is dict or isinstance(value, list):
+        return type(value)(value)
+    return value
+
+
+def _is_iterator(obj):
+    # type: (Any) -> bool
+    return (
+        hasattr(obj, '__next__') or hasattr(obj, 'next')
+    ) and not callable(obj)
@@ -0,0 +1,157 @@
+"""
+Measure what `import automock` (and registering a path) costs a process
+which never patches anything, e.g. a production worker whose client modules
+have their `automock.register(...)` calls alongside.
+
+Each run is a fresh interpreter under `python -X importtime`, we report the
+median cumulative import time of `automock` and every module it pulled in.
+For comparison we also time loading the rest of automock, as patching does.
+
+Usage:
+
+    python -m benchmarks.bench_import
+    python -m benchmarks.bench_import --runs 50 --max-us 5000
+
+Exits with 1 if importing automock loads anything but the registration
+modules in `ALLOWED`, or takes more than `--max-us` microseconds.
+
+(requires Python 3.7+)
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple  # noqa
+
+from automock.__about__ import __version__
+
+from benchmarks.bench_patching import RESULTS_DIR
+
+
+# the only modules `import automock` + `register()` may load
+ALLOWED = frozenset((
+    'automock', 'automock.importhook', 'automock.registry', 'automock.recording',
+))
+
+REGISTER = (
+    'import automock\n'
+    "automock.register('services.things.client.do_something')\n"
+    "@automock.register('services.things.client.do_other', record=automock.RecordLast(10))\n"
+    'def factory():\n'
+    '    pass\n'
+)
+
+SCENARIOS = {
+    'register': REGISTER,
+    # (what patching adds on top)
+    'patching': REGISTER + 'automock.start_patching\n',
+}  # type: Dict[str, str]
+
+
+def importtime(code):
+    # type: (str) -> Tuple[Dict[str, int], List[str]]
+    """
+    Run `code` in a fresh interpreter with `-X importtime`.
+
+    Returns:
+        cumulative import time in microseconds of each top-level import
+        `code` made, and the names of all the modules it imported
+    """
+    output = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', 'import sys\n' + code],
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stderr
+    top_level = {}  # type: Dict[str, int]
+    modules = []  # type: List[str]
+    # (the interpreter's own startup imports come first, up to `site`)
+    started = False
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        _, cumulative_us, name = line[len('import time:'):].split('|')
+        if cumulative_us.strip() == 'cumulative':
+            # (the header)
+            continue
+        if not started:
+            started = name.strip() == 'site'
+            continue
+        modules.append(name.strip())
+        # (nested imports are indented under the module importing them)
+        if not name.startswith('  '):
+            top_level[name.strip()] = int(cumulative_us)
+    return top_level, modules
+
+
+def run(runs):
+    # type: (int) -> Dict[str, Dict[str, object]]
+    results = {}
+    for scenario, code in sorted(SCENARIOS.items()):
+        totals = []
+        modules = []  # type: List[str]
+        for _ in range(runs):
+            top_level, modules = importtime(code)
+            totals.append(sum(top_level.values()))
+        results[scenario] = {
+            'median_us': statistics.median(totals),
+            'min_us': min(totals),
+            'modules': sorted(modules),
+        }
+        print('{:>10}: {:>8,.0f}us median, {:>8,}us min, {:>4} modules'.format(
+            scenario, results[scenario]['median_us'], min(totals), len(modules)
+        ))
+    return results
+
+
+def main(argv=None):
+    # type: (Optional[List[str]]) -> int
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument(
+        '--max-us', type=float, default=None,
+        help='fail if the median import + register time exceeds this',
+    )
+    parser.add_argument(
+        '--output',
+        default=os.path.join(RESULTS_DIR, 'import-{}.json'.format(__version__)),
+    )
+    args = parser.parse_args(argv)
+
+    results = run(args.runs)
+
+    output_dir = os.path.dirname(os.path.abspath(args.output))
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    with open(args.output, 'w') as f:
+        json.dump(
+            {
+                'automock_version': __version__,
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'results': results,
+            },
+            f,
+            indent=2,
+            sort_keys=True,
+        )
+    print('\nresults saved to {}'.format(args.output))
+
+    ok = True
+    unexpected = sorted(set(results['register']['modules']) - ALLOWED)
+    if unexpected:
+        print('import automock loaded: {}'.format(', '.join(unexpected)))
+        ok = False
+    if args.max_us is not None and results['register']['median_us'] > args.max_us:
+        print('import automock took more than {:,.0f}us'.format(args.max_us))
+        ok = False
+    return 0 if ok else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,338 @@
+"""
+Measure the per-test overhead of automock patching at registry scale.
+
+For each combination of registry size, factory kind and entry point (the
+pytest plugin, at function and session scope, `AutomockTestCaseMixin` and
+`activate()`) we time the setup
+and teardown halves of a test cycle separately, then run one traced cycle
+to record allocations and peak memory.
+
+Usage:
+
+    python -m benchmarks.bench_patching
+    python -m benchmarks.bench_patching --paths 10,100 --output new.json
+    python -m benchmarks.bench_patching --compare benchmarks/results/automock-1.2.1.json
+    python -m benchmarks.bench_patching --setting LAZY_MOCKS=True
+
+(requires Python 3)
+"""
+import argparse
+import ast
+import gc
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+from typing import Callable, Dict, List, Optional, Tuple  # noqa
+
+from flexisettings.utils import override_settings
+
+import automock
+from automock import pytest_plugin
+from automock.__about__ import __version__
+from automock.conf import settings
+
+from benchmarks.registry import FACTORIES, synthetic_registry
+
+
+DEFAULT_PATHS = (10, 100, 1000, 10000)
+DEFAULT_MODULES = 100
+
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'results')
+
+
+class _BenchTestCase(automock.AutomockTestCase):
+
+    def runTest(self):
+        pass
+
+
+def _noop():
+    pass
+
+
+def _start_stop():
+    # type: () -> Tuple[Callable, Callable, Callable]
+    return automock.start_patching, automock.stop_patching, _noop
+
+
+def _pytest_plugin(scope='function'):
+    # type: (str) -> Tuple[Callable, Callable, Callable]
+    """
+    Drive the plugin hooks with a stand-in test item. With a wider scope
+    than 'function' every test is followed by another in the same scope, so
+    we measure the cost of resetting mocks between tests.
+    """
+    patch_scope = pytest_plugin.PatchScope(scope)
+    item = SimpleNamespace(
+        config=SimpleNamespace(_automock_scope=patch_scope),
+        _automock_selection=pytest_plugin.ALL,
+    )
+    nextitem = None if scope == 'function' else item
+
+    def setup():
+        pytest_plugin.pytest_runtest_setup(item)
+
+    def teardown():
+        pytest_plugin.pytest_runtest_teardown(item, nextitem)
+
+    return setup, teardown, patch_scope.finish
+
+
+def _testcase_mixin():
+    # type: () -> Tuple[Callable, Callable, Callable]
+    case = _BenchTestCase()
+    return case.setUp, case.tearDown, _noop
+
+
+def _activate():
+    # type: () -> Tuple[Callable, Callable, Callable]
+    context = automock.activate()
+
+    def teardown():
+        context.__exit__(None, None, None)
+
+    return context.__enter__, teardown, _noop
+
+
+ENTRY_POINTS = {
+    'start_stop': _start_stop,
+    'pytest_plugin': _pytest_plugin,
+    'pytest_plugin_session': lambda: _pytest_plugin('session'),
+    'testcase_mixin': _testcase_mixin,
+    'activate': _activate,
+}  # type: Dict[str, Callable[[], Tuple[Callable, Callable, Callable]]]
+
+
+def _summarise(samples):
+    # type: (List[float]) -> Dict[str, float]
+    """
+    Returns:
+        latency stats in milliseconds
+    """
+    ordered = sorted(samples)
+    return {
+        'min': ordered[0] * 1000,
+        'median': statistics.median(ordered) * 1000,
+        'p95': ordered[int(0.95 * (len(ordered) - 1))] * 1000,
+        'mean': statistics.mean(ordered) * 1000,
+    }
+
+
+def _default_repeat(paths):
+    # type: (int) -> int
+    return max(5, min(200, 20000 // paths))
+
+
+def measure(setup, teardown, repeat):
+    # type: (Callable, Callable, int) -> Dict[str, object]
+    """
+    Time `repeat` setup/teardown cycles, then trace one more to get
+    allocation counts and peak memory.
+    """
+    # warm up caches, imports etc. so they don't skew the first sample
+    setup()
+    teardown()
+
+    setup_times = []
+    teardown_times = []
+    gc.collect()
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        setup()
+        t1 = time.perf_counter()
+        teardown()
+        t2 = time.perf_counter()
+        setup_times.append(t1 - t0)
+        teardown_times.append(t2 - t1)
+
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.take_snapshot()
+        setup()
+        after_setup = tracemalloc.take_snapshot()
+        _, setup_peak = tracemalloc.get_traced_memory()
+        teardown()
+        after_teardown = tracemalloc.take_snapshot()
+        _, cycle_peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    setup_diff = after_setup.compare_to(before, 'filename')
+    cycle_diff = after_teardown.compare_to(before, 'filename')
+    return {
+        'repeat': repeat,
+        'setup_ms': _summarise(setup_times),
+        'teardown_ms': _summarise(teardown_times),
+        'setup_alloc_blocks': sum(d.count_diff for d in setup_diff if d.count_diff > 0),
+        'setup_alloc_bytes': sum(d.size_diff for d in setup_diff if d.size_diff > 0),
+        'retained_bytes': sum(d.size_diff for d in cycle_diff),
+        'peak_bytes': max(setup_peak, cycle_peak),
+    }
+
+
+def run(paths_options,  # type: List[int]
+        modules,  # type: int
+        factories,  # type: List[str]
+        entry_points,  # type: List[str]
+        repeat=None,  # type: Optional[int]
+        reuse=False,  # type: bool
+        ):
+    # type: (...) -> List[Dict[str, object]]
+    results = []
+    for paths in paths_options:
+        for factory in factories:
+            with synthetic_registry(paths, modules, factory, reuse):
+                for entry_point in entry_points:
+                    setup, teardown, finish = ENTRY_POINTS[entry_point]()
+                    result = {
+                        'entry_point': entry_point,
+                        'factory': factory,
+                        'paths': paths,
+                        'modules': min(paths, modules),
+                    }
+                    try:
+                        result.update(
+                            measure(setup, teardown, repeat or _default_repeat(paths))
+                        )
+                    finally:
+                        finish()
+                    results.append(result)
+                    print(
+                        '{entry_point:>21} {factory:>10} {paths:>6} paths: '
+                        'setup {setup:8.3f}ms  teardown {teardown:8.3f}ms  '
+                        'peak {peak:>10,}B'.format(
+                            entry_point=entry_point,
+                            factory=factory,
+                            paths=paths,
+                            setup=result['setup_ms']['median'],
+                            teardown=result['teardown_ms']['median'],
+                            peak=result['peak_bytes'],
+                        )
+                    )
+    return results
+
+
+def _key(result):
+    # type: (Dict) -> Tuple
+    return result['entry_point'], result['factory'], result['paths'], result['modules']
+
+
+def compare(baseline_path, results, threshold):
+    # type: (str, List[Dict], float) -> bool
+    """
+    Print median latency ratios against a saved baseline.
+
+    Returns:
+        whether every measurement is within `threshold` of the baseline
+    """
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    print('\ncompared to {} (automock {}):'.format(
+        baseline_path, baseline['automock_version']
+    ))
+    previous = {_key(result): result for result in baseline['results']}
+    ok = True
+    for result in results:
+        old = previous.get(_key(result))
+        if old is None:
+            continue
+        for metric in ('setup_ms', 'teardown_ms'):
+            ratio = result[metric]['median'] / old[metric]['median']
+            regressed = ratio > 1 + threshold
+            ok = ok and not regressed
+            print('{:>21} {:>10} {:>6} paths {:>11}: {:6.2f}x{}'.format(
+                result['entry_point'],
+                result['factory'],
+                result['paths'],
+                metric,
+                ratio,
+                '  REGRESSION' if regressed else '',
+            ))
+    return ok
+
+
+def _parse_setting(value):
+    # type: (str) -> Tuple[str, object]
+    key, _, raw = value.partition('=')
+    try:
+        parsed = ast.literal_eval(raw)
+    except (ValueError, SyntaxError):
+        parsed = raw
+    return key, parsed
+
+
+def main(argv=None):
+    # type: (Optional[List[str]]) -> int
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument(
+        '--paths',
+        default=','.join(str(n) for n in DEFAULT_PATHS),
+        help='comma-separated registry sizes',
+    )
+    parser.add_argument('--modules', type=int, default=DEFAULT_MODULES)
+    parser.add_argument('--factories', default=','.join(sorted(FACTORIES)))
+    parser.add_argument('--entry-points', default=','.join(sorted(ENTRY_POINTS)))
+    parser.add_argument('--repeat', type=int, default=None)
+    parser.add_argument(
+        '--reuse', action='store_true', help='register the paths with reuse=True',
+    )
+    parser.add_argument(
+        '--setting', action='append', default=[], type=_parse_setting,
+        help='automock setting override, e.g. LAZY_MOCKS=True (repeatable)',
+    )
+    parser.add_argument(
+        '--output',
+        default=os.path.join(RESULTS_DIR, 'automock-{}.json'.format(__version__)),
+    )
+    parser.add_argument('--compare', default=None, help='baseline JSON to compare against')
+    parser.add_argument(
+        '--threshold', type=float, default=0.2,
+        help='allowed median slowdown vs baseline (0.2 == 20%%)',
+    )
+    args = parser.parse_args(argv)
+
+    overrides = dict(args.setting)
+    with override_settings(settings, **overrides):
+        results = run(
+            paths_options=[int(n) for n in args.paths.split(',')],
+            modules=args.modules,
+            factories=args.factories.split(','),
+            entry_points=args.entry_points.split(','),
+            repeat=args.repeat,
+            reuse=args.reuse,
+        )
+
+    output_dir = os.path.dirname(os.path.abspath(args.output))
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    with open(args.output, 'w') as f:
+        json.dump(
+            {
+                'automock_version': __version__,
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'settings': overrides,
+                'reuse': args.reuse,
+                'results': results,
+            },
+            f,
+            indent=2,
+            sort_keys=True,
+        )
+    print('\nresults saved to {}'.format(args.output))
+
+    if args.compare and not compare(args.compare, results, args.threshold):
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
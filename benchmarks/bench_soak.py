@@ -0,0 +1,294 @@
+"""
+Soak test automock for memory growth over many patch cycles.
+
+Each cycle is what a test typically does: `start_patching()`, call some of
+the mocks (with a large argument, as tests often do), `swap_mock` and
+`unmock` one other path each, then `stop_patching()`. Every `--sample-every`
+cycles we record the process RSS and the memory traced by `tracemalloc`,
+and at the end report how fast each grew (after the first sample, which
+includes one-off caches) and which lines allocated the growth.
+
+Usage:
+
+    python -m benchmarks.bench_soak
+    python -m benchmarks.bench_soak --cycles 10000 --start-twice
+    python -m benchmarks.bench_soak --detect-leaks --setting LAZY_MOCKS=True
+
+Exits with 1 if the traced memory grew by more than `--max-growth` bytes per
+1000 cycles.
+
+(requires Python 3)
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import resource
+import sys
+import time
+import tracemalloc
+import warnings
+from typing import Callable, Dict, List, Optional, Tuple  # noqa
+
+from flexisettings.utils import override_settings
+
+import automock
+from automock import leaks
+from automock.__about__ import __version__
+from automock.base import _check_leaks
+from automock.conf import settings
+
+from benchmarks.bench_patching import RESULTS_DIR, _parse_setting
+from benchmarks.registry import FACTORIES, synthetic_registry
+
+
+DEFAULT_CYCLES = 100000
+DEFAULT_PATHS = 7
+# (the first path is swapped, the second un-mocked, and up to this many of
+# the others are called)
+CALLED_PATHS = 5
+MIN_PATHS = 3
+
+
+def rss_bytes():
+    # type: () -> int
+    """
+    Returns:
+        the current resident set size (or the peak, where the current one
+        isn't available)
+    """
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError):
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # (kilobytes, except on macOS)
+        return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _slope(samples):
+    # type: (List[Tuple[int, int]]) -> float
+    """
+    Returns:
+        least-squares growth in bytes per 1000 cycles, of `(cycle, bytes)`
+        samples
+    """
+    if len(samples) < 2:
+        return 0.0
+    n = len(samples)
+    mean_x = sum(x for x, _ in samples) / n
+    mean_y = sum(y for _, y in samples) / n
+    covariance = sum((x - mean_x) * (y - mean_y) for x, y in samples)
+    variance = sum((x - mean_x) ** 2 for x, _ in samples)
+    return covariance / variance * 1000
+
+
+def soak(paths,  # type: List[str]
+         cycles,  # type: int
+         sample_every,  # type: int
+         arg_size,  # type: int
+         trace=True,  # type: bool
+         start_twice=False,  # type: bool
+         reuse=False,  # type: bool
+         detect_leaks=False,  # type: bool
+         ):
+    # type: (...) -> Dict[str, object]
+    # (a test's arguments, which the mocks' `call_args_list` hold on to)
+    payload = b'x' * arg_size
+    if len(paths) < MIN_PATHS:
+        raise ValueError('Need at least {} paths, got {}'.format(MIN_PATHS, len(paths)))
+    swapped = paths[0]
+    unmocked = paths[1]
+    called = paths[2:2 + CALLED_PATHS]
+    funcs = {path: _get_func(path) for path in called}
+
+    def cycle():
+        automock.start_patching(reuse=reuse)
+        if start_twice:
+            automock.start_patching(reuse=reuse)
+        for path in called:
+            funcs[path]()(payload)
+        with automock.swap_mock(swapped) as swapped_mock:
+            swapped_mock(payload)
+        with automock.unmock(unmocked):
+            pass
+        automock.stop_patching()
+
+    detector = leaks.enable() if detect_leaks else None
+    samples = []  # type: List[Dict[str, int]]
+    first_snapshot = last_snapshot = None
+    started = time.perf_counter()
+    if trace:
+        tracemalloc.start()
+    try:
+        with warnings.catch_warnings():
+            # (`start_patching()` warns when called twice)
+            warnings.simplefilter('ignore')
+            for i in range(1, cycles + 1):
+                cycle()
+                if detector is not None:
+                    _check_leaks('cycle {}'.format(i))
+                if i % sample_every and i != cycles:
+                    continue
+                gc.collect()
+                traced = tracemalloc.get_traced_memory()[0] if trace else 0
+                samples.append({'cycle': i, 'rss': rss_bytes(), 'traced': traced})
+                if trace:
+                    last_snapshot = tracemalloc.take_snapshot()
+                    if first_snapshot is None:
+                        first_snapshot = last_snapshot
+    finally:
+        if trace:
+            tracemalloc.stop()
+        if detector is not None:
+            leaks.disable()
+    elapsed = time.perf_counter() - started
+
+    # (the first sample includes one-off costs, e.g. cached specs)
+    steady = samples[1:] or samples
+    top = []  # type: List[Dict[str, object]]
+    if first_snapshot is not None and last_snapshot is not first_snapshot:
+        for stat in last_snapshot.compare_to(first_snapshot, 'lineno')[:10]:
+            if stat.size_diff <= 0:
+                continue
+            frame = stat.traceback[0]
+            top.append({
+                'location': '{}:{}'.format(frame.filename, frame.lineno),
+                'size_diff': stat.size_diff,
+                'count_diff': stat.count_diff,
+            })
+    return {
+        'paths': len(paths),
+        'cycles': cycles,
+        'start_twice': start_twice,
+        'reuse': reuse,
+        'arg_size': arg_size,
+        'seconds': elapsed,
+        'cycle_ms': elapsed * 1000 / cycles,
+        'samples': samples,
+        'rss_growth_per_1000': _slope([(s['cycle'], s['rss']) for s in steady]),
+        'traced_growth_per_1000': _slope([(s['cycle'], s['traced']) for s in steady]),
+        'top_growth': top,
+        'leaks': None if detector is None else detector.to_dict()['leaks'],
+    }
+
+
+def _get_func(path):
+    # type: (str) -> Callable
+    """
+    Returns:
+        a function returning whatever is currently at `path`, i.e. how the
+        code under test sees it (`module.func(...)`)
+    """
+    module_name, _, attribute = path.rpartition('.')
+    module = sys.modules[module_name]
+    return lambda: getattr(module, attribute)
+
+
+def main(argv=None):
+    # type: (Optional[List[str]]) -> int
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('--cycles', type=int, default=DEFAULT_CYCLES)
+    parser.add_argument('--paths', type=int, default=DEFAULT_PATHS)
+    parser.add_argument('--factory', default='custom', choices=sorted(FACTORIES))
+    parser.add_argument('--sample-every', type=int, default=1000)
+    parser.add_argument(
+        '--arg-size', type=int, default=10000,
+        help='size in bytes of the argument each mock is called with',
+    )
+    parser.add_argument(
+        '--start-twice', action='store_true',
+        help='call start_patching() twice per cycle',
+    )
+    parser.add_argument(
+        '--reuse', action='store_true', help='patch with start_patching(reuse=True)',
+    )
+    parser.add_argument(
+        '--no-tracemalloc', dest='trace', action='store_false',
+        help="only track RSS (tracemalloc slows every allocation down)",
+    )
+    parser.add_argument(
+        '--detect-leaks', action='store_true',
+        help='run the leak detector after every cycle (slow: it collects garbage)',
+    )
+    parser.add_argument(
+        '--setting', action='append', default=[], type=_parse_setting,
+        help='automock setting override, e.g. LAZY_MOCKS=True (repeatable)',
+    )
+    parser.add_argument(
+        '--max-growth', type=float, default=10000,
+        help='allowed traced memory growth, in bytes per 1000 cycles',
+    )
+    parser.add_argument(
+        '--output',
+        default=os.path.join(RESULTS_DIR, 'soak-{}.json'.format(__version__)),
+    )
+    args = parser.parse_args(argv)
+    if args.paths < MIN_PATHS:
+        parser.error('--paths must be at least {}'.format(MIN_PATHS))
+
+    overrides = dict(args.setting)
+    with override_settings(settings, **overrides):
+        with synthetic_registry(args.paths, args.paths, args.factory) as paths:
+            result = soak(
+                paths,
+                cycles=args.cycles,
+                sample_every=args.sample_every,
+                arg_size=args.arg_size,
+                trace=args.trace,
+                start_twice=args.start_twice,
+                reuse=args.reuse,
+                detect_leaks=args.detect_leaks,
+            )
+
+    print('{cycles} cycles of {paths} paths in {seconds:.1f}s ({cycle_ms:.3f}ms per cycle)'.format(
+        **result
+    ))
+    print('RSS:    {:>12,} -> {:>12,}B, {:>10,.0f}B per 1000 cycles'.format(
+        result['samples'][0]['rss'],
+        result['samples'][-1]['rss'],
+        result['rss_growth_per_1000'],
+    ))
+    if args.trace:
+        print('traced: {:>12,} -> {:>12,}B, {:>10,.0f}B per 1000 cycles'.format(
+            result['samples'][0]['traced'],
+            result['samples'][-1]['traced'],
+            result['traced_growth_per_1000'],
+        ))
+        for stat in result['top_growth']:
+            print('  {size_diff:>+12,}B {count_diff:>+8} blocks  {location}'.format(**stat))
+    if result['leaks'] is not None:
+        print('leaks: {}'.format(len(result['leaks'])))
+        for leak in result['leaks'][:10]:
+            print('  {kind:<5} {path}  ({detail}) in {test}'.format(**leak))
+
+    output_dir = os.path.dirname(os.path.abspath(args.output))
+    if not os.path.isdir(output_dir):
+        os.makedirs(output_dir)
+    with open(args.output, 'w') as f:
+        json.dump(
+            {
+                'automock_version': __version__,
+                'python': platform.python_version(),
+                'implementation': platform.python_implementation(),
+                'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                'settings': overrides,
+                'result': result,
+            },
+            f,
+            indent=2,
+            sort_keys=True,
+        )
+    print('\nresults saved to {}'.format(args.output))
+
+    if args.trace and result['traced_growth_per_1000'] > args.max_growth:
+        print('traced memory grew by more than {:,.0f}B per 1000 cycles'.format(
+            args.max_growth
+        ))
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
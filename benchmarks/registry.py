@@ -0,0 +1,108 @@
+import sys
+import types
+from contextlib import contextmanager
+from typing import Callable, Dict, Generator, List  # noqa
+
+from six.moves import mock  # type: ignore
+
+import automock
+from automock.base import _registry
+
+
+PACKAGE_NAME = 'automock_bench'
+
+
+def custom_factory(result='synthetic result'):
+    # type: (str) -> mock.Mock
+    """
+    Representative of a typical hand-written mock factory: builds a
+    `MagicMock` and configures a default return value.
+    """
+    mocked = mock.MagicMock()
+    mocked.return_value = result
+    return mocked
+
+
+FACTORIES = {
+    'magicmock': mock.MagicMock,
+    'custom': custom_factory,
+}  # type: Dict[str, Callable]
+
+
+def _make_func(name):
+    # type: (str) -> Callable
+    def func(*args, **kwargs):
+        return name
+    func.__name__ = name
+    return func
+
+
+def _make_modules(paths, modules):
+    # type: (int, int) -> List[str]
+    """
+    Create `modules` in-memory modules under the `automock_bench` package,
+    with `paths` functions spread evenly across them.
+
+    Returns:
+        import paths of all the generated functions
+    """
+    package = types.ModuleType(PACKAGE_NAME)
+    package.__path__ = []  # type: ignore
+    sys.modules[PACKAGE_NAME] = package
+
+    func_paths = []
+    for i in range(modules):
+        module_name = 'services_{}_client'.format(i)
+        module = types.ModuleType('{}.{}'.format(PACKAGE_NAME, module_name))
+        sys.modules[module.__name__] = module
+        setattr(package, module_name, module)
+
+    for j in range(paths):
+        module_name = '{}.services_{}_client'.format(PACKAGE_NAME, j % modules)
+        func_name = 'func_{}'.format(j)
+        setattr(sys.modules[module_name], func_name, _make_func(func_name))
+        func_paths.append('{}.{}'.format(module_name, func_name))
+
+    return func_paths
+
+
+def _remove_modules():
+    # type: () -> None
+    for name in list(sys.modules):
+        if name == PACKAGE_NAME or name.startswith(PACKAGE_NAME + '.'):
+            del sys.modules[name]
+
+
+@contextmanager
+def synthetic_registry(paths, modules, factory='magicmock', reuse=False):
+    # type: (int, int, str, bool) -> Generator[List[str], None, None]
+    """
+    Replace the automock registry with `paths` synthetic registrations
+    spread over `modules` generated modules, restoring the real registry
+    afterwards.
+
+    Kwargs:
+        paths: number of registered import paths
+        modules: number of modules the paths are spread over
+        factory: key in `FACTORIES`
+        reuse: register the paths with `reuse=True`
+    """
+    saved = list(_registry)
+    _registry.clear()
+
+    func_paths = _make_modules(paths, min(paths, modules))
+    for func_path in func_paths:
+        automock.register(func_path, FACTORIES[factory], reuse=reuse)
+
+    try:
+        yield func_paths
+    finally:
+        _registry.clear()
+        for registration in saved:
+            automock.register(
+                registration.path,
+                registration.factory,
+                reuse=registration.reuse,
+                autospec=registration.autospec,
+            )
+        _remove_modules()
@@ -47,6 +47,9 @@ setup(
         'six',
         'mock; python_version < "3"',
     ],
+    extras_require={
+        'toml': ['tomli; python_version < "3.11"'],
+    },
 
     packages=[
         'automock',
@@ -0,0 +1,13 @@
+# (Python 3 only, see `tests.automocks`)
+
+
+async def async_func_to_mock():
+    return 'Go ahead, mock me asynchronously'
+
+
+async def async_func_to_mock_reusably():
+    return 'Go ahead, mock me asynchronously, reusably'
+
+
+async def async_func_to_swap(mockery='I was awaited'):
+    return mockery
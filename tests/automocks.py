@@ -15,3 +15,59 @@ custom_mock_factory = partial(mock_factory, 'I like PHP')
 
 automock.register('tests.dummies.other_func_to_mock', custom_mock_factory)
 automock.register('tests.dummies.yet_another_func_to_mock')
+
+
+lazy_factory_calls = []
+
+
+@automock.register('tests.dummies.func_to_mock_lazily')
+def lazy_mock_factory(mockery='I was not built yet'):
+    lazy_factory_calls.append(mockery)
+    mocked = mock.MagicMock()
+    mocked.return_value = mockery
+    return mocked
+
+
+reusable_factory_calls = []
+
+
+@automock.register('tests.dummies.func_to_mock_reusably', reuse=True)
+def reusable_mock_factory(mockery='I am as good as new'):
+    reusable_factory_calls.append(mockery)
+    mocked = mock.MagicMock()
+    mocked.return_value = mockery
+    mocked.child.return_value = 'I am a child'
+    return mocked
+
+
+@automock.register('tests.dummies.func_to_autospec', autospec=True)
+def autospec_mock_factory(mockery='I am to spec'):
+    mocked = mock.MagicMock()
+    mocked.return_value = mockery
+    return mocked
+
+
+automock.register('tests.dummies.ClassToAutospec', autospec=True)
+automock.register('tests.dummies.ChildToAutospec.method_to_autospec', autospec=True)
+
+
+@automock.register('tests.dummies.func_to_record_last', record=automock.RecordLast(3))
+def record_last_mock_factory(mockery='I only remember the last calls'):
+    mocked = mock.MagicMock()
+    mocked.return_value = mockery
+    mocked.child.return_value = 'I am a child'
+    return mocked
+
+
+automock.register('tests.dummies.func_to_record_count', record=automock.RecordCount())
+automock.register('tests.dummies.func_to_record_sample', record=automock.RecordSample(10))
+
+
+if hasattr(mock, 'AsyncMock'):
+    # (Python 3.8+) default factory, patched with an `AsyncMock`
+    automock.register('tests.aio_dummies.async_func_to_mock')
+    automock.register('tests.aio_dummies.async_func_to_mock_reusably', reuse=True)
+
+    @automock.register('tests.aio_dummies.async_func_to_swap')
+    def async_mock_factory(mockery='I was swapped'):
+        return mock.AsyncMock(return_value=mockery)
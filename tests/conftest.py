@@ -0,0 +1,5 @@
+import six
+
+
+# (uses `async def`)
+collect_ignore = ['test_aio.py'] if six.PY2 else []
@@ -13,3 +13,64 @@ def yet_another_func_to_mock():
 
 def func_to_mock_dynamically():
     return 'Go ahead, mock me dynamically'
+
+
+def func_to_mock_lazily():
+    return 'Go ahead, mock me lazily'
+
+
+class ParentToMock(object):
+
+    def method_to_mock(self):
+        return 'Go ahead, mock my method'
+
+
+class ChildToMock(ParentToMock):
+    pass
+
+
+def func_to_mock_reusably():
+    return 'Go ahead, mock me reusably'
+
+
+def func_to_autospec(name, greeting='Hello'):
+    return '{} {}, go ahead, mock me to spec'.format(greeting, name)
+
+
+class ClassToAutospec(object):
+
+    def __init__(self, name):
+        self.name = name
+
+    def greet(self, greeting):
+        return '{} {}'.format(greeting, self.name)
+
+
+class ParentToAutospec(object):
+
+    def method_to_autospec(self, value):
+        return 'Go ahead, mock my method to spec'
+
+
+class ChildToAutospec(ParentToAutospec):
+    pass
+
+
+def func_to_record_last():
+    return 'Go ahead, mock me and remember the last calls'
+
+
+def func_to_record_count():
+    return 'Go ahead, mock me and count the calls'
+
+
+def func_to_record_sample():
+    return 'Go ahead, mock me and sample the calls'
+
+
+def func_from_manifest():
+    return 'Go ahead, mock me declaratively'
+
+
+def other_func_from_manifest():
+    return 'Go ahead, mock me declaratively 2'
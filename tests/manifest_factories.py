@@ -0,0 +1,8 @@
+"""
+Factories named (but not imported) by the manifests in `test_manifest`.
+"""
+from six.moves import mock
+
+
+def manifest_mock():
+    return mock.MagicMock(return_value='I was declared in a manifest')
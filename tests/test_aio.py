@@ -0,0 +1,231 @@
+import asyncio
+from unittest import skipIf, TestCase
+
+from flexisettings.utils import override_settings
+from six.moves import mock
+
+from automock import (
+    activate,
+    get_mock,
+    start_patching,
+    stop_patching,
+    swap_mock,
+    unmock,
+)
+from automock import base
+from automock.conf import settings
+
+from tests import aio_dummies, dummies
+
+
+ASYNC_MOCK_PATH = 'tests.aio_dummies.async_func_to_mock'
+REUSABLE_ASYNC_MOCK_PATH = 'tests.aio_dummies.async_func_to_mock_reusably'
+SWAP_ASYNC_MOCK_PATH = 'tests.aio_dummies.async_func_to_swap'
+
+
+# (the async registrations in `tests.automocks` are patched with `AsyncMock`)
+requires_async_mock = skipIf(base._AsyncMock is None, 'AsyncMock was added in Python 3.8')
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+@requires_async_mock
+class DefaultAsyncMockTestCase(TestCase):
+
+    def setUp(self):
+        start_patching()
+
+    def tearDown(self):
+        stop_patching()
+
+    def test_async_mock(self):
+        mocked = get_mock(ASYNC_MOCK_PATH)
+        assert isinstance(mocked, mock.AsyncMock)
+
+        mocked.return_value = 'I was awaited'
+        assert run(aio_dummies.async_func_to_mock()) == 'I was awaited'
+        mocked.assert_awaited_once_with()
+
+    def test_sync_targets_unchanged(self):
+        mocked = get_mock('tests.dummies.yet_another_func_to_mock')
+        assert isinstance(mocked, mock.MagicMock)
+        assert not isinstance(mocked, mock.AsyncMock)
+
+    def test_reuse(self):
+        mocked = get_mock(REUSABLE_ASYNC_MOCK_PATH)
+        assert isinstance(mocked, mock.AsyncMock)
+        run(aio_dummies.async_func_to_mock_reusably())
+        mocked.assert_awaited_once_with()
+
+        stop_patching()
+        start_patching()
+
+        assert get_mock(REUSABLE_ASYNC_MOCK_PATH) is mocked
+        mocked.assert_not_awaited()
+
+    def test_swap_mock_default_factory(self):
+        with swap_mock(ASYNC_MOCK_PATH, return_value='I was swapped') as swapped:
+            assert isinstance(swapped, mock.AsyncMock)
+            assert run(aio_dummies.async_func_to_mock()) == 'I was swapped'
+
+    def test_lazy_async_context_manager(self):
+        stop_patching()
+        with override_settings(settings, LAZY_MOCKS=True):
+            start_patching()
+            assert isinstance(dummies.func_to_mock_lazily, base.LazyMock)
+
+            async def use():
+                async with dummies.func_to_mock_lazily as entered:
+                    return entered
+
+            # (forwarded to the mock the placeholder builds)
+            mocked = get_mock('tests.dummies.func_to_mock_lazily')
+            assert run(use()) is mocked.__aenter__.return_value
+
+
+class AsyncContextDecoratorTestCase(TestCase):
+
+    @requires_async_mock
+    def test_swap_mock(self):
+        start_patching()
+        try:
+            async def test():
+                async with swap_mock(SWAP_ASYNC_MOCK_PATH, 'I smell funny') as swapped:
+                    assert get_mock(SWAP_ASYNC_MOCK_PATH) is swapped
+                    return await aio_dummies.async_func_to_swap()
+
+            assert run(test()) == 'I smell funny'
+            assert run(aio_dummies.async_func_to_swap()) == 'I was swapped'
+        finally:
+            stop_patching()
+
+    @requires_async_mock
+    def test_swap_mock_decorator(self):
+        start_patching()
+        try:
+            @swap_mock(SWAP_ASYNC_MOCK_PATH, 'I smell funny')
+            async def test(fix1):
+                assert fix1 == 'OK'
+                return await aio_dummies.async_func_to_swap()
+
+            assert asyncio.iscoroutinefunction(test)
+            assert run(test('OK')) == 'I smell funny'
+            assert run(aio_dummies.async_func_to_swap()) == 'I was swapped'
+        finally:
+            stop_patching()
+
+    @requires_async_mock
+    def test_unmock(self):
+        start_patching()
+        try:
+            async def test():
+                async with unmock(SWAP_ASYNC_MOCK_PATH) as restored:
+                    assert restored is aio_dummies.async_func_to_swap
+                    return await aio_dummies.async_func_to_swap()
+
+            assert run(test()) == 'I was awaited'
+            assert run(aio_dummies.async_func_to_swap()) == 'I was swapped'
+        finally:
+            stop_patching()
+
+    @requires_async_mock
+    def test_unmock_decorator(self):
+        start_patching()
+        try:
+            @unmock(SWAP_ASYNC_MOCK_PATH)
+            async def test(fix1, restored):
+                assert fix1 == 'OK'
+                assert restored is aio_dummies.async_func_to_swap
+                return await aio_dummies.async_func_to_swap()
+
+            assert run(test('OK')) == 'I was awaited'
+            assert run(aio_dummies.async_func_to_swap()) == 'I was swapped'
+        finally:
+            stop_patching()
+
+    @requires_async_mock
+    def test_activate(self):
+        async def test():
+            async with activate():
+                assert dummies.func_to_mock() == 'I have large ears'
+                return await aio_dummies.async_func_to_swap()
+
+        assert run(test()) == 'I was swapped'
+        assert dummies.func_to_mock() == 'Go ahead, mock me'
+
+    @requires_async_mock
+    def test_activate_decorator(self):
+        @activate()
+        async def test(fix1):
+            assert fix1 == 'OK'
+            assert dummies.func_to_mock() == 'I have large ears'
+            return await aio_dummies.async_func_to_swap()
+
+        assert run(test('OK')) == 'I was swapped'
+        assert dummies.func_to_mock() == 'Go ahead, mock me'
+
+    def test_no_event_loop_needed_to_enter(self):
+        # (the context managers never await anything themselves, so they
+        # run in whichever loop is awaiting them)
+        context = activate()
+        coroutine = context.__aenter__()
+        try:
+            coroutine.send(None)
+        except StopIteration as e:
+            assert e.value is context
+        coroutine = context.__aexit__(None, None, None)
+        try:
+            coroutine.send(None)
+        except StopIteration:
+            pass
+        assert dummies.func_to_mock() == 'Go ahead, mock me'
+
+
+@requires_async_mock
+class ContextOverlaysTestCase(TestCase):
+
+    def setUp(self):
+        self.override = override_settings(settings, CONTEXT_OVERLAYS=True)
+        self.override.enable()
+        start_patching()
+
+    def tearDown(self):
+        stop_patching()
+        self.override.disable()
+
+    def test_concurrent_tasks(self):
+        async def scenario(mockery, started, others_started):
+            async with swap_mock(SWAP_ASYNC_MOCK_PATH, mockery):
+                started.set()
+                # (every task has swapped before any of them checks)
+                await others_started.wait()
+                result = await aio_dummies.async_func_to_swap()
+                assert get_mock(SWAP_ASYNC_MOCK_PATH).await_count == 1
+                return result
+
+        async def test():
+            events = [asyncio.Event() for _ in range(3)]
+            all_started = asyncio.Event()
+
+            async def wait_all():
+                for event in events:
+                    await event.wait()
+                all_started.set()
+
+            waiter = asyncio.ensure_future(wait_all())
+            results = await asyncio.gather(*[
+                scenario('scenario {}'.format(i), events[i], all_started)
+                for i in range(3)
+            ])
+            await waiter
+            return results
+
+        assert run(test()) == ['scenario 0', 'scenario 1', 'scenario 2']
+        # (only the tasks' own contexts were affected)
+        assert run(aio_dummies.async_func_to_swap()) == 'I was swapped'
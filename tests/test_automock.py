@@ -2,8 +2,13 @@ import os
 import shutil
 import sys
 import tempfile
+import threading
 from contextlib import contextmanager
-from unittest import TestCase
+from importlib import import_module
+from unittest import skipIf, TestCase
+
+import six
+from six.moves import reload_module
 
 from six.moves import mock
 from faker import Faker
@@ -12,22 +17,47 @@ from flexisettings.utils import override_settings
 from automock import (
     activate,
     AutomockTestCase,
+    call_checkpoint,
+    exclude_automocks,
+    get_called_mocks,
     get_mock,
+    no_automock,
+    only_automocks,
+    RecordCount,
+    RecordLast,
+    register,
     start_patching,
     stop_patching,
     swap_mock,
     unmock,
 )
-from automock.base import _factory_map, _pre_import
+from automock import base
+from automock.base import (
+    _factory_map,
+    _ModulePatch,
+    _Patch,
+    _patchers,
+    _pre_import,
+    _resolve,
+    _targets,
+    LazyMock,
+)
 from automock.conf import settings
 
-from tests import dummies
+from tests import automocks, dummies
 
 
 MOCK_PATH = 'tests.dummies.func_to_mock'
 OTHER_MOCK_PATH = 'tests.dummies.other_func_to_mock'
 YET_ANOTHER_MOCK_PATH = 'tests.dummies.yet_another_func_to_mock'
 PATH_TO_MOCK_DYNAMICALLY = 'tests.dummies.func_to_mock_dynamically'
+LAZY_MOCK_PATH = 'tests.dummies.func_to_mock_lazily'
+REUSABLE_MOCK_PATH = 'tests.dummies.func_to_mock_reusably'
+AUTOSPEC_MOCK_PATH = 'tests.dummies.func_to_autospec'
+AUTOSPEC_METHOD_PATH = 'tests.dummies.ChildToAutospec.method_to_autospec'
+RECORD_LAST_PATH = 'tests.dummies.func_to_record_last'
+RECORD_COUNT_PATH = 'tests.dummies.func_to_record_count'
+RECORD_SAMPLE_PATH = 'tests.dummies.func_to_record_sample'
 
 
 fake = Faker()
@@ -51,6 +81,38 @@ class Registration(TestCase):
         assert _factory_map[YET_ANOTHER_MOCK_PATH] is mock.MagicMock
 
 
+class PreImportTestCase(TestCase):
+
+    def setUp(self):
+        # (resolves the registered paths too)
+        start_patching()
+        stop_patching()
+
+    def test_only_imports_once(self):
+        with mock.patch.object(base, 'import_module') as import_module:
+            _pre_import()
+            start_patching()
+            stop_patching()
+        import_module.assert_not_called()
+
+    def test_reimports_when_changed(self):
+        with mock.patch.object(base, 'import_module') as import_module:
+            with override_settings(settings, REGISTRATION_IMPORTS=('tests.dummies',)):
+                _pre_import()
+                _pre_import()
+            import_module.assert_called_once_with('tests.dummies')
+
+            _pre_import()
+            assert import_module.call_count == 2
+            import_module.assert_called_with('tests.automocks')
+
+    def test_not_reimported_when_unchanged(self):
+        with mock.patch.object(base, 'import_module') as import_module:
+            with override_settings(settings, LAZY_MOCKS=True):
+                _pre_import()
+        import_module.assert_not_called()
+
+
 class StartStopPatching(TestCase):
 
     def test_start_stop(self):
@@ -80,6 +142,596 @@ class StartStopPatching(TestCase):
         stop_patching()
 
 
+class ResolutionCacheTestCase(TestCase):
+
+    def test_resolve(self):
+        target = _resolve(MOCK_PATH)
+        assert target.owner is dummies
+        assert target.attribute == 'func_to_mock'
+        assert target.original is dummies.func_to_mock
+        assert _resolve(MOCK_PATH) is target
+
+    def test_patching_uses_cache(self):
+        start_patching()
+        stop_patching()
+
+        with mock.patch.object(base, '_import_owner') as import_owner:
+            start_patching()
+            try:
+                assert dummies.func_to_mock() == 'I have large ears'
+                with unmock(MOCK_PATH) as restored:
+                    assert restored() == 'Go ahead, mock me'
+            finally:
+                stop_patching()
+
+        import_owner.assert_not_called()
+
+    def test_register_invalidates(self):
+        target = _resolve(MOCK_PATH)
+        register(MOCK_PATH, _factory_map[MOCK_PATH])
+        assert MOCK_PATH not in _targets
+        assert _resolve(MOCK_PATH) is not target
+
+    @skipIf(six.PY2, 'reloads are detected via module.__spec__')
+    def test_reload_invalidates(self):
+        target = _resolve(MOCK_PATH)
+        reload_module(dummies)
+
+        new_target = _resolve(MOCK_PATH)
+        assert new_target is not target
+        assert new_target.original is dummies.func_to_mock
+
+        start_patching()
+        try:
+            with unmock(MOCK_PATH) as restored:
+                assert restored is dummies.func_to_mock
+        finally:
+            stop_patching()
+        assert dummies.func_to_mock is new_target.original
+
+
+class LazyMocksTestCase(TestCase):
+
+    def setUp(self):
+        del automocks.lazy_factory_calls[:]
+        self.override = override_settings(settings, LAZY_MOCKS=True)
+        self.override.enable()
+        start_patching()
+
+    def tearDown(self):
+        stop_patching()
+        self.override.disable()
+
+    def test_factory_called_on_first_call(self):
+        assert isinstance(dummies.func_to_mock_lazily, LazyMock)
+        assert automocks.lazy_factory_calls == []
+
+        assert dummies.func_to_mock_lazily() == 'I was not built yet'
+        assert dummies.func_to_mock_lazily() == 'I was not built yet'
+        assert automocks.lazy_factory_calls == ['I was not built yet']
+
+    def test_factory_called_on_attribute_access(self):
+        dummies.func_to_mock_lazily.return_value = 'I was built'
+        assert automocks.lazy_factory_calls == ['I was not built yet']
+        assert dummies.func_to_mock_lazily() == 'I was built'
+
+    def test_magic_methods_forwarded(self):
+        lazy = dummies.func_to_mock_lazily
+        assert isinstance(lazy, mock.MagicMock)
+        assert automocks.lazy_factory_calls == ['I was not built yet']
+        mocked = get_mock(LAZY_MOCK_PATH)
+
+        mocked.__str__.return_value = 'I am a string'
+        mocked.__int__.return_value = 42
+        mocked.__lt__.return_value = True
+        mocked.__contains__.return_value = True
+        assert str(lazy) == 'I am a string'
+        assert int(lazy) == 42
+        assert lazy < 1
+        assert 'anything' in lazy
+        assert lazy.__class__ is mocked.__class__
+
+    def test_get_mock(self):
+        mocked = get_mock(LAZY_MOCK_PATH)
+        assert automocks.lazy_factory_calls == ['I was not built yet']
+        assert isinstance(mocked, mock.MagicMock)
+
+        dummies.func_to_mock_lazily(1)
+        mocked.assert_called_once_with(1)
+        assert get_mock(LAZY_MOCK_PATH) is mocked
+        assert automocks.lazy_factory_calls == ['I was not built yet']
+
+    def test_get_called_mocks(self):
+        assert get_called_mocks() == {}
+
+        # building the mock doesn't count as calling it
+        get_mock(LAZY_MOCK_PATH)
+        assert get_called_mocks() == {}
+
+        dummies.func_to_mock_lazily()
+        dummies.func_to_mock()
+        assert get_called_mocks() == {
+            LAZY_MOCK_PATH: get_mock(LAZY_MOCK_PATH),
+            MOCK_PATH: get_mock(MOCK_PATH),
+        }
+
+    def test_swap_mock(self):
+        with swap_mock(LAZY_MOCK_PATH, mockery='I was swapped') as mocked:
+            assert dummies.func_to_mock_lazily() == 'I was swapped'
+            assert get_mock(LAZY_MOCK_PATH) is mocked
+
+        # placeholder was restored, still not built
+        assert isinstance(dummies.func_to_mock_lazily, LazyMock)
+        assert automocks.lazy_factory_calls == ['I was swapped']
+        assert dummies.func_to_mock_lazily() == 'I was not built yet'
+
+
+class ReusableMocksTestCase(TestCase):
+
+    def test_factory_called_once(self):
+        start_patching()
+        stop_patching()
+        calls = len(automocks.reusable_factory_calls)
+
+        start_patching()
+        mocked = get_mock(REUSABLE_MOCK_PATH)
+        stop_patching()
+
+        start_patching()
+        try:
+            assert get_mock(REUSABLE_MOCK_PATH) is mocked
+            assert dummies.func_to_mock_reusably is mocked
+        finally:
+            stop_patching()
+
+        assert len(automocks.reusable_factory_calls) == calls
+        assert dummies.func_to_mock_reusably() == 'Go ahead, mock me reusably'
+
+    def test_restored_between_tests(self):
+        start_patching()
+        try:
+            mocked = get_mock(REUSABLE_MOCK_PATH)
+            assert dummies.func_to_mock_reusably() == 'I am as good as new'
+            mocked.return_value = 'I am used'
+            mocked.side_effect = ValueError
+            mocked.child.return_value = 'I am a used child'
+            mocked.other_child.return_value = 'I am new'
+            mocked.attribute = 'I am new'
+            with self.assertRaises(ValueError):
+                dummies.func_to_mock_reusably(1)
+        finally:
+            stop_patching()
+
+        start_patching()
+        try:
+            assert get_mock(REUSABLE_MOCK_PATH) is mocked
+            assert not mocked.called
+            assert mocked.mock_calls == []
+            assert dummies.func_to_mock_reusably() == 'I am as good as new'
+            assert mocked.child() == 'I am a child'
+            assert isinstance(mocked.other_child(), mock.MagicMock)
+            assert isinstance(mocked.attribute, mock.MagicMock)
+            mocked.assert_called_once_with()
+        finally:
+            stop_patching()
+
+    def test_same_as_fresh_mock(self):
+        def use(mocked):
+            mocked(1, two=2)
+            mocked.child(3)
+            mocked.child.grandchild(4)
+            mocked.__len__.return_value = 5
+            return {
+                'result': mocked(),
+                'child': mocked.child(),
+                'len': len(mocked),
+                'call_count': mocked.call_count,
+                'mock_calls': [tuple(c) for c in mocked.mock_calls],
+                'method_calls': [tuple(c) for c in mocked.method_calls],
+            }
+
+        start_patching()
+        try:
+            use(get_mock(REUSABLE_MOCK_PATH))
+        finally:
+            stop_patching()
+
+        start_patching()
+        try:
+            reused = use(get_mock(REUSABLE_MOCK_PATH))
+        finally:
+            stop_patching()
+
+        fresh = use(automocks.reusable_mock_factory())
+        assert reused == fresh
+
+    def test_swap_mock(self):
+        start_patching()
+        try:
+            pooled = get_mock(REUSABLE_MOCK_PATH)
+            with swap_mock(REUSABLE_MOCK_PATH, mockery='I was swapped') as swapped:
+                assert swapped is not pooled
+                assert dummies.func_to_mock_reusably() == 'I was swapped'
+            assert get_mock(REUSABLE_MOCK_PATH) is pooled
+        finally:
+            stop_patching()
+
+    def test_reset_not_a_mock(self):
+        # (an autospecced function can't be restored, so it's patched again)
+        register(
+            YET_ANOTHER_MOCK_PATH,
+            lambda: mock.create_autospec(lambda: None, return_value='I am a function'),
+        )
+        self.addCleanup(register, YET_ANOTHER_MOCK_PATH)
+
+        start_patching(reuse=True)
+        try:
+            used = dummies.yet_another_func_to_mock
+            assert dummies.yet_another_func_to_mock() == 'I am a function'
+            base.reset_mocks()
+            assert dummies.yet_another_func_to_mock is not used
+            assert get_mock(YET_ANOTHER_MOCK_PATH) is dummies.yet_another_func_to_mock
+            assert not dummies.yet_another_func_to_mock.called
+            assert get_called_mocks() == {}
+        finally:
+            stop_patching()
+        assert dummies.yet_another_func_to_mock() == 'Go ahead, mock me 3'
+
+    def test_register_again(self):
+        start_patching()
+        pooled = get_mock(REUSABLE_MOCK_PATH)
+        stop_patching()
+
+        register(REUSABLE_MOCK_PATH, automocks.reusable_mock_factory, reuse=True)
+
+        start_patching()
+        try:
+            assert get_mock(REUSABLE_MOCK_PATH) is not pooled
+        finally:
+            stop_patching()
+
+
+class DirtyTrackingTestCase(TestCase):
+
+    def setUp(self):
+        start_patching()
+
+    def tearDown(self):
+        stop_patching()
+
+    def test_untouched_mocks_are_clean(self):
+        assert base._dirty == set()
+
+    def test_called(self):
+        dummies.func_to_mock()
+        assert base._dirty == {MOCK_PATH}
+        assert get_called_mocks() == {MOCK_PATH: base._mocks[MOCK_PATH]}
+
+    def test_child_read(self):
+        dummies.func_to_mock.child
+        assert base._dirty == {MOCK_PATH}
+
+    def test_attribute_set(self):
+        dummies.func_to_mock.return_value = 'I am configured'
+        assert base._dirty == {MOCK_PATH}
+
+    def test_magic_method(self):
+        with dummies.func_to_mock:
+            pass
+        assert base._dirty == {MOCK_PATH}
+
+    def test_get_mock(self):
+        get_mock(MOCK_PATH)
+        assert base._dirty == {MOCK_PATH}
+        assert get_called_mocks() == {}
+
+    def test_swap_mock(self):
+        with swap_mock(MOCK_PATH):
+            assert base._dirty == {MOCK_PATH}
+            dummies.func_to_mock()
+            assert list(get_called_mocks()) == [MOCK_PATH]
+
+    def test_called_after_attribute_read(self):
+        dummies.func_to_mock.return_value
+        assert base._called == set()
+        # (the call hook stays until called)
+        dummies.func_to_mock()
+        assert base._called == {MOCK_PATH}
+        assert get_called_mocks() == {MOCK_PATH: base._mocks[MOCK_PATH]}
+
+    def test_only_called_mocks_checked(self):
+        dummies.func_to_mock()
+        dummies.other_func_to_mock.child
+        checked = []
+        original_call_counts = base._call_counts
+
+        def call_counts(names):
+            names = list(names)
+            checked.extend(names)
+            return original_call_counts(names)
+
+        with mock.patch.object(base, '_call_counts', call_counts):
+            get_called_mocks()
+        assert checked == [MOCK_PATH]
+
+    def test_more_than(self):
+        dummies.func_to_mock()
+        dummies.other_func_to_mock()
+        dummies.other_func_to_mock()
+        assert list(get_called_mocks(more_than=1)) == [OTHER_MOCK_PATH]
+        assert get_called_mocks(more_than=2) == {}
+
+    def test_since_checkpoint(self):
+        dummies.func_to_mock()
+        dummies.other_func_to_mock()
+        checkpoint = call_checkpoint()
+        assert get_called_mocks(since=checkpoint) == {}
+
+        dummies.other_func_to_mock()
+        dummies.yet_another_func_to_mock()
+        assert set(get_called_mocks(since=checkpoint)) == {
+            OTHER_MOCK_PATH, YET_ANOTHER_MOCK_PATH,
+        }
+
+        # (a different mock since the checkpoint, all its calls count)
+        with swap_mock(MOCK_PATH) as swapped:
+            swapped()
+            assert MOCK_PATH in get_called_mocks(since=checkpoint)
+
+    def test_swapped_mock_called(self):
+        with swap_mock(MOCK_PATH) as swapped:
+            swapped()
+        # (the default mock is back, and wasn't called)
+        assert get_called_mocks() == {}
+
+    def test_restored_mocks_forgotten(self):
+        stop_patching()
+        start_patching(reuse=True)
+        dummies.func_to_mock()
+        base.reset_mocks()
+        assert base._called == set()
+        assert get_called_mocks() == {}
+
+    def test_return_value_configured(self):
+        # (`return_value` is a property of the mock class, not a child mock)
+        def factory():
+            mocked = mock.MagicMock()
+            mocked.return_value.status = 200
+            return mocked
+
+        stop_patching()
+        register(YET_ANOTHER_MOCK_PATH, factory)
+        self.addCleanup(register, YET_ANOTHER_MOCK_PATH)
+        start_patching(reuse=True)
+
+        rv = dummies.yet_another_func_to_mock.return_value
+        assert base._dirty == {YET_ANOTHER_MOCK_PATH}
+        rv.status = 500
+        rv.json.return_value = {}
+        base.reset_mocks()
+
+        rv = dummies.yet_another_func_to_mock.return_value
+        assert rv.status == 200
+        assert isinstance(rv.json(), mock.MagicMock)
+
+    def test_magic_method_configured(self):
+        # (configured magic methods are set on the mock's class)
+        def factory():
+            mocked = mock.MagicMock()
+            mocked.__getitem__.return_value = 'I am an item'
+            return mocked
+
+        stop_patching()
+        register(YET_ANOTHER_MOCK_PATH, factory)
+        self.addCleanup(register, YET_ANOTHER_MOCK_PATH)
+        start_patching(reuse=True)
+
+        assert dummies.yet_another_func_to_mock['key'] == 'I am an item'
+        assert base._dirty == {YET_ANOTHER_MOCK_PATH}
+        assert get_called_mocks() == {}
+        base.reset_mocks()
+        assert dummies.yet_another_func_to_mock.mock_calls == []
+
+        base.reset_mocks()
+        dummies.yet_another_func_to_mock.__getitem__.return_value = 'I was changed'
+        assert base._dirty == {YET_ANOTHER_MOCK_PATH}
+        base.reset_mocks()
+        assert dummies.yet_another_func_to_mock['key'] == 'I am an item'
+
+    def test_reset_and_configure(self):
+        dummies.func_to_mock.reset_mock()
+        assert base._dirty == {MOCK_PATH}
+
+        stop_patching()
+        start_patching()
+        dummies.func_to_mock.configure_mock(return_value='I am configured')
+        assert base._dirty == {MOCK_PATH}
+
+    def test_hooks_removed_once_dirty(self):
+        mock_type = type(base._mocks[MOCK_PATH])
+        assert '__call__' in mock_type.__dict__
+        dummies.func_to_mock(1)
+        assert '__call__' not in mock_type.__dict__
+        assert '_automock_path' not in mock_type.__dict__
+        dummies.func_to_mock.assert_called_once_with(1)
+
+    def test_only_dirty_pooled_mocks_restored(self):
+        stop_patching()
+        start_patching(reuse=True)
+
+        restored = []
+        original_restore = base.MockSnapshot.restore
+
+        def restore(snapshot):
+            restored.append(snapshot.mock)
+            original_restore(snapshot)
+
+        dummies.func_to_mock()
+        with mock.patch.object(base.MockSnapshot, 'restore', restore):
+            base.reset_mocks()
+        assert restored == [base._mocks[MOCK_PATH]]
+        assert not dummies.func_to_mock.called
+        assert base._dirty == set()
+
+        # (hooked again after the reset)
+        dummies.func_to_mock()
+        assert get_called_mocks() == {MOCK_PATH: base._mocks[MOCK_PATH]}
+
+
+class AutospecTestCase(TestCase):
+
+    def setUp(self):
+        start_patching()
+
+    def tearDown(self):
+        stop_patching()
+
+    def test_signature_checked(self):
+        assert dummies.func_to_autospec('Bob') == 'I am to spec'
+        assert dummies.func_to_autospec('Bob', greeting='Hi') == 'I am to spec'
+        with self.assertRaises(TypeError):
+            dummies.func_to_autospec()
+        with self.assertRaises(TypeError):
+            dummies.func_to_autospec('Bob', colour='blue')
+
+        mocked = get_mock(AUTOSPEC_MOCK_PATH)
+        # (calls are matched by signature)
+        mocked.assert_any_call(name='Bob')
+
+    def test_attributes_restricted(self):
+        mocked = get_mock(AUTOSPEC_MOCK_PATH)
+        assert mocked.__name__ is not None
+        with self.assertRaises(AttributeError):
+            mocked.not_a_function_attribute
+        with self.assertRaises(TypeError):
+            len(mocked)
+
+    def test_class(self):
+        with self.assertRaises(TypeError):
+            dummies.ClassToAutospec()
+        instance = dummies.ClassToAutospec('Bob')
+        instance.greet('Hello')
+        with self.assertRaises(AttributeError):
+            instance.not_a_method
+
+    def test_method(self):
+        dummies.ChildToAutospec().method_to_autospec(1)
+        with self.assertRaises(TypeError):
+            dummies.ChildToAutospec().method_to_autospec()
+
+    def test_introspected_once(self):
+        spec = base._get_spec(base._registry[AUTOSPEC_MOCK_PATH])
+        stop_patching()
+        start_patching()
+        dummies.func_to_autospec('Bob')
+        assert base._get_spec(base._registry[AUTOSPEC_MOCK_PATH]) is spec
+
+        with mock.patch.object(base, 'CachedSpec') as cached_spec:
+            stop_patching()
+            start_patching()
+        assert not cached_spec.called
+
+    def test_swap_mock(self):
+        with swap_mock(AUTOSPEC_MOCK_PATH, mockery='I am swapped to spec'):
+            assert dummies.func_to_autospec('Bob') == 'I am swapped to spec'
+            with self.assertRaises(TypeError):
+                dummies.func_to_autospec()
+
+    def test_reuse(self):
+        stop_patching()
+        start_patching(reuse=True)
+        mocked = get_mock(AUTOSPEC_MOCK_PATH)
+        dummies.func_to_autospec('Bob')
+        base.reset_mocks()
+
+        assert get_mock(AUTOSPEC_MOCK_PATH) is mocked
+        assert not mocked.called
+        with self.assertRaises(TypeError):
+            dummies.func_to_autospec()
+
+
+class RecordingTestCase(TestCase):
+
+    def setUp(self):
+        start_patching()
+
+    def tearDown(self):
+        stop_patching()
+
+    def test_record_last(self):
+        for i in range(10):
+            assert dummies.func_to_record_last(i) == 'I only remember the last calls'
+
+        mocked = get_mock(RECORD_LAST_PATH)
+        assert mocked.call_count == 10
+        assert mocked.call_args_list == [mock.call(7), mock.call(8), mock.call(9)]
+        assert mocked.mock_calls == [mock.call(7), mock.call(8), mock.call(9)]
+        mocked.assert_called_with(9)
+        mocked.assert_has_calls([mock.call(8), mock.call(9)])
+        with self.assertRaises(AssertionError):
+            mocked.assert_any_call(6)
+
+    def test_record_last_children(self):
+        mocked = get_mock(RECORD_LAST_PATH)
+        for i in range(10):
+            assert dummies.func_to_record_last.child(i) == 'I am a child'
+            dummies.func_to_record_last.new_child(i)
+
+        assert mocked.child.call_count == 10
+        assert mocked.child.call_args_list == [mock.call(7), mock.call(8), mock.call(9)]
+        assert mocked.new_child.call_args_list == [mock.call(7), mock.call(8), mock.call(9)]
+        assert mocked.mock_calls == [
+            mock.call.new_child(8),
+            mock.call.child(9),
+            mock.call.new_child(9),
+        ]
+        assert mocked.method_calls == mocked.mock_calls
+
+    def test_record_last_reuse(self):
+        stop_patching()
+        start_patching(reuse=True)
+        mocked = get_mock(RECORD_LAST_PATH)
+        base.reset_mocks()
+        for i in range(10):
+            dummies.func_to_record_last(i)
+
+        assert get_mock(RECORD_LAST_PATH) is mocked
+        assert mocked.call_args_list == [mock.call(7), mock.call(8), mock.call(9)]
+
+    def test_record_count(self):
+        for i in range(10):
+            dummies.func_to_record_count(i)
+            dummies.func_to_record_count.child(i)
+
+        mocked = get_mock(RECORD_COUNT_PATH)
+        assert mocked.call_count == 10
+        assert mocked.child.call_count == 10
+        assert mocked.call_args_list == []
+        assert mocked.mock_calls == []
+        mocked.assert_called_with(9)
+        mocked.child.assert_called_with(9)
+        assert get_called_mocks() == {RECORD_COUNT_PATH: mocked}
+
+    def test_record_sample(self):
+        for i in range(25):
+            dummies.func_to_record_sample(i)
+
+        mocked = get_mock(RECORD_SAMPLE_PATH)
+        assert mocked.call_count == 25
+        assert mocked.call_args_list == [mock.call(0), mock.call(10), mock.call(20)]
+        mocked.assert_called_with(24)
+
+    def test_swap_mock(self):
+        with swap_mock(RECORD_LAST_PATH, mockery='I am swapped') as swapped:
+            for i in range(10):
+                assert dummies.func_to_record_last(i) == 'I am swapped'
+        assert swapped.call_args_list == [mock.call(7), mock.call(8), mock.call(9)]
+
+    def test_repr(self):
+        assert repr(RecordLast(3)) == 'RecordLast(3)'
+        assert repr(RecordCount()) == 'RecordCount()'
+
+
 @contextmanager
 def dynamic_automocking_module():
     """
@@ -122,6 +774,143 @@ def mock_factory(mockery='I have bad breath'):
     shutil.rmtree(tmpdir)
 
 
+@contextmanager
+def deferred_module(package=False):
+    """
+    Dynamically create a temporary module file (but don't import it), with
+    an automock registered for its `heavy` function.
+
+    Then unregister and clean up the temporary module after using.
+
+    Kwargs:
+        package: create the module as the `client` submodule of a package
+    """
+    tmpdir = tempfile.mkdtemp()
+
+    module_name = '_'.join(fake.words(nb=3))
+    assert module_name not in sys.modules
+
+    filename = os.path.join(tmpdir, '{}.py'.format(module_name))
+    if package:
+        os.mkdir(os.path.join(tmpdir, module_name))
+        open(os.path.join(tmpdir, module_name, '__init__.py'), 'w').close()
+        filename = os.path.join(tmpdir, module_name, 'client.py')
+        module_name += '.client'
+    with open(filename, 'w+') as tmp:
+        tmp.write("""
+def heavy():
+    return 'I was imported'
+""")
+
+    sys.path.append(tmpdir)
+    path = '{}.heavy'.format(module_name)
+    register(path, lambda: mock.MagicMock(return_value='I was deferred'))
+    try:
+        yield path
+    finally:
+        base._registry.unregister(path)
+        sys.modules.pop(module_name, None)
+        sys.modules.pop(module_name.split('.')[0], None)
+        sys.path.remove(tmpdir)
+        shutil.rmtree(tmpdir)
+
+
+@skipIf(six.PY2, 'the import hook needs the Python 3 import machinery')
+class PatchOnImportTestCase(TestCase):
+
+    def setUp(self):
+        self.override = override_settings(settings, PATCH_ON_IMPORT=True)
+        self.override.enable()
+
+    def tearDown(self):
+        self.override.disable()
+
+    def test_patched_when_imported(self):
+        with deferred_module() as path:
+            module_name = path.split('.')[0]
+            start_patching()
+            try:
+                # not imported by patching
+                assert module_name not in sys.modules
+                assert path not in _patchers
+                # (already imported modules are patched straight away)
+                assert dummies.func_to_mock() == 'I have large ears'
+
+                module = import_module(module_name)
+                assert module.heavy() == 'I was deferred'
+                assert path in _patchers
+            finally:
+                stop_patching()
+            assert module.heavy() == 'I was imported'
+            assert base._import_watcher not in sys.meta_path
+
+    def test_submodule(self):
+        for parent_imported in (False, True):
+            with deferred_module(package=True) as path:
+                module_name = path.rpartition('.')[0]
+                package_name = module_name.split('.')[0]
+                if parent_imported:
+                    import_module(package_name)
+                start_patching()
+                try:
+                    assert module_name not in sys.modules
+
+                    namespace = {}
+                    exec('import {}'.format(module_name), namespace)
+                    module = sys.modules[module_name]
+                    assert module.heavy() == 'I was deferred'
+                    assert getattr(namespace[package_name], 'client') is module
+                finally:
+                    stop_patching()
+                assert module.heavy() == 'I was imported'
+
+    def test_from_import(self):
+        with deferred_module() as path:
+            module_name = path.split('.')[0]
+            start_patching()
+            try:
+                heavy = import_module(module_name).heavy
+                namespace = {}
+                exec('from {} import heavy'.format(module_name), namespace)
+                assert namespace['heavy'] is heavy
+                assert heavy() == 'I was deferred'
+            finally:
+                stop_patching()
+
+    def test_never_imported(self):
+        with deferred_module() as path:
+            start_patching()
+            assert base._import_watcher in sys.meta_path
+            stop_patching()
+            assert base._import_watcher not in sys.meta_path
+            assert path.split('.')[0] not in sys.modules
+
+    def test_get_mock_imports(self):
+        with deferred_module() as path:
+            start_patching()
+            try:
+                mocked = get_mock(path)
+                assert mocked() == 'I was deferred'
+                assert sys.modules[path.split('.')[0]].heavy is mocked
+            finally:
+                stop_patching()
+
+    def test_unmock(self):
+        with deferred_module() as path:
+            start_patching()
+            try:
+                with unmock(path) as restored:
+                    assert restored() == 'I was imported'
+                assert sys.modules[path.split('.')[0]].heavy() == 'I was deferred'
+            finally:
+                stop_patching()
+
+    def test_warm_up_does_not_import(self):
+        with deferred_module() as path:
+            base._warm_up()
+            assert path.split('.')[0] not in sys.modules
+
+
 class SwapMockContextDecoratorTestCase(TestCase):
 
     def test_context_manager(self):
@@ -134,14 +923,14 @@ class SwapMockContextDecoratorTestCase(TestCase):
                 # `as` returns the swapped mock
                 assert mocked.return_value == 'I smell funny'
 
-                # _mocks dict was patched too
+                # get_mock sees the swapped mock
                 swapped = get_mock(MOCK_PATH)
                 assert swapped is mocked
 
             # default mock was restored
             assert dummies.func_to_mock() == 'I have large ears'
 
-            # _mocks dict was restored
+            # get_mock sees the default mock again
             swapped = get_mock(MOCK_PATH)
             assert swapped.return_value == 'I have large ears'
         finally:
@@ -160,7 +949,7 @@ class SwapMockContextDecoratorTestCase(TestCase):
                 # we have swapped mock for target func
                 assert dummies.func_to_mock_dynamically() == 'I laugh at bad jokes'
 
-                # _mocks dict was patched too
+                # get_mock sees the swapped mock
                 swapped = get_mock(PATH_TO_MOCK_DYNAMICALLY)
                 assert swapped.return_value == 'I laugh at bad jokes'
 
@@ -178,22 +967,119 @@ class SwapMockContextDecoratorTestCase(TestCase):
                 # default mock was restored after calling func
                 assert dummies.func_to_mock_dynamically() == 'I have bad breath'
 
-                # _mocks dict was restored
+                # get_mock sees the default mock again
                 swapped = get_mock(PATH_TO_MOCK_DYNAMICALLY)
                 assert swapped.return_value == 'I have bad breath'
             finally:
                 stop_patching()
 
 
+    def test_nested(self):
+        start_patching()
+        try:
+            default = get_mock(MOCK_PATH)
+            with swap_mock(MOCK_PATH, mockery='I smell funny') as outer:
+                with swap_mock(MOCK_PATH, mockery='I laugh at bad jokes') as inner:
+                    assert get_mock(MOCK_PATH) is inner
+                    assert dummies.func_to_mock() == 'I laugh at bad jokes'
+                assert get_mock(MOCK_PATH) is outer
+                assert dummies.func_to_mock() == 'I smell funny'
+            assert get_mock(MOCK_PATH) is default
+            assert not base._registry[MOCK_PATH].swaps
+        finally:
+            stop_patching()
+
+    def test_exited_out_of_order(self):
+        start_patching()
+        try:
+            default = get_mock(MOCK_PATH)
+            outer = swap_mock(MOCK_PATH, mockery='I smell funny')
+            inner = swap_mock(MOCK_PATH, mockery='I laugh at bad jokes')
+            outer.__enter__()
+            inner_mock = inner.__enter__()
+            outer.__exit__(None, None, None)
+            assert get_mock(MOCK_PATH) is inner_mock
+            inner.__exit__(None, None, None)
+            assert get_mock(MOCK_PATH) is default
+        finally:
+            stop_patching()
+
+
+class SwapMockDeferredTestCase(TestCase):
+
+    def setUp(self):
+        start_patching()
+        del automocks.lazy_factory_calls[:]
+
+    def tearDown(self):
+        stop_patching()
+        del automocks.lazy_factory_calls[:]
+
+    def test_nothing_built_when_decorating(self):
+        with mock.patch.object(base, '_pre_import') as pre_import:
+            @swap_mock(LAZY_MOCK_PATH, mockery='I was swapped')
+            def test_func():
+                return get_mock(LAZY_MOCK_PATH)
+
+            pre_import.assert_not_called()
+        assert automocks.lazy_factory_calls == []
+
+        first = test_func()
+        second = test_func()
+        assert automocks.lazy_factory_calls == ['I was swapped', 'I was swapped']
+        # (a new mock for every run)
+        assert first is not second
+
+    def test_templates(self):
+        with override_settings(settings, SWAP_MOCK_TEMPLATES=True):
+            with swap_mock(LAZY_MOCK_PATH, mockery='I was swapped') as first:
+                dummies.func_to_mock_lazily()
+                first.return_value = 'I was configured'
+
+            with swap_mock(LAZY_MOCK_PATH, mockery='I was swapped') as second:
+                # restored to its freshly-built state
+                assert second is first
+                assert not second.called
+                assert dummies.func_to_mock_lazily() == 'I was swapped'
+
+                # (already in use)
+                with swap_mock(LAZY_MOCK_PATH, mockery='I was swapped') as nested:
+                    assert nested is not first
+
+            with swap_mock(LAZY_MOCK_PATH, mockery='I am different') as other:
+                assert other is not first
+
+        assert automocks.lazy_factory_calls == [
+            'I was swapped', 'I was swapped', 'I am different',
+        ]
+
+    def test_templates_unhashable_args(self):
+        with override_settings(settings, SWAP_MOCK_TEMPLATES=True):
+            with swap_mock(LAZY_MOCK_PATH, mockery=['I was swapped']) as first:
+                pass
+            with swap_mock(LAZY_MOCK_PATH, mockery=['I was swapped']) as second:
+                pass
+        assert first is not second
+
+    def test_templates_dropped_on_register(self):
+        with override_settings(settings, SWAP_MOCK_TEMPLATES=True):
+            with swap_mock(LAZY_MOCK_PATH):
+                pass
+            assert base._registry[LAZY_MOCK_PATH].swap_templates
+            register(LAZY_MOCK_PATH, automocks.lazy_mock_factory)
+            assert base._registry[LAZY_MOCK_PATH].swap_templates is None
+
+
 class UnMockContextDecoratorTestCase(TestCase):
 
     def test_context_manager(self):
         start_patching()
         try:
+            mocked = get_mock(MOCK_PATH)
             with unmock(MOCK_PATH) as restored:
-                # mock was cleared
-                with self.assertRaises(KeyError):
-                    get_mock(MOCK_PATH)
+                # the mock is kept, but not patched in
+                assert get_mock(MOCK_PATH) is mocked
+                assert dummies.func_to_mock is restored
 
                 # other mocks un-touched
                 get_mock(OTHER_MOCK_PATH)
@@ -201,14 +1087,56 @@ class UnMockContextDecoratorTestCase(TestCase):
                 # we have restored real implementation of target func
                 assert restored() == 'Go ahead, mock me'
 
-            # default mock was re-enabled
+            # the same mock was re-enabled
+            assert dummies.func_to_mock is mocked
             assert dummies.func_to_mock() == 'I have large ears'
+        finally:
+            stop_patching()
 
-            # _mocks dict was restored
-            swapped = get_mock(MOCK_PATH)
-            assert swapped.return_value == 'I have large ears'
+    def test_nested(self):
+        start_patching()
+        try:
+            mocked = get_mock(MOCK_PATH)
+            context = unmock(MOCK_PATH)
+            with context as restored:
+                with context:
+                    assert dummies.func_to_mock is restored
+                assert dummies.func_to_mock is restored
+            assert dummies.func_to_mock is mocked
+        finally:
+            stop_patching()
+
+    def test_no_factory_call_or_import(self):
+        start_patching()
+        try:
+            with mock.patch.object(base, 'import_module') as import_module:
+                with mock.patch.object(automocks, 'mock_factory') as factory:
+                    with unmock(MOCK_PATH):
+                        pass
+            import_module.assert_not_called()
+            factory.assert_not_called()
+        finally:
+            stop_patching()
+
+    def test_method(self):
+        start_patching()
+        try:
+            mocked = get_mock(AUTOSPEC_METHOD_PATH)
+            with unmock(AUTOSPEC_METHOD_PATH) as restored:
+                child = dummies.ChildToAutospec()
+                assert child.method_to_autospec(1) == 'Go ahead, mock my method to spec'
+                # (not `is`: Python 2 builds a new unbound method each time)
+                assert restored == dummies.ParentToAutospec.method_to_autospec
+            assert dummies.ChildToAutospec.method_to_autospec is mocked
         finally:
             stop_patching()
+        # (the inherited method is un-shadowed)
+        assert 'method_to_autospec' not in dummies.ChildToAutospec.__dict__
+
+    def test_not_patched(self):
+        with self.assertRaises(KeyError):
+            with unmock(MOCK_PATH):
+                pass
 
     def test_decorator(self):
         """
@@ -223,9 +1151,8 @@ class UnMockContextDecoratorTestCase(TestCase):
                 # we have restored real implementation of target func
                 assert restored() == 'Go ahead, mock me dynamically'
 
-                # mock was cleared
-                with self.assertRaises(KeyError):
-                    get_mock(PATH_TO_MOCK_DYNAMICALLY)
+                # mock was kept
+                assert get_mock(PATH_TO_MOCK_DYNAMICALLY).return_value == 'I have bad breath'
 
                 # other mocks un-touched
                 get_mock(OTHER_MOCK_PATH)
@@ -244,13 +1171,239 @@ class UnMockContextDecoratorTestCase(TestCase):
                 # default mock still in place after calling func
                 assert dummies.func_to_mock_dynamically() == 'I have bad breath'
 
-                # _mocks dict was restored
+                # get_mock sees the default mock again
                 swapped = get_mock(PATH_TO_MOCK_DYNAMICALLY)
                 assert swapped.return_value == 'I have bad breath'
             finally:
                 stop_patching()
 
 
+class BuiltinPatchEngineMixin(object):
+
+    def setUp(self):
+        self.override = override_settings(settings, PATCH_ENGINE='builtin')
+        self.override.enable()
+        super(BuiltinPatchEngineMixin, self).setUp()
+
+    def tearDown(self):
+        super(BuiltinPatchEngineMixin, self).tearDown()
+        self.override.disable()
+
+
+class BuiltinPatchEngineTestCase(BuiltinPatchEngineMixin, TestCase):
+
+    def test_patchers(self):
+        start_patching(MOCK_PATH)
+        try:
+            patcher = _patchers[MOCK_PATH]
+            assert isinstance(patcher, _Patch)
+            assert patcher.owner is dummies
+            assert patcher.attribute == 'func_to_mock'
+            assert patcher.original is _resolve(MOCK_PATH).original
+            assert patcher.current is get_mock(MOCK_PATH)
+        finally:
+            stop_patching()
+        assert not _patchers
+
+    def test_grouped_by_module(self):
+        start_patching()
+        try:
+            patcher = _patchers[MOCK_PATH]
+            assert isinstance(patcher, _ModulePatch)
+            assert patcher.module is dummies
+            # all our module-level registrations are in the same module
+            assert all(
+                _patchers[path] is patcher
+                for path in _factory_map
+                if _resolve(path).owner is dummies
+            )
+            # (methods are patched on their class individually)
+            assert isinstance(_patchers[AUTOSPEC_METHOD_PATH], _Patch)
+            assert patcher.current['func_to_mock'] is get_mock(MOCK_PATH)
+            assert patcher.originals['func_to_mock'] is _resolve(MOCK_PATH).original
+        finally:
+            stop_patching()
+        assert not _patchers
+        assert dummies.func_to_mock() == 'Go ahead, mock me'
+
+    def test_stop_single_path(self):
+        start_patching()
+        try:
+            patcher = _patchers[MOCK_PATH]
+            stop_patching(MOCK_PATH)
+            assert 'func_to_mock' not in patcher.current
+            assert dummies.func_to_mock() == 'Go ahead, mock me'
+            assert dummies.other_func_to_mock() == 'I like PHP'
+
+            start_patching(MOCK_PATH)
+            assert isinstance(_patchers[MOCK_PATH], _Patch)
+            assert dummies.func_to_mock() == 'I have large ears'
+        finally:
+            stop_patching()
+        assert dummies.func_to_mock() == 'Go ahead, mock me'
+        assert dummies.other_func_to_mock() == 'Go ahead, mock me 2'
+
+    def test_register_while_patched(self):
+        start_patching()
+        try:
+            register(MOCK_PATH, _factory_map[MOCK_PATH])
+            stop_patching(MOCK_PATH)
+            assert dummies.func_to_mock() == 'Go ahead, mock me'
+        finally:
+            stop_patching()
+        assert dummies.func_to_mock() == 'Go ahead, mock me'
+        assert dummies.other_func_to_mock() == 'Go ahead, mock me 2'
+
+    def test_module_getattr(self):
+        """
+        Attributes provided by a module-level `__getattr__` are removed again
+        when patching stops, rather than being set to the original
+        """
+        patcher = _ModulePatch(dummies)
+        patcher.current['func_from_module_getattr'] = mock.MagicMock()
+        patcher.start()
+        assert patcher.has_missing
+        assert 'func_from_module_getattr' in vars(dummies)
+        patcher.stop()
+        assert 'func_from_module_getattr' not in vars(dummies)
+
+    def test_inherited_attribute(self):
+        new = mock.MagicMock(return_value='I have a new method')
+        patcher = _Patch(dummies.ChildToMock, 'method_to_mock', new)
+        assert patcher.start() is new
+        assert dummies.ChildToMock().method_to_mock() == 'I have a new method'
+        assert dummies.ParentToMock().method_to_mock() == 'Go ahead, mock my method'
+
+        patcher.stop()
+        assert 'method_to_mock' not in vars(dummies.ChildToMock)
+        assert dummies.ChildToMock().method_to_mock() == 'Go ahead, mock my method'
+
+    def test_unknown_engine(self):
+        with override_settings(settings, PATCH_ENGINE='wtf'):
+            with self.assertRaises(ValueError):
+                start_patching()
+
+
+class BuiltinPatchEngineStartStopPatching(BuiltinPatchEngineMixin, StartStopPatching):
+    pass
+
+
+class BuiltinPatchEngineSwapMock(BuiltinPatchEngineMixin, SwapMockContextDecoratorTestCase):
+    pass
+
+
+class BuiltinPatchEngineUnMock(BuiltinPatchEngineMixin, UnMockContextDecoratorTestCase):
+    pass
+
+
+class BuiltinPatchEnginePatchOnImport(BuiltinPatchEngineMixin, PatchOnImportTestCase):
+    pass
+
+
+class ContextOverlaysMixin(object):
+
+    def setUp(self):
+        self.override = override_settings(settings, CONTEXT_OVERLAYS=True)
+        self.override.enable()
+        super(ContextOverlaysMixin, self).setUp()
+
+    def tearDown(self):
+        super(ContextOverlaysMixin, self).tearDown()
+        self.override.disable()
+
+
+@skipIf(base.ContextVar is None, 'contextvars was added in Python 3.7')
+class ContextOverlaysSwapMock(ContextOverlaysMixin, SwapMockContextDecoratorTestCase):
+    pass
+
+
+@skipIf(base.ContextVar is None, 'contextvars was added in Python 3.7')
+class ContextOverlaysTestCase(ContextOverlaysMixin, TestCase):
+
+    def setUp(self):
+        super(ContextOverlaysTestCase, self).setUp()
+        start_patching()
+
+    def tearDown(self):
+        stop_patching()
+        super(ContextOverlaysTestCase, self).tearDown()
+
+    def test_dispatcher(self):
+        default = get_mock(MOCK_PATH)
+        with swap_mock(MOCK_PATH, mockery='I smell funny') as swapped:
+            assert isinstance(dummies.func_to_mock, base.OverlayDispatcher)
+            assert dummies.func_to_mock() == 'I smell funny'
+            assert get_mock(MOCK_PATH) is swapped
+            assert swapped.called
+
+        # (the dispatcher stays patched, and forwards to the default mock)
+        assert dummies.func_to_mock() == 'I have large ears'
+        assert get_mock(MOCK_PATH) is default
+
+        stop_patching()
+        assert dummies.func_to_mock() == 'Go ahead, mock me'
+        start_patching()
+
+    def test_get_called_mocks(self):
+        with swap_mock(MOCK_PATH, mockery='I smell funny') as swapped:
+            checkpoint = call_checkpoint()
+            dummies.func_to_mock()
+            assert get_called_mocks() == {MOCK_PATH: swapped}
+            assert get_called_mocks(since=checkpoint) == {MOCK_PATH: swapped}
+
+        # (the default mock was never called)
+        assert get_called_mocks() == {}
+
+    def test_nested(self):
+        with swap_mock(MOCK_PATH, mockery='I smell funny'):
+            with swap_mock(MOCK_PATH, mockery='I laugh at bad jokes'):
+                assert dummies.func_to_mock() == 'I laugh at bad jokes'
+            assert dummies.func_to_mock() == 'I smell funny'
+        assert dummies.func_to_mock() == 'I have large ears'
+
+    def test_other_thread_unaffected(self):
+        seen = []
+        swapped_in = threading.Event()
+        checked = threading.Event()
+
+        def other_thread():
+            swapped_in.wait()
+            seen.append(dummies.func_to_mock())
+            checked.set()
+
+        thread = threading.Thread(target=other_thread)
+        thread.start()
+        with swap_mock(MOCK_PATH, mockery='I smell funny'):
+            swapped_in.set()
+            checked.wait()
+            assert dummies.func_to_mock() == 'I smell funny'
+        thread.join()
+
+        assert seen == ['I have large ears']
+
+    def test_unmock(self):
+        with swap_mock(MOCK_PATH, mockery='I smell funny'):
+            with unmock(MOCK_PATH) as restored:
+                assert dummies.func_to_mock is restored
+                assert dummies.func_to_mock() == 'Go ahead, mock me'
+        assert dummies.func_to_mock() == 'I have large ears'
+
+    def test_not_patched(self):
+        # (falls back to patching globally)
+        stop_patching()
+        try:
+            with swap_mock(MOCK_PATH, mockery='I smell funny'):
+                assert not isinstance(dummies.func_to_mock, base.OverlayDispatcher)
+                assert dummies.func_to_mock() == 'I smell funny'
+            assert dummies.func_to_mock() == 'Go ahead, mock me'
+        finally:
+            start_patching()
+
+
+class BuiltinPatchEngineContextOverlays(BuiltinPatchEngineMixin, ContextOverlaysTestCase):
+    pass
+
+
 class TestAutomockTestCase(AutomockTestCase):
 
     def test_patched(self):
@@ -260,6 +1413,68 @@ class TestAutomockTestCase(AutomockTestCase):
         assert isinstance(dummies.yet_another_func_to_mock(), mock.MagicMock)
 
 
+class SelectedPathsTestCase(TestCase):
+
+    def tearDown(self):
+        if _patchers:
+            stop_patching()
+
+    def test_only(self):
+        start_patching(only=[MOCK_PATH])
+
+        assert set(_patchers) == {MOCK_PATH}
+        assert dummies.func_to_mock() == 'I have large ears'
+        assert dummies.other_func_to_mock() == 'Go ahead, mock me 2'
+
+    def test_exclude(self):
+        start_patching(exclude=[MOCK_PATH])
+
+        assert MOCK_PATH not in _patchers
+        assert OTHER_MOCK_PATH in _patchers
+        assert dummies.func_to_mock() == 'Go ahead, mock me'
+        assert dummies.other_func_to_mock() == 'I like PHP'
+
+    def test_only_and_exclude(self):
+        start_patching(only=[MOCK_PATH, OTHER_MOCK_PATH], exclude=[MOCK_PATH])
+
+        assert set(_patchers) == {OTHER_MOCK_PATH}
+
+    def test_unregistered(self):
+        with self.assertRaises(ValueError):
+            start_patching(only=['tests.dummies.not_registered'])
+        with self.assertRaises(ValueError):
+            start_patching(exclude=['tests.dummies.not_registered'])
+        assert not _patchers
+
+
+class BuiltinPatchEngineSelectedPaths(BuiltinPatchEngineMixin, SelectedPathsTestCase):
+    pass
+
+
+@only_automocks(MOCK_PATH)
+class TestOnlyAutomocks(AutomockTestCase):
+
+    def test_patched(self):
+        assert dummies.func_to_mock() == 'I have large ears'
+        assert dummies.other_func_to_mock() == 'Go ahead, mock me 2'
+
+
+@exclude_automocks(MOCK_PATH)
+class TestExcludeAutomocks(AutomockTestCase):
+
+    def test_patched(self):
+        assert dummies.func_to_mock() == 'Go ahead, mock me'
+        assert dummies.other_func_to_mock() == 'I like PHP'
+
+
+@no_automock
+class TestNoAutomock(AutomockTestCase):
+
+    def test_patched(self):
+        assert dummies.func_to_mock() == 'Go ahead, mock me'
+        assert not _patchers
+
+
 def test_activate_context_manager():
     # unmocked
     assert dummies.func_to_mock() == 'Go ahead, mock me'
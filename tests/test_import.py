@@ -0,0 +1,69 @@
+import os
+import subprocess
+import sys
+from unittest import skipIf, TestCase
+
+import automock
+from automock import base
+
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+REGISTER = """
+import sys
+before = set(sys.modules)
+
+import automock
+automock.register('services.things.client.do_something')
+
+@automock.register('services.things.client.do_other', record=automock.RecordLast(10))
+def factory():
+    pass
+
+print(' '.join(sorted(set(sys.modules) - before)))
+"""
+
+SIX_MOVES_MOCK = """
+import sys
+{import_six}
+import automock
+assert 'unittest.mock' not in sys.modules
+
+from six.moves import mock
+# (nothing left watching imports)
+assert automock._six_watcher is None or automock._six_watcher not in sys.meta_path
+print(mock.__name__)
+"""
+
+
+@skipIf(sys.version_info < (3, 7), 'needs a module `__getattr__` (PEP 562)')
+class LazyImportTestCase(TestCase):
+
+    def test_register_loads_nothing_else(self):
+        # (in a fresh interpreter, ours has loaded everything already)
+        output = subprocess.check_output(
+            [sys.executable, '-c', REGISTER], cwd=ROOT, universal_newlines=True,
+        )
+        assert output.split() == [
+            'automock', 'automock.importhook', 'automock.recording', 'automock.registry',
+        ]
+
+    def test_six_moves_mock(self):
+        # (whether or not `six` was imported before automock)
+        for import_six in ('', 'import six'):
+            output = subprocess.check_output(
+                [sys.executable, '-c', SIX_MOVES_MOCK.format(import_six=import_six)],
+                cwd=ROOT,
+                universal_newlines=True,
+            )
+            assert output.strip() == 'unittest.mock'
+
+    def test_all(self):
+        assert set(automock.__all__) == set(base.__all__)
+        for name in automock.__all__:
+            assert getattr(automock, name) is getattr(base, name)
+        assert set(automock.__all__) <= set(dir(automock))
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            automock.not_an_attribute
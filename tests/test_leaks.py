@@ -0,0 +1,134 @@
+from unittest import TestCase
+
+from flexisettings.utils import override_settings
+
+from automock import (
+    get_mock,
+    start_patching,
+    stop_patching,
+    swap_mock,
+)
+from automock import base, leaks
+from automock.conf import settings
+
+from tests import dummies
+
+
+MOCK_PATH = 'tests.dummies.func_to_mock'
+REUSABLE_MOCK_PATH = 'tests.dummies.func_to_mock_reusably'
+
+
+class LeakDetectorTestCase(TestCase):
+
+    def setUp(self):
+        self.detector = leaks.enable()
+
+    def tearDown(self):
+        leaks.disable()
+        if base._patchers:
+            stop_patching()
+
+    def test_no_leaks(self):
+        start_patching()
+        dummies.func_to_mock()
+        with swap_mock(MOCK_PATH):
+            dummies.func_to_mock()
+        stop_patching()
+
+        assert base._check_leaks('test') == []
+        assert self.detector.tests == 1
+
+    def test_mock_outlives_test(self):
+        start_patching()
+        dummies.func_to_mock('a large argument')
+        kept = [get_mock(MOCK_PATH)]
+        stop_patching()
+
+        found = base._check_leaks('test')
+        assert [(leak.path, leak.kind) for leak in found] == [(MOCK_PATH, 'mock')]
+        # (the referrers found by `gc` vary between Python versions)
+        assert found[0].detail.startswith('referenced by ')
+        assert 'list' in found[0].detail
+        assert found[0].detail.endswith(', 1 calls recorded')
+        # (only reported once)
+        assert base._check_leaks('next test') == []
+        del kept
+
+    def test_swapped_mock_outlives_test(self):
+        start_patching()
+        with swap_mock(MOCK_PATH) as swapped:
+            pass
+        stop_patching()
+
+        found = base._check_leaks('test')
+        assert [(leak.path, leak.kind) for leak in found] == [(MOCK_PATH, 'mock')]
+        del swapped
+
+    def test_pooled_mocks_kept(self):
+        start_patching(reuse=True)
+        dummies.func_to_mock_reusably()
+        stop_patching()
+
+        assert base._check_leaks('test') == []
+
+    def test_lazy_mocks(self):
+        with override_settings(settings, LAZY_MOCKS=True):
+            start_patching()
+            dummies.func_to_mock()
+            kept = get_mock(MOCK_PATH)
+            stop_patching()
+
+        found = base._check_leaks('test')
+        assert [(leak.path, leak.kind) for leak in found] == [(MOCK_PATH, 'mock')]
+        del kept
+
+    def test_patch_never_stopped(self):
+        start_patching()
+        stop_patching()
+        swap = swap_mock(MOCK_PATH)
+        swap.__enter__()
+        try:
+            found = base._check_leaks('test')
+        finally:
+            swap.__exit__(None, None, None)
+
+        assert [(leak.path, leak.kind) for leak in found] == [(MOCK_PATH, 'patch')]
+
+    def test_still_patched(self):
+        start_patching(MOCK_PATH)
+        found = base._check_leaks('test')
+        stop_patching()
+
+        assert [(leak.path, leak.kind) for leak in found] == [(MOCK_PATH, 'patch')]
+
+    def test_disabled(self):
+        leaks.disable()
+        start_patching()
+        kept = get_mock(MOCK_PATH)
+        stop_patching()
+
+        assert base._check_leaks('test') == []
+        del kept
+
+    def test_summary_and_merge(self):
+        start_patching()
+        kept = [get_mock(MOCK_PATH)]
+        stop_patching()
+        base._check_leaks('test_a')
+
+        detector = leaks.LeakDetector()
+        detector.merge(self.detector.to_dict())
+        detector.merge(self.detector.to_dict())
+
+        assert detector.tests == 2
+        lines = detector.summary(top=1)
+        assert len(lines) == 3
+        assert lines[0] == (
+            'automock leaks: 0 patches never stopped, 2 mocks outlived their '
+            'test, in 2 tests'
+        )
+        assert lines[1].startswith('  mock  {}  (referenced by '.format(MOCK_PATH))
+        assert 'list' in lines[1]
+        assert lines[1].endswith(', 0 calls recorded) in test_a')
+        assert lines[2] == '  ... and 1 more'
+        del kept
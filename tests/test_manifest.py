@@ -0,0 +1,167 @@
+import json
+import os
+import shutil
+import sys
+import tempfile
+from unittest import TestCase
+
+from six.moves import mock
+from flexisettings.utils import override_settings
+
+from automock import get_mock, start_patching, stop_patching
+from automock import base, manifest
+from automock.conf import settings
+from automock.manifest import compile_manifest, Entry, load_manifest
+
+from tests import dummies
+
+
+MANIFEST_PATH = 'tests.dummies.func_from_manifest'
+OTHER_MANIFEST_PATH = 'tests.dummies.other_func_from_manifest'
+FACTORY_PATH = 'tests.manifest_factories.manifest_mock'
+
+MANIFEST = {
+    'mocks': [
+        {'path': MANIFEST_PATH, 'factory': FACTORY_PATH},
+        {'path': OTHER_MANIFEST_PATH, 'reuse': True, 'autospec': True},
+    ],
+}
+
+TOML_MANIFEST = """
+[[mocks]]
+path = "{}"
+factory = "{}"
+
+[[mocks]]
+path = "{}"
+reuse = true
+autospec = true
+""".format(MANIFEST_PATH, FACTORY_PATH, OTHER_MANIFEST_PATH)
+
+try:
+    import tomllib  # noqa
+    HAS_TOML = True
+except ImportError:
+    try:
+        import tomli  # noqa
+        HAS_TOML = True
+    except ImportError:
+        HAS_TOML = False
+
+
+class ManifestTestCase(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, 'cache')
+        self.manifest_path = self.write('manifest.json', json.dumps(MANIFEST))
+
+    def tearDown(self):
+        for path in (MANIFEST_PATH, OTHER_MANIFEST_PATH):
+            if path in base._registry:
+                base._registry.unregister(path)
+        base._loaded_manifests = None
+        sys.modules.pop('tests.manifest_factories', None)
+        shutil.rmtree(self.tmp_dir)
+
+    def write(self, name, content):
+        path = os.path.join(self.tmp_dir, name)
+        with open(path, 'w') as f:
+            f.write(content)
+        return path
+
+    def start_patching(self, **overrides):
+        overrides.setdefault('MANIFEST_CACHE_DIR', self.cache_dir)
+        with override_settings(
+            settings, REGISTRATION_MANIFESTS=(self.manifest_path,), **overrides
+        ):
+            start_patching()
+        self.addCleanup(stop_patching)
+
+    def test_registered(self):
+        self.start_patching()
+
+        registration = base._registry[MANIFEST_PATH]
+        assert registration.factory_path == FACTORY_PATH
+        assert registration.registered_in == self.manifest_path
+        assert not registration.reuse
+        assert not registration.autospec
+        assert dummies.func_from_manifest() == 'I was declared in a manifest'
+
+        registration = base._registry[OTHER_MANIFEST_PATH]
+        assert registration.factory_path is None
+        assert registration.reuse
+        assert registration.autospec
+        assert get_mock(OTHER_MANIFEST_PATH) is get_mock(OTHER_MANIFEST_PATH)
+        with self.assertRaises(TypeError):
+            # (autospecced)
+            dummies.other_func_from_manifest('unexpected')
+
+    def test_factory_imported_lazily(self):
+        self.start_patching(LAZY_MOCKS=True)
+
+        assert not base._registry[MANIFEST_PATH].factory_imported
+        assert 'tests.manifest_factories' not in sys.modules
+
+        # (listing the factories doesn't import them either)
+        assert MANIFEST_PATH in base._factory_map
+        assert MANIFEST_PATH in list(base._factory_map)
+        assert len(base._factory_map) == len(base._registry)
+        assert 'tests.manifest_factories' not in sys.modules
+
+        assert dummies.func_from_manifest() == 'I was declared in a manifest'
+        assert base._registry[MANIFEST_PATH].factory_imported
+        assert 'tests.manifest_factories' in sys.modules
+
+    def test_toml(self):
+        if not HAS_TOML:
+            self.skipTest('needs Python 3.11+ or tomli')
+        self.manifest_path = self.write('manifest.toml', TOML_MANIFEST)
+        json_entries = load_manifest(self.write('other.json', json.dumps(MANIFEST)))
+
+        assert load_manifest(self.manifest_path) == json_entries
+
+    def test_cached(self):
+        entries = load_manifest(self.manifest_path, self.cache_dir)
+        assert len(os.listdir(self.cache_dir)) == 1
+
+        with mock.patch.object(manifest, '_parse') as parse:
+            assert load_manifest(self.manifest_path, self.cache_dir) == entries
+        parse.assert_not_called()
+        assert all(isinstance(entry, Entry) for entry in entries)
+
+    def test_recompiled_when_changed(self):
+        load_manifest(self.manifest_path, self.cache_dir)
+        self.write('manifest.json', json.dumps({'mocks': [{'path': MANIFEST_PATH}]}))
+
+        assert load_manifest(self.manifest_path, self.cache_dir) == (
+            Entry(MANIFEST_PATH, None, False, False),
+        )
+        assert len(os.listdir(self.cache_dir)) == 2
+
+    def test_not_cached(self):
+        self.start_patching(MANIFEST_CACHE_DIR=None)
+
+        assert MANIFEST_PATH in base._registry
+        assert not os.path.exists(self.cache_dir)
+
+    def test_only_loaded_once(self):
+        self.start_patching()
+        stop_patching()
+        with mock.patch.object(base, 'load_manifest') as load:
+            with override_settings(settings, REGISTRATION_MANIFESTS=(self.manifest_path,)):
+                start_patching()
+        load.assert_not_called()
+
+    def test_invalid(self):
+        for data, message in (
+            ([], 'expected a "mocks" list'),
+            ({'mocks': ['nope']}, 'mocks[0] is not a mapping'),
+            ({'mocks': [{'factory': FACTORY_PATH}]}, 'mocks[0] has no "path"'),
+            ({'mocks': [{'path': MANIFEST_PATH, 'spec': True}]}, 'unknown keys: spec'),
+            ({'mocks': [{'path': MANIFEST_PATH, 'reuse': 'yes'}]}, "mocks[0].reuse is 'yes'"),
+        ):
+            with self.assertRaises(ValueError) as ctx:
+                compile_manifest(data, 'manifest.json')
+            assert 'Invalid automock manifest manifest.json' in str(ctx.exception)
+            assert message in str(ctx.exception)
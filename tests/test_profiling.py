@@ -0,0 +1,135 @@
+from unittest import TestCase
+
+from flexisettings.utils import override_settings
+
+from automock import (
+    start_patching,
+    stop_patching,
+    swap_mock,
+    unmock,
+)
+from automock import base, profiling
+from automock.conf import settings
+
+
+MOCK_PATH = 'tests.dummies.func_to_mock'
+
+
+class ProfileTestCase(TestCase):
+
+    def test_nested_sections_counted_once(self):
+        profile = profiling.Profile()
+        outer = profile.start()
+        inner = profile.start()
+        profile.stop('inner', inner)
+        profile.stop('outer', outer)
+
+        assert profile.sections['inner'][0] == 1
+        assert profile.sections['outer'][0] == 1
+        assert profile.total == profile.sections['outer'][1]
+        assert profile.sections['inner'][1] <= profile.total
+
+    def test_wrap_factory(self):
+        profile = profiling.Profile()
+        factory = profile.wrap_factory('a.b', lambda x: x * 2, 'registrations')
+
+        assert factory(2) == 4
+        assert factory(3) == 6
+
+        assert profile.factories['a.b'][0] == 2
+        assert profile.module_totals() == {
+            'registrations': {
+                'import': 0.0,
+                'factories': profile.factories['a.b'][1],
+            },
+        }
+
+    def test_summary(self):
+        profile = profiling.Profile()
+        profile.tests = 2
+        profile.stop('start_patching', profile.start())
+        profile.wrap_factory('a.b', lambda: None, 'registrations')()
+        profile.stop_import('registrations', profile.start())
+
+        lines = profile.summary()
+
+        assert lines[0].startswith('automock overhead: ')
+        assert 'slowest factories:' in lines
+        assert lines[lines.index('slowest factories:') + 1].endswith('a.b')
+        assert 'most expensive registration modules:' in lines
+        assert lines[-1].endswith('registrations')
+
+    def test_merge(self):
+        worker = profiling.Profile()
+        worker.tests = 3
+        worker.stop('start_patching', worker.start())
+        worker.wrap_factory('a.b', lambda: None, 'registrations')()
+
+        profile = profiling.Profile()
+        profile.merge(worker.to_dict(), worker='gw0')
+        profile.merge(worker.to_dict(), worker='gw1')
+
+        assert profile.tests == 6
+        assert profile.total == 2 * worker.total
+        assert profile.sections['start_patching'][0] == 2
+        assert profile.factories['a.b'][0] == 2
+        assert profile.factory_modules['a.b'] == 'registrations'
+        assert profile.workers == {
+            'gw0': {'total_seconds': worker.total, 'tests': 3},
+            'gw1': {'total_seconds': worker.total, 'tests': 3},
+        }
+        assert profile.summary()[1].startswith('  across 2 workers: ')
+
+
+class InstrumentationTestCase(TestCase):
+
+    def setUp(self):
+        self.profile = profiling.enable()
+
+    def tearDown(self):
+        profiling.disable()
+
+    def test_disabled(self):
+        profiling.disable()
+        start_patching()
+        stop_patching()
+        assert self.profile.sections == {}
+        assert self.profile.total == 0
+
+    def test_start_stop(self):
+        start_patching()
+        stop_patching()
+
+        assert self.profile.sections['start_patching'][0] == 1
+        assert self.profile.sections['stop_patching'][0] == 1
+        assert set(self.profile.factories) == set(base._factory_map)
+        assert self.profile.factory_modules[MOCK_PATH] == base._registry[MOCK_PATH].registered_in
+        assert self.profile.total > 0
+
+    def test_lazy_factory(self):
+        with override_settings(settings, LAZY_MOCKS=True):
+            start_patching()
+            try:
+                assert MOCK_PATH not in self.profile.factories
+                base.get_mock(MOCK_PATH)
+                assert self.profile.factories[MOCK_PATH][0] == 1
+            finally:
+                stop_patching()
+
+    def test_swap_and_unmock(self):
+        start_patching()
+        try:
+            with swap_mock(MOCK_PATH):
+                pass
+            with unmock(MOCK_PATH):
+                pass
+        finally:
+            stop_patching()
+
+        # (one of each per use)
+        assert self.profile.sections['swap_mock.enter'][0] == 1
+        assert self.profile.sections['swap_mock.exit'][0] == 1
+        assert self.profile.sections['unmock.enter'][0] == 1
+        assert self.profile.sections['unmock.exit'][0] == 1
+        # factory called at start and by swap_mock (unmock keeps the mock)
+        assert self.profile.factories[MOCK_PATH][0] == 2
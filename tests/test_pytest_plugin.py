@@ -1,4 +1,9 @@
 
+import json
+import os
+
+import pytest
+
 # https://docs.pytest.org/en/latest/writing_plugins.html#testing-plugins
 pytest_plugins = 'pytester'
 
@@ -25,3 +30,338 @@ def test_pytest_plugin():
     result = testdir.runpytest()
 
     result.assert_outcomes(passed=1)
+
+
+SCOPED_TESTS = """
+from six.moves import mock
+
+import automock
+from automock.base import _patchers
+from tests import dummies
+
+
+MOCK_PATH = 'tests.dummies.func_to_mock'
+
+seen = []
+
+
+def test_one():
+    mocked = automock.get_mock(MOCK_PATH)
+    seen.append(_patchers[MOCK_PATH])
+    assert dummies.func_to_mock() == 'I have large ears'
+    mocked.return_value = 'I was configured'
+
+
+def test_two():
+    mocked = automock.get_mock(MOCK_PATH)
+    seen.append(_patchers[MOCK_PATH])
+    # per-test state has been reset
+    assert not mocked.called
+    assert dummies.func_to_mock() == 'I have large ears'
+
+
+class TestClass(object):
+
+    def test_three(self):
+        seen.append(_patchers[MOCK_PATH])
+        assert dummies.func_to_mock() == 'I have large ears'
+
+
+def test_four():
+    seen.append(_patchers[MOCK_PATH])
+
+
+def test_seen():
+    # which tests ran under the same patcher as the first?
+    same = [seen[0] is patcher for patcher in seen]
+    with open('same.txt', 'w') as f:
+        f.write(repr(same))
+"""
+
+
+def _patched_in_same_scope(testdir, *args):
+    testdir.makepyfile(SCOPED_TESTS)
+    result = testdir.runpytest('-p', 'automock.pytest_plugin', *args)
+    result.assert_outcomes(passed=5)
+    with open(str(testdir.tmpdir.join('same.txt'))) as f:
+        return f.read()
+
+
+def test_function_scope(testdir):
+    assert _patched_in_same_scope(testdir) == '[True, False, False, False]'
+
+
+def test_class_scope(testdir):
+    same = _patched_in_same_scope(testdir, '--automock-scope=class')
+    assert same == '[True, True, False, False]'
+
+
+def test_module_scope(testdir):
+    same = _patched_in_same_scope(testdir, '--automock-scope=module')
+    assert same == '[True, True, True, True]'
+
+
+def test_session_scope(testdir):
+    testdir.makeini("""
+[pytest]
+automock_scope = session
+""")
+    same = _patched_in_same_scope(testdir)
+    assert same == '[True, True, True, True]'
+
+
+@pytest.mark.parametrize('scope', ['function', 'class', 'module', 'session'])
+def test_nested_stop_patching(testdir, scope):
+    testdir.makepyfile("""
+from six.moves import mock
+
+import automock
+from tests import dummies
+
+
+def test_before():
+    assert dummies.func_to_mock() == 'I have large ears'
+
+
+class TestAutomockTestCase(automock.AutomockTestCase):
+
+    def test_patched(self):
+        assert dummies.func_to_mock() == 'I have large ears'
+
+
+def test_after_test_case():
+    # (the test case's `tearDown` stopped all patching)
+    assert isinstance(dummies.yet_another_func_to_mock(), mock.MagicMock)
+
+
+@automock.activate()
+def test_activate():
+    assert dummies.func_to_mock() == 'I have large ears'
+
+
+def test_after_activate():
+    assert isinstance(dummies.yet_another_func_to_mock(), mock.MagicMock)
+    """)
+
+    result = testdir.runpytest('-p', 'automock.pytest_plugin', '--automock-scope', scope)
+
+    result.assert_outcomes(passed=5)
+
+
+@pytest.mark.parametrize('scope', ['class', 'module', 'session'])
+def test_failing_unmock(testdir, scope):
+    testdir.makepyfile("""
+from six.moves import mock
+
+import automock
+from tests import dummies
+
+
+@automock.unmock('tests.dummies.func_to_mock')
+def test_unmock_fails(*args):
+    # (the restored function is passed in last, `*args` hides it from pytest)
+    assert args[-1]() == 'Go ahead, mock me'
+    assert dummies.func_to_mock() == 'Go ahead, mock me'
+    raise ValueError('failed while un-mocked')
+
+
+def test_after_unmock():
+    # (the mock was put back, even though the test failed)
+    assert dummies.func_to_mock() == 'I have large ears'
+    """)
+
+    result = testdir.runpytest('-p', 'automock.pytest_plugin', '--automock-scope', scope)
+
+    result.assert_outcomes(passed=1, failed=1)
+
+
+def test_unpatched_after_session(testdir):
+    testdir.makepyfile("""
+from tests import dummies
+
+
+def test_patched():
+    assert dummies.func_to_mock() == 'I have large ears'
+    """)
+
+    result = testdir.runpytest('-p', 'automock.pytest_plugin', '--automock-scope=session')
+
+    result.assert_outcomes(passed=1)
+
+    from tests import dummies
+    assert dummies.func_to_mock() == 'Go ahead, mock me'
+
+
+def test_profile(testdir):
+    testdir.makepyfile("""
+import automock
+from tests import dummies
+
+
+def test_one():
+    assert dummies.func_to_mock() == 'I have large ears'
+
+
+def test_two():
+    with automock.swap_mock('tests.dummies.func_to_mock'):
+        pass
+    """)
+
+    result = testdir.runpytest('-p', 'automock.pytest_plugin', '--automock-profile')
+
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines([
+        '*automock profile*',
+        'automock overhead: *s total, 2 tests, *ms per test',
+        'slowest factories:',
+        'most expensive registration modules:',
+        '*tests.automocks',
+    ])
+
+    with open(str(testdir.tmpdir.join('automock-profile.json'))) as f:
+        report = json.load(f)
+    assert report['tests'] == 2
+    assert report['sections']['start_patching']['calls'] == 2
+    assert report['sections']['swap_mock.enter']['calls'] == 1
+    assert report['sections']['swap_mock.exit']['calls'] == 1
+    assert 'tests.dummies.func_to_mock' in report['factories']
+
+
+def test_xdist_profile(testdir):
+    pytest.importorskip('xdist')
+    # (so the worker processes can import automock and our test dummies,
+    # whatever their environment and working directory)
+    testdir.makeconftest("""
+import sys
+sys.path.insert(0, {!r})
+
+pytest_plugins = 'automock.pytest_plugin'
+    """.format(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    testdir.makepyfile(**{
+        'test_{}'.format(i): """
+from tests import dummies
+
+
+def test_patched():
+    assert dummies.func_to_mock() == 'I have large ears'
+        """
+        for i in range(4)
+    })
+
+    result = testdir.runpytest('--automock-profile', '-n', '2')
+
+    result.assert_outcomes(passed=4)
+    result.stdout.fnmatch_lines([
+        'automock overhead: *s total, 4 tests, *ms per test',
+        '  across 2 workers: *s mean, *s max per worker',
+        '  warm_up *2 calls',
+    ])
+    with open(str(testdir.tmpdir.join('automock-profile.json'))) as f:
+        report = json.load(f)
+    assert sorted(report['workers']) == ['gw0', 'gw1']
+    assert sum(worker['tests'] for worker in report['workers'].values()) == 4
+    assert report['sections']['start_patching']['calls'] == 4
+
+
+def test_leaks(testdir):
+    testdir.makepyfile("""
+import automock
+from tests import dummies
+
+kept = []
+
+
+def test_leaky():
+    dummies.func_to_mock()
+    kept.append(automock.get_mock('tests.dummies.func_to_mock'))
+
+
+def test_tidy():
+    dummies.func_to_mock()
+    """)
+
+    result = testdir.runpytest('-p', 'automock.pytest_plugin', '--automock-leaks')
+
+    result.assert_outcomes(passed=2)
+    result.stdout.fnmatch_lines([
+        '*automock leaks*',
+        'automock leaks: 0 patches never stopped, 1 mocks outlived their test, in 2 tests',
+        '  mock  tests.dummies.func_to_mock  (referenced by *list*, 1 calls recorded) in '
+        'test_leaks.py::test_leaky',
+    ])
+
+
+SELECTED_TESTS = """
+import pytest
+
+from tests import dummies
+
+
+@pytest.mark.automock(only=['tests.dummies.func_to_mock'])
+def test_only():
+    assert dummies.func_to_mock() == 'I have large ears'
+    assert dummies.other_func_to_mock() == 'Go ahead, mock me 2'
+
+
+@pytest.mark.automock(exclude=['tests.dummies.func_to_mock'])
+def test_exclude():
+    assert dummies.func_to_mock() == 'Go ahead, mock me'
+    assert dummies.other_func_to_mock() == 'I like PHP'
+
+
+@pytest.mark.no_automock
+def test_no_automock():
+    assert dummies.func_to_mock() == 'Go ahead, mock me'
+    assert dummies.other_func_to_mock() == 'Go ahead, mock me 2'
+
+
+def test_all():
+    assert dummies.func_to_mock() == 'I have large ears'
+    assert dummies.other_func_to_mock() == 'I like PHP'
+
+
+@pytest.mark.no_automock
+class TestUnpatched(object):
+
+    @pytest.mark.automock(only=['tests.dummies.other_func_to_mock'])
+    def test_closest_marker(self):
+        # (no_automock on the class wins)
+        assert dummies.other_func_to_mock() == 'Go ahead, mock me 2'
+
+    def test_unpatched(self):
+        assert dummies.func_to_mock() == 'Go ahead, mock me'
+
+
+def test_all_again():
+    assert dummies.func_to_mock() == 'I have large ears'
+"""
+
+
+@pytest.mark.parametrize('scope', ['function', 'module', 'session'])
+def test_markers(testdir, scope):
+    testdir.makepyfile(SELECTED_TESTS)
+
+    result = testdir.runpytest(
+        '-p', 'automock.pytest_plugin', '--automock-scope', scope, '--strict-markers',
+    )
+
+    result.assert_outcomes(passed=7)
+
+
+def test_marker_unregistered_path(testdir):
+    testdir.makepyfile("""
+import pytest
+
+
+@pytest.mark.automock(only=['tests.dummies.not_registered'])
+def test_only():
+    pass
+    """)
+
+    result = testdir.runpytest('-p', 'automock.pytest_plugin')
+
+    # (not `assert_outcomes`, whose kwarg was renamed `error` -> `errors`)
+    result.stdout.fnmatch_lines([
+        '*Not registered with automock: tests.dummies.not_registered',
+        '*1 error*',
+    ])
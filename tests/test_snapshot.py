@@ -0,0 +1,111 @@
+from unittest import TestCase
+
+from six.moves import mock
+
+from automock.snapshot import MockSnapshot
+
+
+class MockSnapshotTestCase(TestCase):
+
+    def test_calls_cleared(self):
+        snapshot = MockSnapshot(mock.MagicMock())
+        snapshot.mock(1)
+        snapshot.mock.child(2)
+
+        snapshot.restore()
+
+        assert not snapshot.mock.called
+        assert snapshot.mock.call_args is None
+        assert snapshot.mock.call_args_list == []
+        assert snapshot.mock.mock_calls == []
+        assert snapshot.mock.method_calls == []
+
+    def test_return_value(self):
+        snapshot = MockSnapshot(mock.MagicMock(return_value='snapshotted'))
+        snapshot.mock.return_value = 'changed'
+
+        snapshot.restore()
+
+        assert snapshot.mock() == 'snapshotted'
+
+    def test_default_return_value(self):
+        snapshot = MockSnapshot(mock.MagicMock())
+        snapshot.mock.return_value.configured.return_value = 'changed'
+
+        snapshot.restore()
+
+        assert isinstance(snapshot.mock().configured(), mock.MagicMock)
+
+    def test_configured_return_value_mock(self):
+        mocked = mock.MagicMock()
+        mocked.return_value.configured.return_value = 'snapshotted'
+        snapshot = MockSnapshot(mocked)
+        mocked.return_value.configured.return_value = 'changed'
+        mocked.return_value.other.return_value = 'changed'
+
+        snapshot.restore()
+
+        assert mocked().configured() == 'snapshotted'
+        assert isinstance(mocked().other(), mock.MagicMock)
+
+    def test_side_effect_iterable(self):
+        snapshot = MockSnapshot(mock.MagicMock(side_effect=[1, 2]))
+        assert snapshot.mock() == 1
+        assert snapshot.mock() == 2
+
+        snapshot.restore()
+
+        assert snapshot.mock() == 1
+        assert snapshot.mock() == 2
+        with self.assertRaises(StopIteration):
+            snapshot.mock()
+
+    def test_side_effect_exception(self):
+        snapshot = MockSnapshot(mock.MagicMock(side_effect=ValueError))
+        snapshot.mock.side_effect = None
+
+        snapshot.restore()
+
+        with self.assertRaises(ValueError):
+            snapshot.mock()
+
+    def test_attributes(self):
+        mocked = mock.MagicMock()
+        mocked.configured = 'snapshotted'
+        snapshot = MockSnapshot(mocked)
+        mocked.configured = 'changed'
+        mocked.added = 'added'
+        child = mocked.child_mock = mock.MagicMock()
+
+        snapshot.restore()
+
+        assert mocked.configured == 'snapshotted'
+        assert isinstance(mocked.added, mock.MagicMock)
+        assert mocked.child_mock is not child
+
+    def test_magic_methods(self):
+        mocked = mock.MagicMock()
+        mocked.__len__.return_value = 3
+        snapshot = MockSnapshot(mocked)
+        mocked.__len__.return_value = 5
+        mocked.__iter__ = lambda self: iter([1])
+
+        snapshot.restore()
+
+        assert len(mocked) == 3
+        assert list(mocked) == []
+
+    def test_cyclic(self):
+        mocked = mock.MagicMock()
+        mocked.return_value = mocked
+        snapshot = MockSnapshot(mocked)
+        mocked()()
+
+        snapshot.restore()
+
+        assert mocked() is mocked
+        assert mocked.call_count == 1
+
+    def test_not_a_mock(self):
+        with self.assertRaises(TypeError):
+            MockSnapshot(lambda: None)